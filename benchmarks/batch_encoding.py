@@ -0,0 +1,63 @@
+"""
+Compares `send_batch_sms` payload encodings: the previous double JSON
+encoding, `encode_messages` and the streamed `iter_encode_messages`.
+
+    python benchmarks/batch_encoding.py [messages]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from eskiz.utils.encoder import encode_messages, iter_encode_messages
+from eskiz.utils.message import MessageBuilder
+
+
+def double_encoded(messages):
+    return json.dumps(messages.model_dump_json(by_alias=True)).encode()
+
+
+def single_pass(messages):
+    return encode_messages(messages)
+
+
+def streamed(messages):
+    size = 0
+    for chunk in iter_encode_messages(messages):
+        size += len(chunk)
+    return size
+
+
+def measure(name, func, messages, rounds=5):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = func(messages)
+    elapsed = (time.perf_counter() - started) / rounds
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = result if isinstance(result, int) else len(result)
+    print(
+        f"{name:<14} {size / 1024:>9.0f} KiB "
+        f"{size / elapsed / 1024 ** 2:>9.1f} MiB/s "
+        f"{elapsed * 1000:>8.1f} ms "
+        f"{peak / 1024:>9.0f} KiB peak"
+    )
+
+
+def main(count: int):
+    builder = MessageBuilder(dispatch_id=1)
+    for index in range(count):
+        builder.add(998900000000 + index, f"Your code is {index:06d}")
+    messages = builder.as_messages()
+
+    print(f"{count} messages")
+    measure("double-encoded", double_encoded, messages)
+    measure("single-pass", single_pass, messages)
+    measure("streamed", streamed, messages)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
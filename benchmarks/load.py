@@ -0,0 +1,275 @@
+"""
+Load test of `SMSClient` against a local `MockGateway`: drives a fixed
+number of concurrent requests and reports throughput, latency
+percentiles, client CPU and peak memory.
+
+    python benchmarks/load.py --mode sms --concurrency 50 --requests 5000
+    python benchmarks/load.py --mode batch --batch-size 200 --latency 0.02
+    python benchmarks/load.py --fault server_error=0.01 --retries 3
+
+The gateway runs in its own process so the CPU and memory reported are
+the client's; `--inprocess` shares the loop instead. Save a run with
+`--save base.json` and compare later runs with `--baseline base.json`:
+numbers worse than the baseline by more than `--tolerance` are flagged
+and the exit code is 1.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from eskiz import SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.message import MessageBuilder
+from eskiz.utils.retry import RetryPolicy
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+MODES = ("sms", "batch", "details")
+
+# Higher is better for these, lower for the others compared
+HIGHER_IS_BETTER = {"msgs_per_sec"}
+COMPARED = (
+    "msgs_per_sec",
+    "p50_ms",
+    "p90_ms",
+    "p99_ms",
+    "cpu_us_per_msg",
+    "peak_rss_mb",
+)
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+async def start_gateway(args):
+    """Returns the service URL, a token and a cleanup coroutine function"""
+    options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "faults": dict(args.fault),
+        "balance": 10**12,
+        "seed": 1,
+    }
+
+    if args.inprocess:
+        gateway = MockGateway(**options)
+        await gateway.start(port=0)
+        return gateway.url, gateway.token, gateway.stop
+
+    command = [
+        sys.executable,
+        "-m",
+        "eskiz.mock",
+        "--port=0",
+        f"--latency={args.latency}",
+        f"--jitter={args.jitter}",
+        f"--balance={options['balance']}",
+        "--seed=1",
+        *(f"--fault={name}={share}" for name, share in args.fault),
+    ]
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE
+    )
+    assert process.stdout is not None
+    line = await process.stdout.readline()
+    if not line:
+        raise RuntimeError("Mock gateway did not start")
+    url, token = line.decode().split()
+
+    async def stop():
+        process.terminate()
+        await process.wait()
+
+    return url, token, stop
+
+
+def make_call(client, args):
+    """Coroutine function sending one request, returns messages sent"""
+    if args.mode == "sms":
+
+        async def call(index):
+            await client.send_sms(998900000000 + index, "Your code is 1234")
+            return 1
+
+    elif args.mode == "batch":
+
+        async def call(index):
+            builder = MessageBuilder(dispatch_id=index)
+            for offset in range(args.batch_size):
+                builder.add(998900000000 + offset, "Big sale today only")
+            await client.send_batch_sms(builder.as_messages())
+            return args.batch_size
+
+    else:
+        end = datetime.now() + timedelta(days=1)
+        start = end - timedelta(days=2)
+
+        async def call(index):
+            await client.get_message_details(start, end, page_size=20)
+            return 1
+
+    return call
+
+
+async def drive(client, args):
+    call = make_call(client, args)
+
+    if args.mode == "details":
+        # Rows for the pages to return
+        await asyncio.gather(
+            *(client.send_sms(998900000000 + i, "hi") for i in range(200))
+        )
+
+    # Warm up connections and code paths
+    await asyncio.gather(
+        *(call(i) for i in range(args.concurrency)), return_exceptions=True
+    )
+
+    latencies = []
+    counter = iter(range(args.requests))
+    result = {"messages": 0, "errors": 0}
+
+    async def worker():
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                sent = await call(index)
+            except Exception:
+                result["errors"] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            result["messages"] += sent
+
+    cpu = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    seconds = time.perf_counter() - started
+    cpu = time.process_time() - cpu
+
+    latencies.sort()
+    messages = result["messages"]
+    return {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "errors": result["errors"],
+        "seconds": round(seconds, 3),
+        "msgs_per_sec": round(messages / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 0.9) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(percentile(latencies, 1) * 1000, 2),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_us_per_msg": round(cpu / max(messages, 1) * 1e6, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Names of the numbers worse than the baseline beyond `tolerance`"""
+    regressions = []
+    for name in COMPARED:
+        old, new = baseline.get(name), report.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if name in HIGHER_IS_BETTER:
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{name}: {old} -> {new} ({change:+.0%})")
+
+    old, new = baseline.get("errors", 0), report["errors"]
+    if new > old:
+        regressions.append(f"errors: {old} -> {new}")
+    return regressions
+
+
+async def main(args):
+    url, token, stop = await start_gateway(args)
+
+    retry = None
+    if args.retries > 1:
+        retry = RetryPolicy(args.retries, backoff=0.05, jitter=0.5)
+
+    client = SMSClient(
+        token=token,
+        service_url=url,
+        connections_limit=args.concurrency,
+        retry=retry,
+        timeout=args.timeout,
+    )
+    try:
+        return await drive(client, args)
+    finally:
+        await client.close()
+        await stop()
+
+
+def parse_fault(value):
+    name, _, share = value.partition("=")
+    return name, float(share)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=MODES, default="sms")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--fault", type=parse_fault, action="append", default=[]
+    )
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--inprocess", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{report['mode']} x{report['concurrency']}: "
+            f"{report['msgs_per_sec']:.0f} msgs/s, "
+            f"p50 {report['p50_ms']} ms, p90 {report['p90_ms']} ms, "
+            f"p99 {report['p99_ms']} ms, max {report['max_ms']} ms, "
+            f"CPU {report['cpu_us_per_msg']} us/msg, "
+            f"RSS {report['peak_rss_mb']} MB, {report['errors']} errors"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
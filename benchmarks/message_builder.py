@@ -0,0 +1,64 @@
+"""
+Compares `MessageBuilder` with `CompactMessageBuilder` when building a
+large campaign and materializing it in `send-batch` sized chunks.
+
+    python benchmarks/message_builder.py [recipients]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from eskiz.utils.message import CompactMessageBuilder, MessageBuilder
+
+CHUNK_SIZE = 500
+
+
+def build_regular(count):
+    builder = MessageBuilder(dispatch_id=1)
+    for index in range(count):
+        builder.add(998900000000 + index, "Campaign text")
+
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = builder.messages[start : start + CHUNK_SIZE]
+        MessageBuilder(dispatch_id=1, messages=chunk).as_messages()
+    return builder
+
+
+def build_compact(count):
+    builder = CompactMessageBuilder(dispatch_id=1)
+    for index in range(count):
+        builder.add(998900000000 + index, "Campaign text")
+
+    for _ in builder.chunks(CHUNK_SIZE):
+        pass
+    return builder
+
+
+def measure(name, func, count):
+    started = time.perf_counter()
+    func(count)
+    elapsed = time.perf_counter() - started
+
+    # Separate run, tracemalloc slows allocations down considerably
+    tracemalloc.start()
+    builder = func(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del builder
+
+    print(
+        f"{name:<8} {elapsed:>7.2f} s "
+        f"{current / 1024 ** 2:>8.1f} MiB held "
+        f"{peak / 1024 ** 2:>8.1f} MiB peak"
+    )
+
+
+def main(count: int):
+    print(f"{count} recipients, chunks of {CHUNK_SIZE}")
+    measure("regular", build_regular, count)
+    measure("compact", build_compact, count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,57 @@
+"""
+Measures `Outbox` journal throughput with concurrent writers sharing
+group commits.
+
+    python benchmarks/outbox.py [chunks] [writers]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from eskiz.outbox import ACKED, INFLIGHT, Outbox
+from eskiz.utils.message import MessageBuilder
+
+
+def make_chunk(index):
+    builder = MessageBuilder(dispatch_id=1)
+    for offset in range(10):
+        builder.add(998900000000 + index * 10 + offset, "Your code is 1234")
+    return builder.as_messages()
+
+
+async def main(chunks: int, writers: int):
+    messages = make_chunk(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "outbox.db")
+        async with Outbox(path) as outbox:
+            await outbox.resume("bench")
+            queue = iter(range(chunks))
+
+            async def writer():
+                # Journal, mark in flight, acknowledge: as `BulkSender`
+                for seq in queue:
+                    await outbox.append("bench", seq, messages, seq + 1)
+                    await outbox.mark("bench", seq, INFLIGHT)
+                    await outbox.mark("bench", seq, ACKED, response_id="1")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(writer() for _ in range(writers)))
+            elapsed = time.perf_counter() - started
+
+            print(
+                f"{outbox.writes} writes in {elapsed:.2f} s, "
+                f"{outbox.writes / elapsed:,.0f} writes/s, "
+                f"{outbox.commits} commits "
+                f"({outbox.writes / outbox.commits:.0f} writes/commit)"
+            )
+            print(await outbox.counts("bench"))
+
+
+if __name__ == "__main__":
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    asyncio.run(main(chunks, writers))
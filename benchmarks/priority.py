@@ -0,0 +1,107 @@
+"""
+Measures `send_sms` latency while a campaign floods the same client with
+`send_batch_sms`, with and without a `PriorityScheduler`.
+
+    python benchmarks/priority.py [batches] [connections] [probes]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+from eskiz import SMSClient
+from eskiz.utils.message import MessageBuilder
+from eskiz.utils.scheduler import PriorityScheduler
+
+# Simulated gateway latency (seconds)
+LATENCY = 0.02
+
+
+async def handle(request):
+    await request.read()
+    await asyncio.sleep(LATENCY)
+    return web.json_response({"id": "1", "status": "waiting", "message": ""})
+
+
+async def serve():
+    app = web.Application()
+    app.router.add_route("*", "/api/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def run(url, batches, connections, probes, scheduler):
+    client = SMSClient(
+        token="token",
+        service_url=url,
+        connections_limit=connections,
+        decoding="dict",
+        scheduler=scheduler,
+    )
+
+    builder = MessageBuilder(dispatch_id=1)
+    for offset in range(100):
+        builder.add(998900000000 + offset, "Big sale today only")
+    messages = builder.as_messages()
+
+    campaign = [
+        asyncio.ensure_future(client.send_batch_sms(messages))
+        for _ in range(batches)
+    ]
+
+    # Let the campaign fill the connection pool first
+    await asyncio.sleep(0.2)
+
+    async def otp():
+        started = time.perf_counter()
+        await client.send_sms(998991234567, "Your code is 1234")
+        return time.perf_counter() - started
+
+    # The same OTPs in both runs, one every 10 ms whether or not the
+    # previous ones are done, so all of them meet the campaign
+    otps = []
+    for _ in range(probes):
+        otps.append(asyncio.ensure_future(otp()))
+        await asyncio.sleep(0.01)
+    pending = sum(not task.done() for task in campaign)
+
+    latencies = await asyncio.gather(*otps)
+    await asyncio.gather(*campaign)
+    await client.close()
+
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99, pending
+
+
+async def main(batches: int, connections: int, probes: int):
+    runner, url = await serve()
+    try:
+        for name, scheduler in (
+            ("no scheduler", None),
+            ("scheduler", PriorityScheduler()),
+        ):
+            p50, p99, pending = await run(
+                url, batches, connections, probes, scheduler
+            )
+            print(
+                f"{name:>12}: OTP p50 {p50 * 1000:.1f} ms, "
+                f"p99 {p99 * 1000:.1f} ms ({probes} OTPs, "
+                f"{pending} batches queued after the last one)"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    batches = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    probes = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    asyncio.run(main(batches, connections, probes))
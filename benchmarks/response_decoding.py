@@ -0,0 +1,99 @@
+"""
+Compares full pydantic validation of a `MessageDetails` report page with
+`LazyModel` views reading two fields per row.
+
+    python benchmarks/response_decoding.py [rows]
+"""
+
+import sys
+import time
+
+from eskiz import types
+from eskiz.types.lazy import LazyModel
+
+
+def row(index):
+    return {
+        "id": index,
+        "user_id": 1,
+        "country_id": None,
+        "connection_id": 1,
+        "smsc_id": 1,
+        "dispatch_id": 1,
+        "user_sms_id": f"id-{index}",
+        "request_id": f"request-{index}",
+        "price": 50,
+        "is_ad": False,
+        "nick": "4546",
+        "to": f"99890{index:07d}",
+        "message": "Your code is 123456",
+        "encoding": 0,
+        "parts_count": 1,
+        "parts": {
+            "parts": {
+                "0": {
+                    "accept": "2024-01-01 00:00:00",
+                    "status": "DELIVRD",
+                    "submit": 1,
+                    "delivery": "2024-01-01 00:00:05",
+                }
+            }
+        },
+        "status": "DELIVRD",
+        "smsc_data": {"data": {"0": ["DELIVRD"]}},
+        "sent_at": "2024-01-01 00:00:00",
+        "submit_sm_resp_at": "2024-01-01 00:00:01",
+        "delivery_sm_at": "2024-01-01 00:00:05",
+        "created_at": "2024-01-01 00:00:00",
+        "updated_at": "2024-01-01 00:00:05",
+    }
+
+
+def page(rows):
+    return {
+        "status": "success",
+        "data": {
+            "current_page": 1,
+            "path": "https://notify.eskiz.uz/api/message/sms/get-user-messages",
+            "prev_page_url": None,
+            "first_page_url": "?page=1",
+            "last_page_url": "?page=1",
+            "next_page_url": None,
+            "per_page": rows,
+            "last_page": 1,
+            "from": 1,
+            "to": rows,
+            "total": rows,
+            "result": [row(index) for index in range(rows)],
+            "links": [{"url": None, "label": "1", "active": True}],
+        },
+    }
+
+
+def full(raw):
+    details = types.MessageDetails(**raw)
+    return [(item.id, item.status) for item in details.data.result]
+
+
+def lazy(raw):
+    details = LazyModel(types.MessageDetails, raw)
+    return [(item.id, item.status) for item in details.data.result]
+
+
+def measure(name, func, raw, rounds=10):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func(raw)
+    elapsed = (time.perf_counter() - started) / rounds
+    print(f"{name:<6} {elapsed * 1000:>8.2f} ms/page")
+
+
+def main(rows: int):
+    raw = page(rows)
+    print(f"{rows} rows per page")
+    measure("full", full, raw)
+    measure("lazy", lazy, raw)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
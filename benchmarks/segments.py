@@ -0,0 +1,70 @@
+"""
+Measures encoding and part counts of a campaign's message texts.
+
+    python benchmarks/segments.py [messages] [distinct texts]
+"""
+
+import random
+import sys
+import time
+
+from eskiz.utils.segments import segments, segments_batch
+
+TEXTS = [
+    "Your code is {}. Do not share it with anyone.",
+    "Hurmatli mijoz, buyurtmangiz #{} yetkazildi. Rahmat!",
+    "Hurmatli mijoz, to‘lovingiz {} so‘m qabul qilindi.",
+    "Ҳурматли мижоз, буюртмангиз #{} етказилди.",
+    "Order {} shipped. Track it at https://example.uz/t/{{id}} [24/7]",
+]
+
+
+def make_messages(count, distinct):
+    rng = random.Random(1)
+    values = [rng.randint(1000, 999999) for _ in range(distinct)]
+    return [
+        rng.choice(TEXTS).format(values[index % distinct]) * rng.randint(1, 4)
+        for index in range(count)
+    ]
+
+
+def main(count: int, distinct: int):
+    messages = make_messages(count, distinct)
+
+    started = time.perf_counter()
+    single = [segments(text) for text in messages]
+    elapsed = time.perf_counter() - started
+    print(
+        f"segments: {count} messages in {elapsed:.2f} s, "
+        f"{elapsed / count * 1e6:.2f} us/message"
+    )
+
+    started = time.perf_counter()
+    batch = segments_batch(messages)
+    elapsed = time.perf_counter() - started
+    print(
+        f"segments_batch: {count} messages in {elapsed:.2f} s, "
+        f"{elapsed / count * 1e6:.2f} us/message"
+    )
+
+    started = time.perf_counter()
+    transliterated = segments_batch(messages, transliterate=True)
+    elapsed = time.perf_counter() - started
+    print(
+        f"segments_batch(transliterate=True): {elapsed:.2f} s, "
+        f"{elapsed / count * 1e6:.2f} us/message"
+    )
+
+    assert single == batch
+    print(
+        f"parts: {sum(result.parts for result in batch)}, "
+        f"UCS-2: {sum(result.encoding == 'UCS-2' for result in batch)}, "
+        f"after transliteration: "
+        f"{sum(result.parts for result in transliterated)} parts"
+    )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    main(count, distinct)
@@ -0,0 +1,63 @@
+"""
+Matches message texts against a `TemplateIndex` of many templates.
+
+    python benchmarks/template_matching.py [templates] [messages]
+"""
+
+import random
+import sys
+import time
+
+from eskiz.templates import TemplateIndex
+
+WORDS = ["order", "payment", "delivery", "account", "bonus", "visit", "code"]
+
+
+def make_templates(count):
+    rng = random.Random(1)
+    templates = []
+    for index in range(count):
+        word = rng.choice(WORDS)
+        templates.append(
+            f"{word.capitalize()} #{index}: dear %w, your {word} code is %d."
+        )
+    return templates
+
+
+def make_messages(templates, count):
+    rng = random.Random(2)
+    messages = []
+    for _ in range(count):
+        template = rng.choice(templates)
+        text = template.replace("%w", "Aziz").replace(
+            "%d", str(rng.randint(1000, 999999))
+        )
+        # Every tenth message does not conform
+        if rng.random() < 0.1:
+            text += " Extra text"
+        messages.append(text)
+    return messages
+
+
+def main(templates_count: int, messages_count: int):
+    templates = make_templates(templates_count)
+    messages = make_messages(templates, messages_count)
+
+    started = time.perf_counter()
+    index = TemplateIndex(templates)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matched = sum(1 for text in messages if text in index)
+    elapsed = time.perf_counter() - started
+
+    print(f"{templates_count} templates compiled in {built * 1000:.1f} ms")
+    print(
+        f"{messages_count} messages, {matched} matched, "
+        f"{elapsed:.2f} s, {elapsed / messages_count * 1e6:.1f} us/message"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*(args + [5_000, 100_000][len(args) :]))
@@ -1,8 +1,42 @@
 from . import types, utils
 from .api import SMSClient
+from .auth import TokenManager
+from .budget import Budget
+from .bulk import BulkSender
+from .callback import DeliveryReceiver
+from .outbox import Outbox
+from .pool import SMSClientPool
+from .templates import TemplateCache
+from .tracker import DispatchTracker
 from .types import enums
 from .utils import exceptions
+from .utils.breaker import CircuitBreaker
+from .utils.cache import ResponseCache
+from .utils.concurrency import AdaptiveConcurrency
+from .utils.hooks import RequestHook
+from .utils.metrics import Metrics
+from .utils.scheduler import PriorityScheduler
 
-__all__ = ["SMSClient", "types", "enums", "utils", "exceptions"]
+__all__ = [
+    "SMSClient",
+    "BulkSender",
+    "Outbox",
+    "SMSClientPool",
+    "TokenManager",
+    "TemplateCache",
+    "ResponseCache",
+    "PriorityScheduler",
+    "CircuitBreaker",
+    "AdaptiveConcurrency",
+    "Metrics",
+    "RequestHook",
+    "Budget",
+    "DispatchTracker",
+    "DeliveryReceiver",
+    "types",
+    "enums",
+    "utils",
+    "exceptions",
+]
 
 __version__ = "1.0.5"
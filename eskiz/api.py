@@ -1,65 +1,69 @@
 import asyncio
 import contextlib
+import itertools
 import logging
 import ssl
+import time
+import warnings
+from collections import deque
 from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
 
 import aiohttp
 import certifi
-import jwt
+from yarl import URL
 
 from . import types
+from .auth import Token, TokenManager
+from .budget import Budget
+from .templates import TemplateCache, TemplateIndex
+from .types.lazy import LazyModel
 from .utils import exceptions
+from .utils.breaker import CircuitBreaker
+from .utils.cache import ResponseCache
+from .utils.concurrency import AdaptiveConcurrency
+from .utils.encoder import StreamedMessages, encode_messages
 from .utils.fields import _generate_data
-from .utils.methods import Methods
+from .utils.hooks import RequestEvent, RequestHook, _emit, trace_config
+from .utils.message import _check_template
+from .utils.methods import Endpoint, Methods
+from .utils.ratelimit import RateLimiter
+from .utils.retry import RetryPolicy
+from .utils.scheduler import PriorityScheduler
 
 __all__ = ["SMSClient", "SERVICE_URL"]
 
-SERVICE_URL = "notify.eskiz.uz"
-
-
-class Token:
-    """
-    Represents an authentication token.
-
-    - `__str__()`: Returns the string representation of the token.
-    - `is_expired`: Checks if the token is expired.
-    """
-
-    def __init__(self, value: Union[Any, str, None]):
-        self.value = value
+# "model": validated models, "dict": raw JSON, "lazy": `LazyModel` views
+Decoding = Literal["model", "dict", "lazy"]
 
-    def __str__(self) -> str:
-        return str(self.value)
+Payload = Union[Dict[str, Any], str, bytes, AsyncIterable[bytes]]
 
-    @property
-    def is_expired(self):
-        """
-        Checks if the token is expired.
-
-        Returns:
-         - bool: `True` if the token is expired, `False` otherwise.
+SERVICE_URL = "notify.eskiz.uz"
 
-        Raises:
-         - `BearerTokenInvalid`: If an error occurs during token decoding.
-        """
-        try:
-            options = {
-                "verify_signature": False,
-                "verify_exp": True,
-            }
-            jwt.decode(self.value, options=options)
-            return False
-        except jwt.ExpiredSignatureError:
-            return True
-        except jwt.PyJWTError:
-            raise exceptions.BearerTokenInvalid()
+logger = logging.getLogger(__name__)
 
 
 class SMSClient:
     __context_token: ContextVar = ContextVar("EskizBearerToken")
+    __context_decoding: ContextVar = ContextVar("EskizDecoding")
+    __context_deadline: ContextVar = ContextVar("EskizDeadline")
+    __context_lane: ContextVar = ContextVar("EskizLane")
 
     def __init__(
         self,
@@ -71,10 +75,31 @@ class SMSClient:
         loop: Optional[asyncio.AbstractEventLoop] = None,
         json_serialize: Optional[Callable[..., Any]] = None,
         json_deserialize: Optional[Callable[..., Any]] = None,
+        rate_limits: Optional[Dict[str, RateLimiter]] = None,
+        retry: Optional[RetryPolicy] = None,
+        token_manager: Optional[TokenManager] = None,
+        decoding: Decoding = "model",
+        timeout: Union[float, aiohttp.ClientTimeout, None] = None,
+        template_cache: Optional[TemplateCache] = None,
+        template_index: Optional[TemplateIndex] = None,
+        connector: Union[
+            aiohttp.BaseConnector, Callable[[], aiohttp.BaseConnector], None
+        ] = None,
+        budget: Optional[Budget] = None,
+        response_cache: Optional[ResponseCache] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
     ):
-        # Asyncio loop instance
-        if loop is None:
-            loop = asyncio.get_event_loop()
+        # Ignored, kept for compatibility: the running loop is always used
+        if loop is not None:
+            warnings.warn(
+                "The loop argument is deprecated and ignored, the running "
+                "event loop is used",
+                DeprecationWarning,
+                stacklevel=2,
+            )
         self.loop = loop
 
         # JSON
@@ -98,28 +123,75 @@ class SMSClient:
         self._service_url = None
         self.service = service_url
 
-        # aiohttp main session
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        # Endpoint URLs, compiled once per API URL
+        self._base_url: Optional[URL] = None
+        self._base_for: Optional[str] = None
+        self._urls: Dict[Endpoint, URL] = {}
 
-        connector = aiohttp.TCPConnector(
-            limit=connections_limit, ssl=ssl_context, loop=self.loop
-        )
+        # aiohttp main session, created lazily on first request
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._connections_limit = connections_limit
+        self._session: Optional[aiohttp.ClientSession] = None
 
-        self.session = aiohttp.ClientSession(
-            connector=connector, loop=self.loop, json_serialize=json_serialize
-        )
+        # Connector shared with other clients (or a factory of it), the
+        # client never closes it
+        self._connector = connector
+
+        # Connect/read/total timeouts, a number sets the total only
+        if timeout is None:
+            timeout = aiohttp.ClientTimeout(total=300)
+        elif not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        self.timeout = timeout
 
         self._token = token
         self.as_dict = as_dict
+        self.decoding = decoding
 
         self.log_response = log_response
 
-        if log_response:
-            logging.basicConfig(
-                encoding="utf-8",
-                level=logging.INFO,
-                format="%(asctime)s - %(levelname)s - %(message)s",
-            )
+        # Rate limiters by `Methods` group, "*" applies to the rest
+        self.rate_limits: Dict[str, RateLimiter] = rate_limits or {}
+
+        # Retries are disabled unless a policy is given
+        self.retry = retry
+
+        # Proactive token refresh
+        self.token_manager = token_manager
+        if token_manager is not None:
+            token_manager.attach(self)
+
+        # Templates served without round trips once cached
+        self.template_cache = template_cache
+        if template_cache is not None:
+            template_cache.attach(self)
+
+        # Texts matching no template are rejected before sending
+        self.template_index = template_index
+
+        # Sends exceeding the tracked balance are refused or delayed
+        self.budget = budget
+        if budget is not None:
+            budget.attach(self)
+
+        # Read-only methods served from cache, concurrent calls coalesced
+        self.response_cache = response_cache
+
+        # Requests queued by lane, OTPs are not held up by campaigns
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.attach(self)
+
+        # Requests fail fast while the gateway is down
+        self.breaker = breaker
+
+        # Requests in flight shrink as latency or errors climb
+        self.concurrency = concurrency
+        if concurrency is not None:
+            concurrency.attach(self)
+
+        # Metrics and tracing of every request attempt, no cost if empty
+        self.hooks: List[RequestHook] = list(hooks or ())
 
     @property
     def service(self):
@@ -127,14 +199,19 @@ class SMSClient:
 
     @service.setter
     def service(self, value: str):
-        if "." not in value or "://" in value:
+        # An explicit scheme allows any host, e.g. a local `MockGateway`
+        scheme, _, host = value.rpartition("://")
+        if scheme not in ("", "http", "https") or not host:
+            raise ValueError(f"Invalid service URL: {value}")
+        if not scheme and "." not in host:
             raise ValueError(f"Invalid service URL: {value}")
 
-        value = value.rstrip("/")
+        host = host.rstrip("/")
+        scheme = scheme or "https"
 
-        self._service = value
-        self._service_url = f"https://{value}"
-        self._api_url = f"https://{value}/api/"
+        self._service = host
+        self._service_url = f"{scheme}://{host}"
+        self._api_url = f"{scheme}://{host}/api/"
 
     @property
     def api_url(self):
@@ -145,32 +222,394 @@ class SMSClient:
         return self._service_url
 
     def format_api_url(self, method: str, path: str):
-        return method, str(self.api_url) + path
+        """Deprecated, use `url_for`"""
+        warnings.warn(
+            "format_api_url is deprecated, use url_for",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return method, str(self.url_for(Endpoint(method, method, path)))
+
+    def url_for(self, endpoint: Endpoint) -> URL:
+        """
+        Absolute URL of an endpoint. URLs of `Methods` are compiled once,
+        bound endpoints (path parameters, query) are built per call.
+        """
+        base = self._base_url
+        if base is None or self._base_for is not self._api_url:
+            base = self._base_url = URL(str(self._api_url))
+            self._base_for = self._api_url
+            self._urls = {}
+
+        url = self._urls.get(endpoint)
+        if url is not None:
+            return url
+
+        url = base.join(URL(endpoint.path))
+        if endpoint.query:
+            url = url.with_query(endpoint.query)
+
+        if getattr(Methods, endpoint.name, None) is endpoint:
+            self._urls[endpoint] = url
+        return url
+
+    def get_rate_limiter(self, group: Optional[str]) -> Optional[RateLimiter]:
+        """
+        Returns the rate limiter applied to a `Methods` group.
+
+        ```
+        client = SMSClient(rate_limits={
+            "sending": TokenBucket(rate=20),
+            "*": SlidingWindow(limit=100, period=60),
+        })
+        client.get_rate_limiter("sending").queue_depth
+        ```
+        """
+        if group in self.rate_limits:
+            return self.rate_limits[group]
+        return self.rate_limits.get("*")
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Shared `aiohttp` session, created on first use and recreated if it
+        was closed.
+        """
+        if self._session is None or self._session.closed:
+            connector = self._connector
+            if callable(connector):
+                connector = connector()
+
+            if connector is None:
+                connector = aiohttp.TCPConnector(
+                    limit=self._connections_limit, ssl=self._ssl_context
+                )
+                owner = True
+            else:
+                owner = False
+
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                connector_owner=owner,
+                json_serialize=self._json_serialize,
+                timeout=self.timeout,
+                trace_configs=[trace_config()] if self.hooks else None,
+            )
+        return self._session
+
+    async def __aenter__(self) -> "SMSClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _get_timeout(self, deadline: Optional[float]) -> aiohttp.ClientTimeout:
+        remaining = _remaining(deadline)
+        if remaining is None:
+            return self.timeout
+
+        total = self.timeout.total
+        return aiohttp.ClientTimeout(
+            total=remaining if total is None else min(total, remaining),
+            connect=self.timeout.connect,
+            sock_read=self.timeout.sock_read,
+            sock_connect=self.timeout.sock_connect,
+        )
+
+    def _spend(
+        self, texts: Iterable[str], token: Optional[str]
+    ) -> AsyncContextManager:
+        # Per-call tokens may belong to another account
+        if self.budget is None or token is not None:
+            return _no_budget()
+        return self.budget.spend(texts)
+
+    def _check_templates(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            _check_template(self.template_index, text)
 
     async def handle_error(self, error_text=None):
-        await self.close()  # close session
+        # Errors never close the session shared by concurrent requests
         raise exceptions.EskizError.detect(error_text)
 
     async def request(
         self,
-        method: Dict,
+        method: Endpoint,
         *,
-        payload: Optional[Union[Dict[str, Any], str]] = None,
+        payload: Optional[Payload] = None,
         headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        cache: bool = True,
     ):
-        _method, url = self.format_api_url(**method)
+        """
+        Sends an API request. Read-only methods are served from the
+        `response_cache` unless `cache` is False.
+        """
+        store = self.response_cache if cache else None
+        ttl = store.get_ttl(method) if store is not None else 0
+        if store is not None and ttl > 0:
+            return await store.fetch(
+                store.key(method, payload, headers),
+                ttl,
+                lambda: self._request_with_deadline(
+                    method, payload=payload, headers=headers, timeout=timeout
+                ),
+            )
 
+        return await self._request_with_deadline(
+            method,
+            payload=payload,
+            headers=headers,
+            timeout=timeout,
+        )
+
+    async def _request_with_deadline(
+        self,
+        method: Endpoint,
+        *,
+        payload: Optional[Payload] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        if timeout is None:
+            return await self._request_with_auth(
+                method,
+                payload=payload,
+                headers=headers,
+            )
+
+        with self.with_deadline(timeout):
+            return await self._request_with_auth(
+                method,
+                payload=payload,
+                headers=headers,
+            )
+
+    async def _request_with_auth(
+        self,
+        method: Endpoint,
+        *,
+        payload: Optional[Payload] = None,
+        headers: Optional[Dict] = None,
+    ):
+        manager = self.token_manager
+        if manager is None or method in (
+            Methods.GET_TOKEN,
+            Methods.REFRESH_TOKEN,
+        ):
+            return await self._request_with_retry(
+                method,
+                payload=payload,
+                headers=headers,
+            )
+
+        stale = self._token
+        await manager.ensure_fresh()
+        headers = _swap_header_token(headers, stale, self._token)
+
+        try:
+            return await self._request_with_retry(
+                method,
+                payload=payload,
+                headers=headers,
+            )
+        except (
+            exceptions.BearerTokenInvalid,
+            exceptions.AuthCredsInvalid,
+        ):
+            # Only the managed token can be renewed, not per-call ones
+            stale = self._token
+            if not _has_header_token(headers, stale):
+                raise
+
+            await manager.refresh(stale)
+            headers = _swap_header_token(headers, stale, self._token)
+
+        return await self._request_with_retry(
+            method,
+            payload=payload,
+            headers=headers,
+        )
+
+    async def _request_with_retry(
+        self,
+        method: Endpoint,
+        *,
+        payload: Optional[Payload] = None,
+        headers: Optional[Dict] = None,
+    ):
+        policy = self.retry
+        if policy is None:
+            return await self._request(
+                method,
+                payload=payload,
+                headers=headers,
+                event=self._event(method, 1),
+            )
+
+        idempotent = method.idempotent or policy.resend
+
+        deadline = self.__context_deadline.get(None)
+        if policy.deadline is not None:
+            budget = time.monotonic() + policy.deadline
+            deadline = budget if deadline is None else min(deadline, budget)
+
+        attempt = 1
+        while True:
+            event = self._event(method, attempt)
+            try:
+                return await self._request(
+                    method, payload=payload, headers=headers, event=event
+                )
+            except Exception as error:
+                if attempt >= policy.max_attempts:
+                    raise
+                if not policy.is_retryable(error, idempotent=idempotent):
+                    raise
+
+                delay = policy.get_delay(attempt)
+                if (
+                    deadline is not None
+                    and time.monotonic() + delay > deadline
+                ):
+                    raise
+
+            if event is not None:
+                _emit(self.hooks, "on_retry", event, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _event(self, method: Endpoint, attempt: int) -> Optional[RequestEvent]:
+        if not self.hooks:
+            return None
+        return RequestEvent(method.name, method.group, attempt)
+
+    async def _request(
+        self,
+        method: Endpoint,
+        *,
+        payload: Optional[Payload] = None,
+        headers: Optional[Dict] = None,
+        event: Optional[RequestEvent] = None,
+    ):
+        if event is None:
+            return await self._attempt(method, payload, headers, None)
+
+        _emit(self.hooks, "on_start", event)
+        try:
+            return await self._attempt(method, payload, headers, event)
+        except BaseException as error:
+            event.error = error
+            raise
+        finally:
+            event.duration = time.monotonic() - event.started
+            _emit(self.hooks, "on_end", event)
+
+    async def _attempt(
+        self,
+        method: Endpoint,
+        payload: Optional[Payload],
+        headers: Optional[Dict],
+        event: Optional[RequestEvent],
+    ):
+        url = self.url_for(method)
+
+        deadline = self.__context_deadline.get(None)
+        try:
+            async with self._slot(method, deadline):
+                return await self._send(
+                    method.method,
+                    url,
+                    payload=payload,
+                    headers=headers,
+                    timeout=self._get_timeout(deadline),
+                    event=event,
+                )
+        except exceptions.RequestTimeout:
+            raise
+        except asyncio.TimeoutError as error:
+            raise exceptions.RequestTimeout(
+                exceptions.RequestTimeout.get_text()
+            ) from error
+
+    @contextlib.asynccontextmanager
+    async def _slot(
+        self, method: Endpoint, deadline: Optional[float]
+    ) -> AsyncIterator[None]:
+        """Waits for the rate limit and a free slot to send a request"""
+        breaker = self.breaker
+        if breaker is not None:
+            breaker.check()
+
+        async with contextlib.AsyncExitStack() as stack:
+            limiter = self.get_rate_limiter(method.group)
+            scheduler = self.scheduler
+            if scheduler is not None:
+                # The rate-limit token is taken along with the slot
+                lane = self.__context_lane.get(None)
+                if lane is None:
+                    lane = scheduler.lane_for(method)
+                await asyncio.wait_for(
+                    scheduler.acquire(lane, limiter), _remaining(deadline)
+                )
+                stack.callback(scheduler.release, lane)
+            elif limiter is not None:
+                await asyncio.wait_for(limiter.acquire(), _remaining(deadline))
+
+            if self.concurrency is not None:
+                await asyncio.wait_for(
+                    stack.enter_async_context(self.concurrency.slot()),
+                    _remaining(deadline),
+                )
+
+            # Only the time spent sending counts towards the breaker
+            if breaker is not None:
+                stack.enter_context(breaker.call())
+            yield
+
+    async def _send(
+        self,
+        method: str,
+        url: Union[str, URL],
+        *,
+        payload: Optional[Payload],
+        headers: Optional[Dict],
+        timeout: aiohttp.ClientTimeout,
+        event: Optional[RequestEvent] = None,
+    ):
         async with self.session.request(
-            method=_method,
+            method=method,
             url=url,
             data=payload,
             headers=headers,
+            timeout=timeout,
+            trace_request_ctx=event,
         ) as response:
+            if event is not None:
+                event.status = response.status
+
+            if response.status == 429:
+                raise exceptions.EskizError.detect("TOO_MANY_REQUESTS")
+
+            if response.status >= 500:
+                raise exceptions.EskizError.detect("SERVER_ERROR")
 
             json_data = await response.json(loads=self._json_deserialize)
 
             if self.log_response:
-                logging.info(str(json_data))
+                # Bodies hold phone numbers and texts, they are not logged
+                summary = None
+                if isinstance(json_data, dict):
+                    summary = json_data.get("status") or json_data.get(
+                        "message"
+                    )
+                logger.info(
+                    "%s %s: HTTP %s, %s",
+                    method,
+                    URL(url).path,
+                    response.status,
+                    summary,
+                )
 
             if "status" in json_data and json_data["status"] == "fail":
                 error_text = json_data["data"]["alert"]
@@ -212,11 +651,96 @@ class SMSClient:
         yield
         self.__context_token.reset(context_token)
 
+    @contextlib.contextmanager
+    def with_deadline(self, seconds: float):
+        """
+        Share one time budget between all requests in the current context,
+        including nested calls, tasks started inside and retries.
+
+        ```
+        with client.with_deadline(5):
+            await client.get_limit()
+            await client.send_sms(998991234567, "hi")
+        ```
+        Args: seconds (float)
+
+        Raises `RequestTimeout` once the budget is spent.
+        """
+        deadline = time.monotonic() + seconds
+        outer = self.__context_deadline.get(None)
+        if outer is not None:
+            deadline = min(deadline, outer)
+
+        context_deadline = self.__context_deadline.set(deadline)
+        try:
+            yield
+        finally:
+            self.__context_deadline.reset(context_deadline)
+
+    @contextlib.contextmanager
+    def with_decoding(self, decoding: Decoding):
+        """
+        Choose how responses are decoded in the current context.
+
+        ```
+        # Rows are validated only when their fields are read
+        with client.with_decoding("lazy"):
+            details = await client.get_message_details(start, end)
+        ```
+        Args: decoding ("model", "dict" or "lazy")
+        """
+        context_decoding = self.__context_decoding.set(decoding)
+        try:
+            yield
+        finally:
+            self.__context_decoding.reset(context_decoding)
+
+    @contextlib.contextmanager
+    def with_lane(self, lane: str):
+        """
+        Send requests of the current context through a `scheduler` lane
+        instead of the one their method is routed to.
+
+        ```
+        # Verification codes sent in batches still skip the campaign queue
+        with client.with_lane("critical"):
+            await client.send_batch_sms(codes)
+        ```
+        Args: lane (str)
+        """
+        context_lane = self.__context_lane.set(lane)
+        try:
+            yield
+        finally:
+            self.__context_lane.reset(context_lane)
+
+    def _build(self, model: Type[types.base.EskizBaseModel], raw: Any) -> Any:
+        decoding = self.__context_decoding.get(None)
+        if decoding is None:
+            decoding = "dict" if self.as_dict else self.decoding
+
+        if decoding == "dict":
+            return raw
+        if decoding == "lazy":
+            return LazyModel(model, raw)
+        return model(**(raw or {}))
+
     async def close(self) -> None:
         """
-        Closes the session.
+        Closes the session, the next request opens a new one.
         """
-        await self.session.close()
+        if self.token_manager is not None:
+            await self.token_manager.stop()
+
+        if self.template_cache is not None:
+            await self.template_cache.stop()
+
+        if self.budget is not None:
+            await self.budget.stop()
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def _set_header_token(self, token: Optional[str]):
         headers: Dict[str, str] = {}
@@ -230,7 +754,12 @@ class SMSClient:
         return headers
 
     async def get_token(
-        self, email: str, password: str, *, auth: bool = True
+        self,
+        email: str,
+        password: str,
+        *,
+        auth: bool = True,
+        timeout: Optional[float] = None,
     ) -> str:
         """For authorization use this API, returns a token
 
@@ -242,8 +771,10 @@ class SMSClient:
         Returns:
             str: token
         """
-        payload = _generate_data(**locals())
-        raw = await self.request(Methods.GET_TOKEN, payload=payload)
+        payload = _generate_data(**locals(), exclude=["timeout"])
+        raw = await self.request(
+            Methods.GET_TOKEN, payload=payload, timeout=timeout
+        )
         response = types.TokenResponse(**raw)
 
         if auth:
@@ -252,7 +783,11 @@ class SMSClient:
         return self.token.__str__()
 
     async def refresh_token(
-        self, token: Optional[str] = None, auth: bool = True
+        self,
+        token: Optional[str] = None,
+        auth: bool = True,
+        *,
+        timeout: Optional[float] = None,
     ) -> str:
         """Updates the current token
 
@@ -263,7 +798,9 @@ class SMSClient:
             _type_: str
         """
         headers = self._set_header_token(token)
-        raw = await self.request(Methods.REFRESH_TOKEN, headers=headers)
+        raw = await self.request(
+            Methods.REFRESH_TOKEN, headers=headers, timeout=timeout
+        )
         response = types.TokenResponse(**raw)
 
         if auth:
@@ -272,7 +809,7 @@ class SMSClient:
         return self.token.__str__()
 
     async def get_user_data(
-        self, token: Optional[str] = None
+        self, token: Optional[str] = None, *, timeout: Optional[float] = None
     ) -> Union[types.User, Dict]:
         """Returns all user data
 
@@ -281,15 +818,18 @@ class SMSClient:
         """
         headers = self._set_header_token(token)
 
-        raw = await self.request(Methods.GET_USER_DATA, headers=headers)
-
-        if self.as_dict:
-            return raw
+        raw = await self.request(
+            Methods.GET_USER_DATA, headers=headers, timeout=timeout
+        )
 
-        return types.User(**(raw or {}))
+        return self._build(types.User, raw)
 
     async def get_template(
-        self, id: Union[int, str], *, token: Optional[str] = None
+        self,
+        id: Union[int, str],
+        *,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.Template, Dict]:
         """Get template by ID
 
@@ -299,37 +839,49 @@ class SMSClient:
         Returns:
             Union[types.Template, Dict]
         """
-        headers = self._set_header_token(token)
+        # Per-call tokens may belong to another account, skip the cache
+        cache = self.template_cache if token is None else None
+        if cache is not None:
+            cached = cache.get(id)
+            if cached is not None:
+                return self._build(types.Template, cached)
 
-        method = Methods.GET_TEMPLATE
+        headers = self._set_header_token(token)
 
-        path = method.get("path")
-        if isinstance(path, str):
-            method["path"] = path.format(id=id)
+        raw = await self.request(
+            Methods.GET_TEMPLATE.bind(id=id), headers=headers, timeout=timeout
+        )
 
-        raw = await self.request(method, headers=headers)
+        if cache is not None:
+            cache.put(raw)
 
-        if self.as_dict:
-            return raw
-
-        return types.Template(**(raw or {}))
+        return self._build(types.Template, raw)
 
     async def get_template_list(
-        self, token: Optional[str] = None
+        self, token: Optional[str] = None, *, timeout: Optional[float] = None
     ) -> Union[types.TemplateList, Dict]:
         """Get all templates
 
+        With a `template_cache`, every page is fetched and returned as one.
+
         Returns:
             Union[types.TemplateList, Dict]
         """
-        headers = self._set_header_token(token)
+        cache = self.template_cache if token is None else None
+        if cache is not None:
+            raw = cache.get_list()
+            if raw is None:
+                raw = await cache.fetch_list(timeout=timeout)
+            cache.start()
+            return self._build(types.TemplateList, raw)
 
-        raw = await self.request(Methods.GET_TEMPLATE_LIST, headers=headers)
+        headers = self._set_header_token(token)
 
-        if self.as_dict:
-            return raw
+        raw = await self.request(
+            Methods.GET_TEMPLATE_LIST, headers=headers, timeout=timeout
+        )
 
-        return types.TemplateList(**(raw or {}))
+        return self._build(types.TemplateList, raw)
 
     async def send_sms(
         self,
@@ -338,7 +890,9 @@ class SMSClient:
         *,
         from_: str = "4546",
         callback_url: Optional[str] = None,
+        user_sms_id: Optional[str] = None,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.MessageResponse, Dict]:
         """Send SMS
 
@@ -360,29 +914,41 @@ class SMSClient:
               "status_date": "2021-04-02 00:39:36"
             }
             ```
+            - user_sms_id (Optional[str], optional): Your message ID.
+            Defaults to None.
 
         Returns:
             Union[types.MessageResponse, Dict]
         """
-        payload = _generate_data(**locals(), exclude=["token"])
-        headers = self._set_header_token(token)
+        self._check_templates([message])
 
-        raw = await self.request(
-            Methods.SEND_SMS, payload=payload, headers=headers
-        )
+        payload = _generate_data(**locals(), exclude=["token", "timeout"])
+        headers = self._set_header_token(token)
 
-        if self.as_dict:
-            return raw
+        async with self._spend([message], token):
+            raw = await self.request(
+                Methods.SEND_SMS,
+                payload=payload,
+                headers=headers,
+                timeout=timeout,
+            )
 
-        return types.MessageResponse(**raw)
+        return self._build(types.MessageResponse, raw)
 
     async def send_batch_sms(
-        self, to: types.Messages, *, token: Optional[str] = None
+        self,
+        to: types.Messages,
+        *,
+        stream: bool = False,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.MessageResponse, Dict]:
         """Broadcast
 
         Args:
             - to (types.Messages)
+            - stream (bool, optional): Send the body with chunked transfer
+            encoding instead of encoding it in memory. Defaults to False.
 
         Use `MessageBuilder`:
         ```py
@@ -398,18 +964,28 @@ class SMSClient:
         Returns:
             Union[types.MessageResponse, Dict]:
         """
-        headers = self._set_header_token(token)
-        json = to.model_dump_json(by_alias=True)
-        payload = self._json_serialize(json)
+        self._check_templates({message.text for message in to.messages})
 
-        raw = await self.request(
-            Methods.SEND_BATCH_SMS, payload=payload, headers=headers
-        )
+        headers = self._set_header_token(token)
+        headers["Content-Type"] = "application/json"
 
-        if self.as_dict:
-            return raw
+        payload: Union[bytes, StreamedMessages]
+        if stream:
+            payload = StreamedMessages(to)
+        else:
+            payload = encode_messages(to)
+
+        # Every message carries its own `user_sms_id`
+        texts = (message.text for message in to.messages)
+        async with self._spend(texts, token):
+            raw = await self.request(
+                Methods.SEND_BATCH_SMS,
+                payload=payload,
+                headers=headers,
+                timeout=timeout,
+            )
 
-        return types.MessageResponse(**raw)
+        return self._build(types.MessageResponse, raw)
 
     async def send_international_sms(
         self,
@@ -420,6 +996,7 @@ class SMSClient:
         callback_url: Optional[str] = None,
         unicode: int = 0,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Dict:
         """Using this API you can send SMS to foreign countries around the world.
 
@@ -434,12 +1011,15 @@ class SMSClient:
             Dict
         """
         payload = _generate_data(
-            **locals(), exclude=["token"], is_payload=True
+            **locals(), exclude=["token", "timeout"], is_payload=True
         )
         headers = self._set_header_token(token)
 
         raw = await self.request(
-            Methods.SEND_INTERNATIONAL_SMS, payload=payload, headers=headers
+            Methods.SEND_INTERNATIONAL_SMS,
+            payload=payload,
+            headers=headers,
+            timeout=timeout,
         )
 
         if self.as_dict:
@@ -455,7 +1035,9 @@ class SMSClient:
         *,
         page_size: int = 20,
         count: int = 0,
+        page: Optional[int] = None,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.MessageDetails, Dict]:
         """Message Detailing
 
@@ -464,6 +1046,7 @@ class SMSClient:
             - end_date (Union[str, datetime])
             - page_size (int, optional) Defaults to 20.
             - count (int, optional) Defaults to 0.
+            - page (Optional[int], optional) Defaults to None (first page).
 
         Returns:
             Union[types.MessageDetails, Dict]
@@ -474,45 +1057,151 @@ class SMSClient:
         if isinstance(end_date, datetime):
             end_date = end_date.strftime("%Y-%m-%d %H:%M")
 
-        payload = _generate_data(**locals(), exclude=["token"])
+        payload = _generate_data(**locals(), exclude=["token", "timeout"])
         headers = self._set_header_token(token)
 
         raw = await self.request(
-            Methods.GET_MESSAGE_DETAILS, payload=payload, headers=headers
+            Methods.GET_MESSAGE_DETAILS,
+            payload=payload,
+            headers=headers,
+            timeout=timeout,
         )
 
-        if self.as_dict:
-            return raw
-
-        return types.MessageDetails(**(raw or {}))
+        return self._build(types.MessageDetails, raw)
 
     async def get_message_by_dispatch(
         self,
         user_id: int,
         dispatch_id: Union[str, int],
         *,
+        page: Optional[int] = None,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ):
         """Receive all sent SMS via ID mailing
 
         Args:
             - user_id (int)
             - dispatch_id (Union[str, int])
+            - page (Optional[int], optional) Defaults to None (first page).
 
         Returns:
             Union[types.MessageDetails, Dict]
         """
-        payload = _generate_data(**locals(), exclude=["token"])
+        payload = _generate_data(**locals(), exclude=["token", "timeout"])
         headers = self._set_header_token(token)
 
         raw = await self.request(
-            Methods.GET_MESSAGE_BY_DISPATCH, payload=payload, headers=headers
+            Methods.GET_MESSAGE_BY_DISPATCH,
+            payload=payload,
+            headers=headers,
+            timeout=timeout,
         )
 
-        if self.as_dict:
-            return raw
+        return self._build(types.MessageDetails, raw)
+
+    def iter_message_details(
+        self,
+        start_date: Union[str, datetime],
+        end_date: Union[str, datetime],
+        *,
+        page_size: int = 20,
+        prefetch: int = 2,
+        token: Optional[str] = None,
+    ) -> AsyncIterator[Union[types.sms.Result, Dict]]:
+        """Iterate over every message in a date range, page by page
+
+        Up to `prefetch` (at least one) following pages are fetched
+        concurrently while the current one is consumed, so memory stays
+        bounded.
+
+        ```
+        async for row in client.iter_message_details(start, end):
+            print(row.id, row.status)
+        ```
+
+        Args:
+            - start_date (Union[str, datetime])
+            - end_date (Union[str, datetime])
+            - page_size (int, optional) Defaults to 20.
+            - prefetch (int, optional) Defaults to 2.
+
+        Returns:
+            AsyncIterator[Union[types.sms.Result, Dict]]
+        """
+        if isinstance(start_date, datetime):
+            start_date = start_date.strftime("%Y-%m-%d %H:%M")
+
+        if isinstance(end_date, datetime):
+            end_date = end_date.strftime("%Y-%m-%d %H:%M")
+
+        payload = _generate_data(
+            start_date=start_date, end_date=end_date, page_size=page_size
+        )
+
+        return self._iter_rows(
+            Methods.GET_MESSAGE_DETAILS, payload, prefetch, token
+        )
+
+    def iter_dispatch_messages(
+        self,
+        user_id: int,
+        dispatch_id: Union[str, int],
+        *,
+        prefetch: int = 2,
+        token: Optional[str] = None,
+    ) -> AsyncIterator[Union[types.sms.Result, Dict]]:
+        """Iterate over every message of a mailing, page by page
+
+        Args:
+            - user_id (int)
+            - dispatch_id (Union[str, int])
+            - prefetch (int, optional) Defaults to 2.
+
+        Returns:
+            AsyncIterator[Union[types.sms.Result, Dict]]
+        """
+        payload = _generate_data(user_id=user_id, dispatch_id=dispatch_id)
+
+        return self._iter_rows(
+            Methods.GET_MESSAGE_BY_DISPATCH, payload, prefetch, token
+        )
+
+    async def _iter_rows(
+        self,
+        method: Endpoint,
+        payload: Any,
+        prefetch: int,
+        token: Optional[str],
+    ) -> AsyncIterator[Any]:
+        headers = self._set_header_token(token)
+
+        async def fetch(page: int) -> Dict:
+            data = {**payload, "page": page}
+            return await self.request(method, payload=data, headers=headers)
+
+        raw = await fetch(1)
+        pages = iter(range(2, int(raw["data"]["last_page"]) + 1))
 
-        return types.MessageDetails(**(raw or {}))
+        window: Deque[asyncio.Future] = deque(
+            asyncio.ensure_future(fetch(page))
+            for page in itertools.islice(pages, max(prefetch, 1))
+        )
+        try:
+            while True:
+                for row in raw["data"]["result"]:
+                    yield self._build(types.sms.Result, row)
+
+                if not window:
+                    break
+
+                raw = await window.popleft()
+                for page in itertools.islice(pages, 1):
+                    window.append(asyncio.ensure_future(fetch(page)))
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
 
     async def get_dispatch_status(
         self,
@@ -520,6 +1209,7 @@ class SMSClient:
         dispatch_id: Union[str, int],
         *,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.BroadcastStatus, Dict]:
         """Get broadcast status
 
@@ -530,19 +1220,21 @@ class SMSClient:
         Returns:
             Union[types.BroadcastStatus, Dict]
         """
-        payload = _generate_data(**locals(), exclude=["token"])
+        payload = _generate_data(**locals(), exclude=["token", "timeout"])
         headers = self._set_header_token(token)
 
         raw = await self.request(
-            Methods.GET_DISPATCH_STATUS, payload=payload, headers=headers
+            Methods.GET_DISPATCH_STATUS,
+            payload=payload,
+            headers=headers,
+            timeout=timeout,
         )
 
-        if self.as_dict:
-            return raw
-
-        return types.BroadcastStatus(**(raw or {}))
+        return self._build(types.BroadcastStatus, raw)
 
-    async def get_nick_list(self, token: Optional[str] = None) -> List[str]:
+    async def get_nick_list(
+        self, token: Optional[str] = None, *, timeout: Optional[float] = None
+    ) -> List[str]:
         """Get nickname list
 
         Returns:
@@ -550,7 +1242,9 @@ class SMSClient:
         """
         headers = self._set_header_token(token)
 
-        raw = await self.request(Methods.GET_NICK_LIST, headers=headers)
+        raw = await self.request(
+            Methods.GET_NICK_LIST, headers=headers, timeout=timeout
+        )
 
         return raw
 
@@ -561,6 +1255,7 @@ class SMSClient:
         *,
         is_global: int = 0,
         token: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Union[types.TotalMessages, Dict]:
         """SMS Totals
 
@@ -572,26 +1267,17 @@ class SMSClient:
         Returns:
             Union[types.TotalMessages, Dict]
         """
-        filters = _generate_data(
-            **locals(), exclude=["token"], is_payload=False
-        )
+        filters = {"year": year, "month": month, "is_global": is_global}
         headers = self._set_header_token(token)
 
-        method = Methods.GET_SMS_TOTALS
-
-        path = method.get("path")
-        if isinstance(path, str) and isinstance(filters, str):
-            method["path"] += "?" + filters
+        method = Methods.GET_SMS_TOTALS.with_query(filters)
 
-        raw = await self.request(method, headers=headers)
-
-        if self.as_dict:
-            return raw
+        raw = await self.request(method, headers=headers, timeout=timeout)
 
-        return types.TotalMessages(**raw)
+        return self._build(types.TotalMessages, raw)
 
     async def get_limit(
-        self, token: Optional[str] = None
+        self, token: Optional[str] = None, *, timeout: Optional[float] = None
     ) -> Union[types.UserLimit, Dict]:
         """Get Limit
 
@@ -600,9 +1286,44 @@ class SMSClient:
         """
         headers = self._set_header_token(token)
 
-        raw = await self.request(Methods.GET_LIMIT, headers=headers)
+        raw = await self.request(
+            Methods.GET_LIMIT, headers=headers, timeout=timeout
+        )
 
-        if self.as_dict:
-            return raw
+        return self._build(types.UserLimit, raw)
+
+
+@contextlib.asynccontextmanager
+async def _no_budget() -> AsyncIterator[None]:
+    yield
+
+
+def _has_header_token(headers: Optional[Dict], token: Optional[str]) -> bool:
+    if not headers:
+        return False
+    return headers.get("Authorization") == f"Bearer {token}"
+
+
+def _swap_header_token(
+    headers: Optional[Dict], old: Optional[str], new: Optional[str]
+) -> Optional[Dict]:
+    if old == new or new is None:
+        return headers
+
+    # Tokens passed per call (`token=`, `with_token`) are never replaced
+    if _has_header_token(headers, old) or (
+        old is None and "Authorization" not in (headers or {})
+    ):
+        return {**(headers or {}), "Authorization": f"Bearer {new}"}
+
+    return headers
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
 
-        return types.UserLimit(**(raw or {}))
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise exceptions.RequestTimeout(exceptions.RequestTimeout.get_text())
+    return remaining
@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import functools
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import jwt
+
+from .utils import exceptions
+
+if TYPE_CHECKING:
+    from .api import SMSClient
+
+__all__ = ["Token", "TokenManager"]
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=64)
+def _decode_expiry(value: str) -> Optional[float]:
+    try:
+        exp = jwt.decode(
+            value, options={"verify_signature": False, "verify_exp": False}
+        ).get("exp")
+    except jwt.PyJWTError:
+        raise exceptions.BearerTokenInvalid()
+
+    return None if exp is None else float(exp)
+
+
+class Token:
+    """
+    Represents an authentication token.
+
+    - `__str__()`: Returns the string representation of the token.
+    - `expires_at`: The `exp` claim, decoded once per token value.
+    - `is_expired`: Checks if the token is expired.
+    """
+
+    def __init__(self, value: Union[Any, str, None]):
+        self.value = value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """
+        Returns:
+         - Optional[float]: Expiry timestamp, `None` if the token has none.
+
+        Raises:
+         - `BearerTokenInvalid`: If an error occurs during token decoding.
+        """
+        return _decode_expiry(str(self.value))
+
+    @property
+    def is_expired(self):
+        """
+        Checks if the token is expired.
+
+        Returns:
+         - bool: `True` if the token is expired, `False` otherwise.
+
+        Raises:
+         - `BearerTokenInvalid`: If an error occurs during token decoding.
+        """
+        expires_at = self.expires_at
+        return expires_at is not None and expires_at <= time.time()
+
+
+class TokenManager:
+    """
+    Keeps the client token fresh.
+
+    The token is refreshed in the background `margin` seconds before it
+    expires. Concurrent refreshes are coalesced into one `auth/refresh`
+    call, falling back to `auth/login` when `email` and `password` are
+    given. Requests rejected with an invalid token are retried once.
+
+    ```
+    client = SMSClient(
+        token_manager=TokenManager(email="EMAIL", password="PASSWORD")
+    )
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        email: Optional[str] = None,
+        password: Optional[str] = None,
+        margin: float = 60.0,
+        retry_delay: float = 10.0,
+    ):
+        self.email = email
+        self.password = password
+        self.margin = margin
+        self.retry_delay = retry_delay
+
+        self._client: Optional["SMSClient"] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Future] = None
+        self._task_token: Optional[str] = None
+
+    @property
+    def client(self) -> "SMSClient":
+        if self._client is None:
+            raise RuntimeError("TokenManager is not attached to a client")
+        return self._client
+
+    def attach(self, client: "SMSClient") -> None:
+        if self._client is not None and self._client is not client:
+            raise RuntimeError("TokenManager is attached to another client")
+        self._client = client
+
+    @property
+    def can_login(self) -> bool:
+        return self.email is not None and self.password is not None
+
+    def _expires_at(self) -> Optional[float]:
+        token = self.client._token
+        if token is None:
+            return None
+        try:
+            return Token(token).expires_at
+        except exceptions.BearerTokenInvalid:
+            return None
+
+    async def ensure_fresh(self) -> None:
+        """Refreshes the token now if it expires within `margin`."""
+        self.start()
+
+        if self.client._token is None:
+            if self.can_login:
+                await self.refresh(None)
+            return
+
+        expires_at = self._expires_at()
+        if expires_at is not None and expires_at - self.margin <= time.time():
+            await self.refresh(self.client._token)
+
+    async def refresh(self, stale: Optional[str]) -> None:
+        """
+        Replaces the `stale` token, doing nothing if it was already
+        replaced. Concurrent callers share a single refresh.
+        """
+        if self.client._token != stale:
+            return
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+
+        await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> None:
+        token = self.client._token
+
+        if token is not None:
+            try:
+                await self.client.refresh_token(token)
+                return
+            except exceptions.EskizError:
+                if not self.can_login:
+                    raise
+                logger.warning("Token refresh failed, logging in again")
+
+        if not self.can_login:
+            raise exceptions.BearerTokenInvalid()
+
+        await self.client.get_token(str(self.email), str(self.password))
+
+    def start(self) -> None:
+        """Starts background refresh in the running loop."""
+        token = self.client._token
+        if self._task is not None:
+            if not self._task.done() or self._task_token == token:
+                return
+
+        self._task_token = token
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expires_at = self._expires_at()
+            if expires_at is None:
+                return
+
+            delay = expires_at - self.margin - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                await self.refresh(self.client._token)
+            except Exception:
+                logger.exception("Background token refresh failed")
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            # New token already inside the margin, don't spin on it
+            expires_at = self._expires_at()
+            if (
+                expires_at is not None
+                and expires_at - self.margin <= time.time()
+            ):
+                await asyncio.sleep(self.retry_delay)
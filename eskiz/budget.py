@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Optional
+
+from .utils import exceptions
+from .utils.methods import Methods
+from .utils.retry import is_unsent
+from .utils.segments import price
+
+if TYPE_CHECKING:
+    from .api import SMSClient
+
+__all__ = ["Budget"]
+
+logger = logging.getLogger(__name__)
+
+
+class Budget:
+    """
+    Tracks the account balance locally to admit or refuse sends.
+
+    The balance is seeded from `get_limit` and decremented by
+    `price_per_part` for every SMS part sent, estimated from the texts,
+    so sends need no extra round trip. It is reconciled with the server
+    every `reconcile_interval` seconds in the background.
+
+    A send that would take the balance below `floor` raises
+    `InsufficientBalance`, or waits until the balance allows it when
+    `wait` is set.
+
+    ```
+    client = SMSClient(token="TOKEN", budget=Budget(price_per_part=50))
+    client.budget.balance  # estimated balance left
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        price_per_part: float = 1.0,
+        floor: float = 0.0,
+        reconcile_interval: float = 60.0,
+        wait: bool = False,
+    ):
+        self.price_per_part = price_per_part
+        self.floor = floor
+        self.reconcile_interval = reconcile_interval
+        self.wait = wait
+
+        # Last balance from the server, spent and reserved since then
+        self._balance: Optional[float] = None
+        self._spent = 0.0
+        self._pending = 0.0
+
+        self._client: Optional["SMSClient"] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._seeding: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def client(self) -> "SMSClient":
+        if self._client is None:
+            raise RuntimeError("Budget is not attached to a client")
+        return self._client
+
+    def attach(self, client: "SMSClient") -> None:
+        if self._client is not None and self._client is not client:
+            raise RuntimeError("Budget is attached to another client")
+        self._client = client
+
+    @property
+    def balance(self) -> Optional[float]:
+        """Estimated balance, `None` until seeded"""
+        if self._balance is None:
+            return None
+        return self._balance - self._spent - self._pending
+
+    @property
+    def available(self) -> float:
+        """What can be spent before reaching `floor`"""
+        balance = self.balance
+        if balance is None:
+            return 0.0
+        return max(balance - self.floor, 0.0)
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily to bind to the running loop
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def cost(self, texts: Iterable[str]) -> float:
+        """Price of sending each of `texts` once"""
+        return price(texts, self.price_per_part)
+
+    async def acquire(self, cost: float) -> None:
+        """
+        Reserves `cost` until `commit` or `release`.
+
+        Raises:
+         - `InsufficientBalance`: If `cost` exceeds the available balance
+         and `wait` is not set, or exceeds the whole balance.
+        """
+        if self._balance is None:
+            await self._seed()
+        assert self._balance is not None
+        self.start()
+
+        if cost > self.available:
+            # Waiting would not end until the account is topped up
+            if not self.wait or cost > self._balance - self.floor:
+                raise exceptions.InsufficientBalance(
+                    f"Sending costs {cost:g}, {self.available:g} available"
+                )
+
+            async with self.condition:
+                await self.condition.wait_for(lambda: cost <= self.available)
+
+        self._pending += cost
+
+    def commit(self, cost: float) -> None:
+        """Marks a reservation as spent"""
+        self._pending -= cost
+        self._spent += cost
+
+    def release(self, cost: float) -> None:
+        """Returns a reservation of a send that failed"""
+        self._pending -= cost
+        self._notify()
+
+    @contextlib.asynccontextmanager
+    async def spend(self, texts: Iterable[str]) -> AsyncIterator[float]:
+        """
+        Reserves the cost of `texts` for the body of the block. It is
+        returned if the block raises an error proving nothing was sent
+        (see `is_unsent`), and spent otherwise: after a 5xx or a timeout
+        the gateway may have billed the send.
+        """
+        cost = self.cost(texts)
+        await self.acquire(cost)
+        try:
+            yield cost
+        except BaseException as error:
+            if is_unsent(error):
+                self.release(cost)
+            else:
+                self.commit(cost)
+            raise
+        self.commit(cost)
+
+    async def reconcile(self) -> None:
+        """Replaces the estimate with the balance from `get_limit`"""
+        client = self.client
+        headers = client._set_header_token(None)
+        # Sends committed during the request may be missing from it
+        spent = self._spent
+        raw = await client.request(
+            Methods.GET_LIMIT, headers=headers, cache=False
+        )
+
+        self._balance = float(raw["data"]["balance"])
+        self._spent -= spent
+        self._notify()
+
+    async def _seed(self) -> None:
+        # Concurrent first sends share one `get_limit`
+        if self._seeding is None or self._seeding.done():
+            self._seeding = asyncio.ensure_future(self.reconcile())
+        await asyncio.shield(self._seeding)
+
+    def _notify(self) -> None:
+        if not self.wait or self._changed is None:
+            return
+
+        async def notify(condition: asyncio.Condition) -> None:
+            async with condition:
+                condition.notify_all()
+
+        asyncio.ensure_future(notify(self._changed))
+
+    def start(self) -> None:
+        """Starts background reconciliation in the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except Exception:
+                logger.exception("Balance reconciliation failed")
@@ -0,0 +1,364 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from . import types
+from .outbox import INFLIGHT, Outbox
+from .utils import exceptions
+from .utils.message import MessageBuilder
+
+if TYPE_CHECKING:
+    from .api import SMSClient
+
+__all__ = [
+    "BulkSender",
+    "BulkReport",
+    "ChunkResult",
+    "Record",
+    "RejectedRecord",
+]
+
+# (phone, text) or (phone, text, user_sms_id)
+Record = Union[Tuple[Union[int, str], str], Tuple[Union[int, str], str, str]]
+
+T = TypeVar("T")
+
+# Rough JSON overhead of one message object: keys, quotes and a uuid4
+_MESSAGE_OVERHEAD = 80
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of a single `send-batch` request."""
+
+    index: int
+    size: int
+    elapsed: float
+    response: Union[types.MessageResponse, Dict, None] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class RejectedRecord:
+    """Record that could not be built into a message, never sent."""
+
+    # Position in the records given to `BulkSender.send`
+    position: int
+    record: Record
+    error: Exception
+
+
+@dataclass
+class BulkReport:
+    """Per-chunk results and aggregate throughput of one campaign."""
+
+    chunks: List[ChunkResult] = field(default_factory=list)
+    rejected: List[RejectedRecord] = field(default_factory=list)
+    elapsed: float = 0.0
+    # Stopped early, the client's `Budget` refused a chunk
+    exhausted: bool = False
+
+    @property
+    def total(self) -> int:
+        chunks = sum(chunk.size for chunk in self.chunks)
+        return chunks + len(self.rejected)
+
+    @property
+    def sent(self) -> int:
+        return sum(chunk.size for chunk in self.chunks if chunk.ok)
+
+    @property
+    def failed(self) -> int:
+        return self.total - self.sent
+
+    @property
+    def messages_per_second(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return self.sent / self.elapsed
+
+
+class BulkSender:
+    """
+    Sends large campaigns through `SMSClient.send_batch_sms`.
+
+    Records are consumed lazily, packed into batches bounded by
+    `chunk_size` messages and `max_payload_bytes`, and sent with at most
+    `concurrency` requests in flight on the client's session. With a
+    client `Budget`, sending stops at the first chunk it refuses. With an
+    `Outbox`, every chunk is journaled and an interrupted campaign resumes
+    without resending chunks. Records that fail validation, e.g. an
+    invalid phone or a text matching no template, are reported in
+    `BulkReport.rejected` and the rest of the campaign is sent.
+
+    ```
+    sender = BulkSender(client, concurrency=8)
+    report = await sender.send(records, dispatch_id=123)
+    print(report.sent, report.messages_per_second)
+    ```
+    """
+
+    def __init__(
+        self,
+        client: "SMSClient",
+        *,
+        from_: str = "4546",
+        chunk_size: int = 200,
+        max_payload_bytes: int = 512 * 1024,
+        concurrency: int = 4,
+        outbox: Optional[Outbox] = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+
+        self.client = client
+        self.from_ = from_
+        self.chunk_size = chunk_size
+        self.max_payload_bytes = max_payload_bytes
+        self.concurrency = concurrency
+        self.outbox = outbox
+
+    async def send(
+        self,
+        records: Union[Iterable[Record], AsyncIterable[Record]],
+        *,
+        dispatch_id: Union[str, int],
+        token: Optional[str] = None,
+        campaign: Optional[str] = None,
+    ) -> BulkReport:
+        """Send all records, returns a `BulkReport`
+
+        Args:
+            - records: (phone, text) or (phone, text, user_sms_id) tuples
+            - dispatch_id (Union[str, int])
+            - campaign (Optional[str]): Outbox journal key. Defaults to
+            `dispatch_id`.
+
+        Returns:
+            BulkReport
+        """
+        rejected: List[RejectedRecord] = []
+
+        if self.outbox is None:
+            batches = self._batches(records, dispatch_id, rejected)
+            chunks = _enumerate(batch async for batch, _ in batches)
+            report = await self._dispatch(chunks, token, None)
+        else:
+            campaign = str(dispatch_id) if campaign is None else campaign
+            chunks = self._journaled(records, dispatch_id, campaign, rejected)
+            report = await self._dispatch(chunks, token, campaign)
+
+        report.rejected = rejected
+        return report
+
+    async def send_messages(
+        self,
+        batches: Union[
+            Iterable[types.Messages], AsyncIterable[types.Messages]
+        ],
+        *,
+        token: Optional[str] = None,
+    ) -> BulkReport:
+        """Send prepared batches, e.g. `CompactMessageBuilder.chunks()`
+
+        Args:
+            - batches: `types.Messages` per `send-batch` request
+
+        Returns:
+            BulkReport
+        """
+        return await self._dispatch(_enumerate(batches), token, None)
+
+    async def _dispatch(
+        self,
+        chunks: AsyncIterable[Tuple[int, types.Messages]],
+        token: Optional[str],
+        campaign: Optional[str],
+    ) -> BulkReport:
+        report = BulkReport()
+        pending: Set[asyncio.Future] = set()
+        started = time.perf_counter()
+
+        try:
+            async for index, messages in chunks:
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    done = {task for task in pending if task.done()}
+                    pending -= done
+                _collect(report, done)
+
+                # Remaining records are not consumed once out of balance
+                if report.exhausted:
+                    break
+
+                coro = self._send_chunk(index, messages, token, campaign)
+                pending.add(asyncio.ensure_future(coro))
+
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                _collect(report, done)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        report.chunks.sort(key=lambda chunk: chunk.index)
+        report.elapsed = time.perf_counter() - started
+
+        return report
+
+    async def _batches(
+        self,
+        records: Union[Iterable[Record], AsyncIterable[Record]],
+        dispatch_id: Union[str, int],
+        rejected: List[RejectedRecord],
+        start: int = 0,
+    ) -> AsyncIterator[Tuple[types.Messages, int]]:
+        """Yields batches and the number of records each one consumed"""
+        builder = MessageBuilder(dispatch_id, from_=self.from_)
+        size = consumed = 0
+
+        async for position, record in _enumerate(records, start):
+            consumed += 1
+            try:
+                record_size = len(str(record[1]).encode()) + _MESSAGE_OVERHEAD
+            except Exception as error:
+                rejected.append(RejectedRecord(position, record, error))
+                continue
+
+            if builder.messages and (
+                len(builder.messages) >= self.chunk_size
+                or size + record_size > self.max_payload_bytes
+            ):
+                yield builder.as_messages(), consumed - 1
+                builder = MessageBuilder(dispatch_id, from_=self.from_)
+                size, consumed = 0, 1
+
+            try:
+                builder.add(*record)
+            except Exception as error:
+                rejected.append(RejectedRecord(position, record, error))
+            else:
+                size += record_size
+
+        if builder.messages:
+            yield builder.as_messages(), consumed
+
+    async def _journaled(
+        self,
+        records: Union[Iterable[Record], AsyncIterable[Record]],
+        dispatch_id: Union[str, int],
+        campaign: str,
+        rejected: List[RejectedRecord],
+    ) -> AsyncIterator[Tuple[int, types.Messages]]:
+        outbox = self.outbox
+        assert outbox is not None
+
+        state = await outbox.resume(campaign)
+        for seq, messages in state.pending:
+            yield seq, messages
+
+        seq, cursor = state.next_seq, state.cursor
+        remaining = _skip(records, cursor)
+        batches = self._batches(remaining, dispatch_id, rejected, cursor)
+        async for messages, consumed in batches:
+            cursor += consumed
+            await outbox.append(campaign, seq, messages, cursor)
+            yield seq, messages
+            seq += 1
+
+    async def _send_chunk(
+        self,
+        index: int,
+        messages: types.Messages,
+        token: Optional[str],
+        campaign: Optional[str] = None,
+    ) -> ChunkResult:
+        outbox = self.outbox
+        started = time.perf_counter()
+        result = ChunkResult(
+            index=index, size=len(messages.messages), elapsed=0.0
+        )
+
+        try:
+            if outbox is not None and campaign is not None:
+                await outbox.mark(campaign, index, INFLIGHT)
+            result.response = await self.client.send_batch_sms(
+                messages, token=token
+            )
+        except Exception as error:
+            result.error = error
+
+        result.elapsed = time.perf_counter() - started
+
+        # A journal that cannot be written fails the campaign
+        if outbox is not None and campaign is not None:
+            await outbox.mark_result(
+                campaign, index, result.response, result.error
+            )
+        return result
+
+
+def _collect(report: BulkReport, done: Set[asyncio.Future]) -> None:
+    for task in done:
+        chunk: ChunkResult = task.result()
+        report.chunks.append(chunk)
+        if isinstance(chunk.error, exceptions.InsufficientBalance):
+            report.exhausted = True
+
+
+async def _enumerate(
+    items: Union[Iterable[T], AsyncIterable[T]], start: int = 0
+) -> AsyncIterator[Tuple[int, T]]:
+    index = start
+    async for item in _aiter(items):
+        yield index, item
+        index += 1
+
+
+async def _skip(
+    items: Union[Iterable[T], AsyncIterable[T]], count: int
+) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            if count > 0:
+                count -= 1
+                continue
+            yield item
+    else:
+        for item in itertools.islice(items, count, None):
+            yield item
+
+
+async def _aiter(
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
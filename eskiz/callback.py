@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+from pydantic import ValidationError
+
+from .types.sms import DeliveryReport
+from .utils.cache import TTLCache
+
+__all__ = ["DeliveryReceiver"]
+
+logger = logging.getLogger(__name__)
+
+# ("message_id" | "user_sms_id", value)
+_Key = Tuple[str, str]
+
+
+class DeliveryReceiver:
+    """
+    Receives delivery reports posted to `callback_url`.
+
+    Reports are parsed into `types.DeliveryReport` and indexed by
+    `message_id` and `user_sms_id`, keeping the latest `maxsize` messages.
+    Senders can await the final status of a message instead of polling
+    `get_message_details`.
+
+    ```
+    receiver = DeliveryReceiver()
+    await receiver.start(port=8080)
+
+    await client.send_sms(
+        998991234567, "hi",
+        user_sms_id="order-42",
+        callback_url="https://example.uz/eskiz/callback",
+    )
+    report = await receiver.wait(user_sms_id="order-42", timeout=300)
+    ```
+
+    To serve it from an existing application instead:
+    `app.router.add_post(path, receiver.handle)`.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str = "/eskiz/callback",
+        maxsize: int = 100_000,
+        ttl: Optional[float] = None,
+    ):
+        self.path = path
+
+        # Up to two keys per message
+        self._reports: TTLCache[_Key, DeliveryReport] = TTLCache(
+            maxsize * 2, ttl
+        )
+        self._waiters: Dict[_Key, List[asyncio.Future]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def get(
+        self,
+        *,
+        message_id: Optional[str] = None,
+        user_sms_id: Optional[str] = None,
+    ) -> Optional[DeliveryReport]:
+        """Latest report of a message"""
+        return self._reports.get(_key(message_id, user_sms_id))
+
+    async def wait(
+        self,
+        *,
+        message_id: Optional[str] = None,
+        user_sms_id: Optional[str] = None,
+        final: bool = True,
+        timeout: Optional[float] = None,
+    ) -> DeliveryReport:
+        """
+        Waits for a report of a message.
+
+        Args:
+            - message_id (Optional[str]): ID from the send response.
+            - user_sms_id (Optional[str]): Your message ID.
+            - final (bool): Wait for a final status (delivered, rejected,
+            expired, ...) rather than any report. Defaults to True.
+            - timeout (Optional[float]): Raises `asyncio.TimeoutError`.
+
+        Returns:
+            types.DeliveryReport
+        """
+        key = _key(message_id, user_sms_id)
+
+        report = self._reports.get(key)
+        if report is not None and (report.is_final or not final):
+            return report
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while True:
+            future = loop.create_future()
+            waiters = self._waiters.setdefault(key, [])
+            waiters.append(future)
+            try:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(deadline - loop.time(), 0)
+                received: DeliveryReport = await asyncio.wait_for(
+                    future, remaining
+                )
+            finally:
+                if future in waiters:
+                    waiters.remove(future)
+                if not waiters and self._waiters.get(key) is waiters:
+                    del self._waiters[key]
+
+            if received.is_final or not final:
+                return received
+
+    def add(self, report: DeliveryReport) -> None:
+        """Indexes a report and wakes its waiters"""
+        keys = [("message_id", report.message_id)]
+        if report.user_sms_id:
+            keys.append(("user_sms_id", report.user_sms_id))
+
+        for key in keys:
+            self._reports.set(key, report)
+
+            for future in self._waiters.pop(key, ()):
+                if not future.done():
+                    future.set_result(report)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """`aiohttp` handler of the callback POST, JSON or form data"""
+        try:
+            if request.content_type == "application/json":
+                data = await request.json()
+            else:
+                data = dict(await request.post())
+            report = DeliveryReport.model_validate(data)
+        except (ValueError, ValidationError) as error:
+            logger.warning("Invalid delivery report: %s", error)
+            return web.Response(status=400, text="Invalid delivery report")
+
+        self.add(report)
+        return web.Response(text="OK")
+
+    @property
+    def url(self) -> Optional[str]:
+        """Local URL of the running server"""
+        if self._runner is None or not self._runner.addresses:
+            return None
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}{self.path}"
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080) -> None:
+        """Serves `path` on `host:port`, `port=0` picks a free one"""
+        if self._runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "DeliveryReceiver":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+
+def _key(message_id: Optional[str], user_sms_id: Optional[str]) -> _Key:
+    if message_id is not None:
+        return ("message_id", str(message_id))
+    if user_sms_id is not None:
+        return ("user_sms_id", user_sms_id)
+    raise ValueError("message_id or user_sms_id is required")
@@ -0,0 +1,898 @@
+import argparse
+import asyncio
+import contextlib
+import logging
+import math
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+import aiohttp
+import jwt
+from aiohttp import web
+
+from .templates import TemplateIndex
+from .types.enums import MessagePartStatus, MessageStatus
+from .utils.methods import Endpoint, Methods
+from .utils.ratelimit import TokenBucket
+from .utils.segments import segments
+
+__all__ = ["MockGateway", "FAULTS"]
+
+logger = logging.getLogger(__name__)
+
+# Injected faults: HTTP 500, HTTP 429, no response until the client gives
+# up, connection closed without a response
+SERVER_ERROR = "server_error"
+TOO_MANY_REQUESTS = "too_many_requests"
+TIMEOUT = "timeout"
+DISCONNECT = "disconnect"
+FAULTS = (SERVER_ERROR, TOO_MANY_REQUESTS, TIMEOUT, DISCONNECT)
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class _Invalid(Exception):
+    """Missing or malformed request fields"""
+
+
+@dataclass
+class _Message:
+    id: int
+    request_id: str
+    dispatch_id: Any
+    user_sms_id: Optional[str]
+    nick: str
+    to: str
+    text: str
+    encoding: int
+    parts: int
+    created: float
+    failed: bool
+    is_global: bool
+
+
+class MockGateway:
+    """
+    Local stand-in for notify.eskiz.uz serving every `Methods` path with
+    responses shaped like `types`, for tests and load tests that must
+    not spend balance.
+
+    ```
+    async with MockGateway(latency=0.02) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        await client.send_sms(998991234567, "hi")
+    ```
+
+    Template lists are paginated by `template_page_size` as the gateway
+    does. Sent messages are kept (the latest `keep`) for message details,
+    dispatch status and totals. They are delivered after
+    `delivery_delay` seconds, a `delivery_failure` share is rejected, and
+    delivery reports are posted to their `callback_url`.
+
+    Faults are injected at random, `faults` maps each of `FAULTS` to its
+    share of requests, or scripted with `fail_next`. Run it standalone
+    with `python -m eskiz.mock --port 8080`.
+    """
+
+    def __init__(
+        self,
+        *,
+        email: str = "test@eskiz.uz",
+        password: str = "secret",
+        balance: int = 1_000_000,
+        price: int = 1,
+        nicks: Iterable[str] = ("4546",),
+        templates: Iterable[str] = (),
+        template_page_size: int = 20,
+        match_templates: bool = False,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        faults: Optional[Mapping[str, float]] = None,
+        rate_limit: Optional[float] = None,
+        delivery_delay: float = 0.0,
+        delivery_failure: float = 0.0,
+        token_ttl: float = 30 * 24 * 60 * 60,
+        keep: int = 100_000,
+        seed: Optional[int] = None,
+    ):
+        faults = dict(faults or {})
+        for fault in faults:
+            if fault not in FAULTS:
+                raise ValueError(f"Unknown fault: {fault}")
+        if sum(faults.values()) > 1:
+            raise ValueError("Fault shares must add up to at most 1")
+
+        self.email = email
+        self.password = password
+        self.balance = balance
+        self.price = price
+        self.nicks = list(nicks)
+        self.templates = list(templates)
+        self.template_page_size = template_page_size
+        self.match_templates = match_templates
+        self.latency = latency
+        self.jitter = jitter
+        self.faults = faults
+        self.delivery_delay = delivery_delay
+        self.delivery_failure = delivery_failure
+        self.token_ttl = token_ttl
+        self.user_id = 1
+
+        # Requests received by `Methods` name
+        self.requests: Dict[str, int] = {}
+
+        self._random = random.Random(seed)
+        self._bucket = None if rate_limit is None else TokenBucket(rate_limit)
+        self._index = TemplateIndex(self.templates)
+        self._secret = uuid.uuid4().hex
+        self._tokens: Set[str] = set()
+        self._scripted: Deque[Any] = deque()
+        self._messages: Deque[_Message] = deque(maxlen=keep)
+        self._next_id = 1
+        self._created = time.time()
+
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._callbacks: Set[asyncio.Future] = set()
+
+        self.token = self.issue_token()
+
+    async def __aenter__(self) -> "MockGateway":
+        await self.start(port=0)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    def issue_token(self) -> str:
+        """A new token accepted by the gateway, as `auth/login` returns"""
+        now = time.time()
+        token = jwt.encode(
+            {
+                "sub": str(self.user_id),
+                "iat": int(now),
+                "exp": int(now + self.token_ttl),
+                "jti": uuid.uuid4().hex,
+            },
+            self._secret,
+            algorithm="HS256",
+        )
+        self._tokens.add(token)
+        return token
+
+    def fail_next(
+        self, alert: str, *, times: int = 1, method: Optional[str] = None
+    ) -> None:
+        """
+        Fails the next `times` requests (of a `Methods` name) with a
+        `fail` status carrying `alert`, e.g. "INSUFFICIENT_BALANCE", or
+        with one of `FAULTS`.
+        """
+        for _ in range(times):
+            self._scripted.append((method, alert))
+
+    @property
+    def messages(self) -> int:
+        return len(self._messages)
+
+    # SERVER
+
+    @property
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024**2)
+        for endpoint in _endpoints():
+            handler = getattr(self, f"_{endpoint.name.lower()}")
+            app.router.add_route(
+                endpoint.method,
+                f"/api/{endpoint.path}",
+                self._wrap(endpoint, handler),
+            )
+        return app
+
+    @property
+    def url(self) -> Optional[str]:
+        """Service URL of the running server, for `SMSClient`"""
+        if self._runner is None or not self._runner.addresses:
+            return None
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Serves on `host:port`, `port=0` picks a free one"""
+        if self._runner is not None:
+            return
+
+        # Requests hanging in a `timeout` fault end with their connection
+        self._runner = web.AppRunner(
+            self.app, handler_cancellation=True, access_log=None
+        )
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self) -> None:
+        for task in list(self._callbacks):
+            task.cancel()
+        await asyncio.gather(*self._callbacks, return_exceptions=True)
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _wrap(self, endpoint: Endpoint, handler: Handler) -> Handler:
+        async def handle(request: web.Request) -> web.StreamResponse:
+            self.requests[endpoint.name] = (
+                self.requests.get(endpoint.name, 0) + 1
+            )
+
+            delay = self.latency + self.jitter * self._random.random()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            fault = self._fault()
+            if fault is not None:
+                return await self._inject(fault, request)
+
+            if self._bucket is not None and self._bucket.try_acquire() > 0:
+                return web.json_response(
+                    {"message": "Too Many Attempts."}, status=429
+                )
+
+            alert = self._next_scripted(endpoint)
+            if alert in FAULTS:
+                return await self._inject(alert, request)
+            if alert is not None:
+                return _fail(alert)
+
+            if endpoint.name != "GET_TOKEN" and not self._authorized(request):
+                return _fail("BEARER_TOKEN_INVALID", status=401)
+
+            try:
+                return await handler(request)
+            except _Invalid:
+                return _fail("FIELDS_FORMAT_INVALID")
+
+        return handle
+
+    def _fault(self) -> Optional[str]:
+        if not self.faults:
+            return None
+
+        share = self._random.random()
+        for fault, probability in self.faults.items():
+            if share < probability:
+                return fault
+            share -= probability
+        return None
+
+    async def _inject(
+        self, fault: str, request: web.Request
+    ) -> web.StreamResponse:
+        if fault == TOO_MANY_REQUESTS:
+            return web.json_response(
+                {"message": "Too Many Attempts."}, status=429
+            )
+
+        if fault == TIMEOUT:
+            # Cancelled once the client gives up and disconnects
+            await asyncio.sleep(3600)
+        elif fault == DISCONNECT and request.transport is not None:
+            request.transport.abort()
+
+        return web.json_response(
+            {"status": "error", "message": "Server Error"}, status=500
+        )
+
+    def _authorized(self, request: web.Request) -> bool:
+        scheme, _, token = request.headers.get("Authorization", "").partition(
+            " "
+        )
+        if scheme.lower() != "bearer" or token not in self._tokens:
+            return False
+
+        try:
+            jwt.decode(token, self._secret, algorithms=["HS256"])
+        except jwt.PyJWTError:
+            return False
+        return True
+
+    def _next_scripted(self, endpoint: Endpoint) -> Optional[str]:
+        for index, (method, alert) in enumerate(self._scripted):
+            if method is None or method == endpoint.name:
+                del self._scripted[index]
+                return alert
+        return None
+
+    # AUTHORIZATION
+
+    async def _get_token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("email") != self.email or (
+            form.get("password") != self.password
+        ):
+            # The gateway answers wrong credentials with a bare message
+            return web.json_response(
+                {"message": "Invalid email or password"}, status=401
+            )
+
+        return web.json_response(
+            {
+                "message": "token_generated",
+                "data": {"token": self.issue_token()},
+                "token_type": "bearer",
+            }
+        )
+
+    async def _refresh_token(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "message": "token_refreshed",
+                "data": {"token": self.issue_token()},
+                "token_type": "bearer",
+            }
+        )
+
+    async def _get_user_data(self, request: web.Request) -> web.Response:
+        created = _format_time(self._created)
+        return web.json_response(
+            {
+                "status": "success",
+                "data": {
+                    "id": self.user_id,
+                    "created_at": created,
+                    "updated_at": created,
+                    "name": "Mock",
+                    "email": self.email,
+                    "password": "********",
+                    "role": "user",
+                    "status": "active",
+                    "is_vip": False,
+                    "balance": self.balance,
+                },
+                "id": None,
+            }
+        )
+
+    # TEMPLATES
+
+    def _template(self, index: int) -> Dict:
+        created = _format_time(self._created)
+        return {
+            "id": index + 1,
+            "created_at": created,
+            "updated_at": created,
+            "user_id": self.user_id,
+            "smsc_id": 1,
+            "template": self.templates[index],
+            "smsc": None,
+            "user": None,
+        }
+
+    async def _get_template(self, request: web.Request) -> web.Response:
+        try:
+            index = int(request.match_info["id"]) - 1
+        except ValueError:
+            raise _Invalid from None
+        if not 0 <= index < len(self.templates):
+            return _fail("TEMPLATE_NOT_FOUND", status=404)
+
+        return web.json_response(
+            {"status": "success", "data": self._template(index), "id": None}
+        )
+
+    async def _get_template_list(self, request: web.Request) -> web.Response:
+        items = [self._template(index) for index in range(len(self.templates))]
+        page = _int(request.query.get("page"), 1)
+        data = _paginate(request, items, page, self.template_page_size)
+        return web.json_response(
+            {"status": "success", "data": data, "id": None}
+        )
+
+    # SENDING
+
+    def _charge(self, texts: Iterable[str]) -> List[Any]:
+        measured = [segments(text) for text in texts]
+        cost = sum(item.parts for item in measured) * self.price
+        if cost > self.balance:
+            raise _InsufficientBalance
+        if self.match_templates:
+            for item in measured:
+                if item.text not in self._index:
+                    raise _TemplateNotMatched
+        self.balance -= cost
+        return measured
+
+    def _store(
+        self,
+        *,
+        request_id: str,
+        to: Any,
+        text: str,
+        measured: Any,
+        nick: str,
+        dispatch_id: Any = None,
+        user_sms_id: Optional[str] = None,
+        callback_url: Optional[str] = None,
+        is_global: bool = False,
+    ) -> _Message:
+        message = _Message(
+            id=self._next_id,
+            request_id=request_id,
+            dispatch_id=dispatch_id,
+            user_sms_id=user_sms_id,
+            nick=nick,
+            to=str(to),
+            text=text,
+            encoding=measured.data_coding,
+            parts=measured.parts,
+            created=time.time(),
+            failed=self._random.random() < self.delivery_failure,
+            is_global=is_global,
+        )
+        self._next_id += 1
+        self._messages.append(message)
+
+        if callback_url:
+            self._schedule_callback(message, callback_url)
+        return message
+
+    async def _send_sms(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        phone, text = _phone(form.get("mobile_phone")), form.get("message")
+        if not isinstance(text, str) or not text:
+            raise _Invalid
+
+        try:
+            (measured,) = self._charge([text])
+        except _SendError as error:
+            return _fail(error.alert)
+
+        message = self._store(
+            request_id=uuid.uuid4().hex,
+            to=phone,
+            text=text,
+            measured=measured,
+            nick=_str(form.get("from")) or "4546",
+            user_sms_id=_str(form.get("user_sms_id")),
+            callback_url=_str(form.get("callback_url")),
+        )
+        return _accepted(str(message.id), "waiting")
+
+    async def _send_batch_sms(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+            items = body["messages"]
+            nick = str(body.get("from") or "4546")
+            dispatch_id = body["dispatch_id"]
+            pairs = [(_phone(item["to"]), item) for item in items]
+            texts = [str(item["text"]) for item in items]
+        except (ValueError, KeyError, TypeError):
+            raise _Invalid from None
+        if not items:
+            raise _Invalid
+
+        try:
+            measured = self._charge(texts)
+        except _SendError as error:
+            return _fail(error.alert)
+
+        request_id = uuid.uuid4().hex
+        for (phone, item), text, parts in zip(pairs, texts, measured):
+            self._store(
+                request_id=request_id,
+                to=phone,
+                text=text,
+                measured=parts,
+                nick=nick,
+                dispatch_id=dispatch_id,
+                user_sms_id=_str(item.get("user_sms_id")),
+                callback_url=_str(body.get("callback_url")),
+            )
+        return _accepted(request_id, ["waiting"])
+
+    async def _send_international_sms(
+        self, request: web.Request
+    ) -> web.Response:
+        form = await request.post()
+        phone, text = _phone(form.get("mobile_phone")), form.get("message")
+        if not isinstance(text, str) or not text:
+            raise _Invalid
+        if not form.get("country_code"):
+            raise _Invalid
+
+        try:
+            (measured,) = self._charge([text])
+        except _SendError as error:
+            return _fail(error.alert)
+
+        message = self._store(
+            request_id=uuid.uuid4().hex,
+            to=phone,
+            text=text,
+            measured=measured,
+            nick="4546",
+            callback_url=_str(form.get("callback_url")),
+            is_global=True,
+        )
+        return _accepted(str(message.id), "waiting")
+
+    async def _get_message_details(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        start = _parse_time(form.get("start_date"))
+        end = _parse_time(form.get("end_date"))
+        per_page = _int(form.get("page_size"), 20)
+        page = _int(form.get("page"), 1)
+
+        rows = [
+            message
+            for message in self._messages
+            if start <= message.created < end + 60
+        ]
+        return self._details(request, rows, page, per_page)
+
+    async def _get_message_by_dispatch(
+        self, request: web.Request
+    ) -> web.Response:
+        form = await request.post()
+        dispatch_id = _str(form.get("dispatch_id"))
+        if dispatch_id is None:
+            raise _Invalid
+        page = _int(form.get("page"), 1)
+
+        rows = [
+            message
+            for message in self._messages
+            if str(message.dispatch_id) == dispatch_id
+        ]
+        return self._details(request, rows, page, 20)
+
+    def _details(
+        self,
+        request: web.Request,
+        rows: List[_Message],
+        page: int,
+        per_page: int,
+    ) -> web.Response:
+        now = time.time()
+        data = _paginate(request, rows, page, per_page)
+        data["result"] = [
+            self._row(message, now) for message in data["result"]
+        ]
+        return web.json_response({"data": data, "status": "success"})
+
+    async def _get_dispatch_status(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        dispatch_id = _str(form.get("dispatch_id"))
+        if dispatch_id is None:
+            raise _Invalid
+
+        now = time.time()
+        totals: Dict[str, int] = {}
+        for message in self._messages:
+            if str(message.dispatch_id) == dispatch_id:
+                status = self._status(message, now).value
+                totals[status] = totals.get(status, 0) + 1
+
+        return web.json_response(
+            {
+                "status": "success",
+                "data": [
+                    {"status": status, "total": total}
+                    for status, total in totals.items()
+                ],
+                "id": None,
+            }
+        )
+
+    async def _get_nick_list(self, request: web.Request) -> web.Response:
+        return web.json_response(self.nicks)
+
+    # REPORTS
+
+    async def _get_sms_totals(self, request: web.Request) -> web.Response:
+        query = request.query
+        year = _int(query.get("year"), 0)
+        month = _int(query.get("month"), 0)
+        is_global = bool(_int(query.get("is_global"), 0))
+
+        now = time.time()
+        packets: Dict[str, int] = {}
+        for message in self._messages:
+            created = datetime.fromtimestamp(message.created)
+            if (created.year, created.month) != (year, month):
+                continue
+            if message.is_global != is_global:
+                continue
+            status = self._status(message, now).value
+            packets[status] = packets.get(status, 0) + message.parts
+
+        return web.json_response(
+            {
+                "status": "success",
+                "data": [
+                    {"status": status, "month": str(month), "packets": total}
+                    for status, total in packets.items()
+                ],
+                "id": None,
+            }
+        )
+
+    async def _get_limit(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"data": {"balance": self.balance}, "status": "success"}
+        )
+
+    # DELIVERY
+
+    def _delivered(self, message: _Message, now: float) -> bool:
+        return now >= message.created + self.delivery_delay
+
+    def _status(self, message: _Message, now: float) -> MessageStatus:
+        if not self._delivered(message, now):
+            return MessageStatus.WAITING
+        if message.failed:
+            return MessageStatus.REJECTED
+        return MessageStatus.DELIVERED
+
+    def _part_status(self, message: _Message, now: float) -> str:
+        if not self._delivered(message, now):
+            return MessagePartStatus.WAITING.value
+        if message.failed:
+            return MessagePartStatus.REJECTD.value
+        return MessagePartStatus.DELIVRD.value
+
+    def _row(self, message: _Message, now: float) -> Dict:
+        created = _format_time(message.created)
+        status = self._part_status(message, now)
+        delivered = created
+        if self._delivered(message, now):
+            delivered = _format_time(message.created + self.delivery_delay)
+
+        return {
+            "id": message.id,
+            "user_id": self.user_id,
+            "country_id": None if message.is_global else 1,
+            "connection_id": 1,
+            "smsc_id": 1,
+            "dispatch_id": message.dispatch_id,
+            "user_sms_id": message.user_sms_id or "",
+            "request_id": message.request_id,
+            "price": message.parts * self.price,
+            "is_ad": False,
+            "nick": message.nick,
+            "to": message.to,
+            "message": message.text,
+            "encoding": message.encoding,
+            "parts_count": message.parts,
+            "parts": {
+                "parts": {
+                    str(part): {
+                        "accept": created,
+                        "status": status,
+                        "submit": 1,
+                        "delivery": delivered,
+                    }
+                    for part in range(message.parts)
+                }
+            },
+            "status": status,
+            "smsc_data": {"data": {}},
+            "sent_at": created,
+            "submit_sm_resp_at": created,
+            "delivery_sm_at": delivered,
+            "created_at": created,
+            "updated_at": delivered,
+        }
+
+    def _schedule_callback(self, message: _Message, url: str) -> None:
+        loop = asyncio.get_running_loop()
+        loop.call_later(
+            self.delivery_delay, self._spawn_callback, message, url
+        )
+
+    def _spawn_callback(self, message: _Message, url: str) -> None:
+        if self._runner is None:
+            return
+        task = asyncio.ensure_future(self._post_callback(message, url))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _post_callback(self, message: _Message, url: str) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        now = time.time()
+        report = {
+            "message_id": str(message.id),
+            "user_sms_id": message.user_sms_id,
+            "country": None if message.is_global else "UZ",
+            "phone_number": message.to,
+            "sms_count": message.parts,
+            "status": self._part_status(message, now),
+            "status_date": _format_time(now),
+        }
+        try:
+            async with self._session.post(url, json=report) as response:
+                await response.read()
+        except aiohttp.ClientError as error:
+            logger.debug("Delivery report to %s failed: %s", url, error)
+
+
+class _SendError(Exception):
+    alert = ""
+
+
+class _InsufficientBalance(_SendError):
+    alert = "INSUFFICIENT_BALANCE"
+
+
+class _TemplateNotMatched(_SendError):
+    alert = "TEMPLATE_NOT_MATCHED"
+
+
+def _endpoints() -> List[Endpoint]:
+    return [
+        value
+        for value in vars(Methods).values()
+        if isinstance(value, Endpoint)
+    ]
+
+
+def _fail(alert: str, status: int = 400) -> web.Response:
+    return web.json_response(
+        {"status": "fail", "data": {"alert": alert}}, status=status
+    )
+
+
+def _accepted(id: str, status: Any) -> web.Response:
+    return web.json_response(
+        {"id": id, "message": "Waiting for SMS provider", "status": status}
+    )
+
+
+def _paginate(
+    request: web.Request, rows: List[Any], page: int, per_page: int
+) -> Dict:
+    per_page = max(per_page, 1)
+    total = len(rows)
+    last = max(1, math.ceil(total / per_page))
+    page = min(max(page, 1), last)
+    start = (page - 1) * per_page
+    result = rows[start : start + per_page]
+
+    path = str(request.url.with_query(None))
+
+    def url(number: int) -> Optional[str]:
+        return f"{path}?page={number}" if 1 <= number <= last else None
+
+    return {
+        "current_page": page,
+        "path": path,
+        "prev_page_url": url(page - 1),
+        "first_page_url": url(1),
+        "last_page_url": url(last),
+        "next_page_url": url(page + 1),
+        "per_page": per_page,
+        "last_page": last,
+        "from": start + 1 if result else 0,
+        "to": start + len(result),
+        "total": total,
+        "result": result,
+        "links": [
+            {
+                "url": url(page - 1),
+                "label": "&laquo; Previous",
+                "active": False,
+            },
+            {"url": url(page), "label": str(page), "active": True},
+            {"url": url(page + 1), "label": "Next &raquo;", "active": False},
+        ],
+    }
+
+
+def _phone(value: Any) -> str:
+    phone = str(value or "").lstrip("+")
+    if not phone.isdigit() or not 9 <= len(phone) <= 15:
+        raise _Invalid
+    return phone
+
+
+def _str(value: Any) -> Optional[str]:
+    return None if value is None or value == "" else str(value)
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime(_TIME_FORMAT)
+
+
+def _parse_time(value: Any) -> float:
+    for format in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value), format).timestamp()
+        except ValueError:
+            continue
+    raise _Invalid
+
+
+def _parse_faults(values: Iterable[str]) -> Dict[str, float]:
+    faults = {}
+    for value in values:
+        fault, _, share = value.partition("=")
+        faults[fault] = float(share)
+    return faults
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    gateway = MockGateway(
+        latency=args.latency,
+        jitter=args.jitter,
+        faults=_parse_faults(args.fault),
+        rate_limit=args.rate_limit,
+        delivery_delay=args.delivery_delay,
+        balance=args.balance,
+        seed=args.seed,
+    )
+    await gateway.start(args.host, args.port)
+    # First line is read by benchmark harnesses
+    print(gateway.url, gateway.token, flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await gateway.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m eskiz.mock", description=MockGateway.__doc__
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--fault",
+        action="append",
+        default=[],
+        metavar="NAME=SHARE",
+        help=f"One of {', '.join(FAULTS)}, e.g. server_error=0.01",
+    )
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--delivery-delay", type=float, default=0.0)
+    parser.add_argument("--balance", type=int, default=1_000_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
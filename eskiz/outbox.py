@@ -0,0 +1,330 @@
+import asyncio
+import itertools
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from . import types
+from .utils import exceptions
+from .utils.encoder import encode_messages
+from .utils.retry import UNDELIVERED_ERRORS
+
+__all__ = ["Outbox", "OutboxState"]
+
+# Chunk states
+PENDING = "pending"  # journaled, not sent yet or rejected before sending
+INFLIGHT = "inflight"  # being sent
+ACKED = "acked"  # accepted by the gateway
+FAILED = "failed"  # rejected by the gateway, not resent
+UNKNOWN = "unknown"  # may or may not have been sent, not resent
+
+# Errors proving the chunk was not sent, it is sent again on resume
+_UNSENT_ERRORS = UNDELIVERED_ERRORS + (
+    exceptions.InsufficientBalance,
+    exceptions.AuthCredsInvalid,
+    exceptions.BearerTokenInvalid,
+)
+
+# Errors after which the gateway may have accepted the chunk
+_AMBIGUOUS_ERRORS = (exceptions.RequestTimeout, exceptions.ServerError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign TEXT PRIMARY KEY,
+    cursor INTEGER NOT NULL DEFAULT 0,
+    next_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    campaign TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB,
+    response_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (campaign, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS chunks_state ON chunks (campaign, state);
+"""
+
+
+class OutboxState(NamedTuple):
+    """Where a campaign stopped."""
+
+    # Input records already journaled, skipped on resume
+    cursor: int
+    next_seq: int
+    # Chunks to send (again), in order
+    pending: List[Tuple[int, types.Messages]]
+    # Chunks that may have been sent before the process stopped
+    unknown: int
+
+
+class Outbox:
+    """
+    SQLite journal of campaign chunks, so an interrupted campaign resumes
+    where it stopped without sending any chunk twice.
+
+    Every chunk is journaled before it is sent and marked in flight,
+    then acknowledged with `MessageResponse.id`. Chunks left in flight by
+    a crash are marked unknown and not resent. Writes made while a commit
+    runs (plus `commit_interval` seconds) go into the next transaction
+    together, so concurrent senders share each fsync of the WAL.
+
+    ```
+    async with Outbox("campaign.db") as outbox:
+        sender = BulkSender(client, outbox=outbox)
+        report = await sender.send(records, dispatch_id=123)
+    ```
+
+    Run the same code again after a crash: records already journaled are
+    skipped, so `records` must be produced in the same order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        commit_interval: float = 0,
+        synchronous: str = "NORMAL",
+    ):
+        self.path = path
+        self.commit_interval = commit_interval
+        # "NORMAL" survives process crashes, "FULL" power loss too
+        self.synchronous = synchronous
+
+        self.writes = 0
+        self.commits = 0
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._opening: Optional[asyncio.Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._buffer: List[Tuple[str, Tuple, asyncio.Future]] = []
+        self._flushing: Optional[asyncio.Future] = None
+
+    async def __aenter__(self) -> "Outbox":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._connection is not None:
+            return
+
+        if self._opening is None:
+            # One thread owns the connection, statements never interleave
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="outbox")
+            self._opening = asyncio.ensure_future(self._run(self._connect))
+
+        try:
+            self._connection = await asyncio.shield(self._opening)
+        finally:
+            if self._opening.done():
+                self._opening = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    async def close(self) -> None:
+        """Commits buffered writes and closes the journal"""
+        if self._connection is None:
+            return
+
+        await self.flush()
+        await self._run(self._connection.close)
+        self._connection = None
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        await self.open()
+        await self.flush()
+
+        def query() -> List[Tuple]:
+            assert self._connection is not None
+            return self._connection.execute(sql, params).fetchall()
+
+        return await self._run(query)
+
+    def write(self, sql: str, params: Tuple = ()) -> asyncio.Future:
+        """Buffers a statement, the future resolves once it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((sql, params, future))
+
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.ensure_future(self._flush())
+        return future
+
+    async def flush(self) -> None:
+        """Waits until buffered writes are committed"""
+        while self._flushing is not None and not self._flushing.done():
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self) -> None:
+        while self._buffer:
+            # Let concurrent writers join this transaction
+            await asyncio.sleep(self.commit_interval)
+
+            batch, self._buffer = self._buffer, []
+            try:
+                await self.open()
+                await self._run(self._commit, batch)
+            except Exception as error:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            self.writes += len(batch)
+            self.commits += 1
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    def _commit(self, batch: List[Tuple[str, Tuple, asyncio.Future]]) -> None:
+        assert self._connection is not None
+        connection = self._connection
+
+        connection.execute("BEGIN")
+        try:
+            # Runs of the same statement go through one `executemany`
+            for sql, group in itertools.groupby(batch, key=lambda w: w[0]):
+                connection.executemany(sql, [params for _, params, _ in group])
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    async def resume(self, campaign: str) -> OutboxState:
+        """
+        State of a campaign, chunks left in flight are marked unknown.
+        """
+        await self.write(
+            "INSERT OR IGNORE INTO campaigns (campaign) VALUES (?)",
+            (campaign,),
+        )
+        await self.write(
+            "UPDATE chunks SET state = ?, updated_at = ?"
+            " WHERE campaign = ? AND state = ?",
+            (UNKNOWN, time.time(), campaign, INFLIGHT),
+        )
+
+        ((cursor, next_seq),) = await self._query(
+            "SELECT cursor, next_seq FROM campaigns WHERE campaign = ?",
+            (campaign,),
+        )
+        rows = await self._query(
+            "SELECT seq, body FROM chunks"
+            " WHERE campaign = ? AND state = ? ORDER BY seq",
+            (campaign, PENDING),
+        )
+        ((unknown,),) = await self._query(
+            "SELECT COUNT(*) FROM chunks WHERE campaign = ? AND state = ?",
+            (campaign, UNKNOWN),
+        )
+
+        pending = [
+            (seq, types.Messages.model_validate_json(body))
+            for seq, body in rows
+        ]
+        return OutboxState(cursor, next_seq, pending, unknown)
+
+    def append(
+        self,
+        campaign: str,
+        seq: int,
+        messages: types.Messages,
+        cursor: int,
+    ) -> asyncio.Future:
+        """Journals a new chunk and the input records it consumed"""
+        self.write(
+            "INSERT INTO chunks (campaign, seq, state, size, body, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                campaign,
+                seq,
+                PENDING,
+                len(messages.messages),
+                encode_messages(messages),
+                time.time(),
+            ),
+        )
+        return self.write(
+            "UPDATE campaigns SET cursor = ?, next_seq = ? WHERE campaign = ?",
+            (cursor, seq + 1, campaign),
+        )
+
+    def mark(
+        self,
+        campaign: str,
+        seq: int,
+        state: str,
+        *,
+        response_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> asyncio.Future:
+        # Bodies of finished chunks are not needed any more
+        body = "body" if state in (PENDING, INFLIGHT) else "NULL"
+        return self.write(
+            f"UPDATE chunks SET state = ?, response_id = ?, error = ?,"
+            f" body = {body}, updated_at = ? WHERE campaign = ? AND seq = ?",
+            (state, response_id, error, time.time(), campaign, seq),
+        )
+
+    def mark_result(
+        self,
+        campaign: str,
+        seq: int,
+        response: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> asyncio.Future:
+        """Records the outcome of sending a chunk"""
+        if error is None:
+            if isinstance(response, dict):
+                response_id = response.get("id")
+            else:
+                response_id = getattr(response, "id", None)
+            return self.mark(
+                campaign, seq, ACKED, response_id=_str(response_id)
+            )
+
+        return self.mark(campaign, seq, _outcome(error), error=repr(error))
+
+    async def counts(self, campaign: str) -> Dict[str, int]:
+        """Number of chunks in each state"""
+        rows = await self._query(
+            "SELECT state, COUNT(*) FROM chunks"
+            " WHERE campaign = ? GROUP BY state",
+            (campaign,),
+        )
+        return dict(rows)
+
+
+def _outcome(error: BaseException) -> str:
+    if isinstance(error, _UNSENT_ERRORS):
+        return PENDING
+    if isinstance(error, _AMBIGUOUS_ERRORS):
+        return UNKNOWN
+    if isinstance(error, exceptions.EskizError):
+        return FAILED
+    return UNKNOWN
+
+
+def _str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
@@ -0,0 +1,426 @@
+import asyncio
+import contextlib
+import itertools
+import math
+import ssl
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Union,
+)
+
+import aiohttp
+import certifi
+
+from . import types
+from .api import SMSClient
+from .utils import exceptions
+from .utils.methods import Methods
+from .utils.retry import is_unsent
+from .utils.segments import price
+
+__all__ = ["SMSClientPool", "PoolMember", "Strategy"]
+
+# "round_robin": in turn, "least_limited": longest since a 429,
+# "balance": highest remaining balance, from `get_limit` less the
+# estimated cost of sends since
+Strategy = Literal["round_robin", "least_limited", "balance"]
+
+# Errors proving the request was not accepted, safe to send elsewhere
+FAILOVER_ERRORS = (
+    exceptions.AuthCredsInvalid,
+    exceptions.BearerTokenInvalid,
+    exceptions.InsufficientBalance,
+    exceptions.TooManyRequests,
+    exceptions.CircuitOpen,
+)
+
+# Errors meaning the account itself is unusable
+_AUTH_ERRORS = (exceptions.AuthCredsInvalid, exceptions.BearerTokenInvalid)
+
+
+@dataclass
+class PoolMember:
+    """One account of the pool and its routing state."""
+
+    name: str
+    client: SMSClient
+    nick: Optional[str] = None
+    # Remaining balance as of `balance_at`, `None` until fetched
+    balance: Optional[float] = None
+    balance_at: float = 0.0
+    # Estimated cost of sends since `balance_at` and of sends in flight
+    spent: float = 0.0
+    pending: float = 0.0
+    # Last `TooManyRequests`, monotonic
+    limited_at: Optional[float] = None
+    # Skipped until then after auth or balance errors, monotonic
+    disabled_until: float = 0.0
+    sent: int = 0
+    failures: int = 0
+
+    @property
+    def available(self) -> bool:
+        return self.disabled_until <= time.monotonic()
+
+    @property
+    def estimated_balance(self) -> Optional[float]:
+        """`balance` less the estimated cost of sends since"""
+        if self.balance is None:
+            return None
+        return self.balance - self.spent - self.pending
+
+
+class SMSClientPool:
+    """
+    Several Eskiz accounts behind one connection pool.
+
+    Every member is an `SMSClient` sharing the pool's `TCPConnector`.
+    Sends are routed to one account by `strategy` and, when an account is
+    rejected (invalid token, no balance, rate limited), transparently
+    repeated on the next one. Rejected accounts are skipped for
+    `cooldown` seconds.
+
+    ```
+    async with SMSClientPool(strategy="balance") as pool:
+        pool.add(token="TOKEN_1", nick="BRAND")
+        pool.add(token_manager=TokenManager(email=..., password=...))
+
+        await pool.send_sms(998991234567, "hi")
+    ```
+
+    With the "balance" strategy, every send lowers the estimated balance
+    of its account by `price_per_part` per SMS part until balances are
+    fetched again, every `balance_ttl` seconds.
+
+    Other arguments are defaults for `SMSClient` of each account.
+    """
+
+    def __init__(
+        self,
+        *,
+        strategy: Strategy = "round_robin",
+        connections_limit: int = 100,
+        cooldown: float = 60.0,
+        balance_ttl: float = 60.0,
+        min_balance: float = 0.0,
+        price_per_part: float = 1.0,
+        **client_kwargs: Any,
+    ):
+        if strategy not in ("round_robin", "least_limited", "balance"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.balance_ttl = balance_ttl
+        self.min_balance = min_balance
+        self.price_per_part = price_per_part
+
+        self._connections_limit = connections_limit
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._client_kwargs = client_kwargs
+        self._connector: Optional[aiohttp.BaseConnector] = None
+
+        self._members: Dict[str, PoolMember] = {}
+        self._turn = itertools.count()
+        self._balance_refresh: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(list(self._members.values()))
+
+    def __getitem__(self, name: str) -> PoolMember:
+        return self._members[name]
+
+    async def __aenter__(self) -> "SMSClientPool":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    @property
+    def connector(self) -> aiohttp.BaseConnector:
+        """Connector shared by all members, created on first use"""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self._connections_limit, ssl=self._ssl_context
+            )
+        return self._connector
+
+    def add(
+        self,
+        token: Optional[str] = None,
+        *,
+        name: Optional[str] = None,
+        nick: Optional[str] = None,
+        **kwargs: Any,
+    ) -> SMSClient:
+        """
+        Adds an account.
+
+        Args:
+            - token (Optional[str]): Bearer token, or pass `token_manager`.
+            - name (Optional[str]): Defaults to "account-<n>".
+            - nick (Optional[str]): Sender name of this account, used as
+            `from` of its sends. Defaults to "4546".
+            - **kwargs: `SMSClient` arguments for this account.
+
+        Returns:
+            SMSClient
+        """
+        name = name or f"account-{len(self._members) + 1}"
+        if name in self._members:
+            raise ValueError(f"Account {name!r} is already in the pool")
+
+        options = {**self._client_kwargs, **kwargs}
+        options["connector"] = lambda: self.connector
+        client = SMSClient(token, **options)
+
+        self._members[name] = PoolMember(name, client, nick)
+        return client
+
+    async def remove(self, name: str) -> None:
+        member = self._members.pop(name)
+        await member.client.close()
+
+    def select(self, exclude: Iterable[str] = ()) -> PoolMember:
+        """
+        Next account by `strategy`.
+
+        Raises:
+            - `InsufficientBalance`: No account can send, all are disabled
+            or below `min_balance`.
+        """
+        skip = set(exclude)
+        members = [
+            member
+            for member in self._members.values()
+            if member.name not in skip
+            and member.available
+            and not self._is_drained(member)
+        ]
+        if not members:
+            raise exceptions.InsufficientBalance(
+                "No account in the pool can send"
+            )
+
+        # Rotating the start spreads ties across accounts
+        offset = next(self._turn) % len(members)
+        members = members[offset:] + members[:offset]
+
+        if self.strategy == "least_limited":
+            return min(
+                members,
+                key=lambda member: (
+                    -math.inf
+                    if member.limited_at is None
+                    else member.limited_at
+                ),
+            )
+
+        # Accounts rate limited within `cooldown` come last
+        since = time.monotonic() - self.cooldown
+        fresh = [
+            member
+            for member in members
+            if member.limited_at is None or member.limited_at < since
+        ]
+        members = fresh or members
+
+        if self.strategy == "balance":
+            return max(members, key=_balance_key)
+        return members[0]
+
+    def _is_drained(self, member: PoolMember) -> bool:
+        balance = member.estimated_balance
+        return balance is not None and balance <= self.min_balance
+
+    def cost(self, texts: Iterable[str]) -> float:
+        """Estimated price of sending each of `texts` once"""
+        return price(texts, self.price_per_part)
+
+    async def refresh_balances(self) -> None:
+        """Fetches `get_limit` of every account concurrently"""
+        await asyncio.gather(
+            *(self._refresh_balance(member) for member in self),
+            return_exceptions=True,
+        )
+
+    async def _refresh_balance(self, member: PoolMember) -> None:
+        client = member.client
+        # Sends completing during the request may be missing from it
+        spent = member.spent
+        try:
+            raw = await client.request(
+                Methods.GET_LIMIT,
+                headers=client._set_header_token(None),
+                cache=False,
+            )
+        except _AUTH_ERRORS:
+            member.disabled_until = time.monotonic() + self.cooldown
+            raise
+
+        member.balance = float(raw["data"]["balance"])
+        member.balance_at = time.monotonic()
+        member.spent -= spent
+
+    async def _ensure_balances(self) -> None:
+        if self.strategy != "balance":
+            return
+
+        now = time.monotonic()
+        if all(now - member.balance_at < self.balance_ttl for member in self):
+            return
+
+        # Concurrent sends share one refresh
+        if self._balance_refresh is None or self._balance_refresh.done():
+            self._balance_refresh = asyncio.ensure_future(
+                self.refresh_balances()
+            )
+        await asyncio.shield(self._balance_refresh)
+
+    async def call(
+        self,
+        fn: Callable[[PoolMember], Awaitable[Any]],
+        *,
+        cost: float = 0.0,
+    ) -> Any:
+        """
+        Runs `fn` with a selected account, failing over to the next one
+        while the gateway rejects the account. `cost` is taken from the
+        estimated balance of the account.
+
+        ```
+        details = await pool.call(
+            lambda member: member.client.get_user_data()
+        )
+        ```
+        """
+        await self._ensure_balances()
+
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            try:
+                member = self.select(exclude=tried)
+            except exceptions.InsufficientBalance:
+                if last_error is not None:
+                    raise last_error
+                raise
+
+            tried.add(member.name)
+            # Reserved before awaiting, so concurrent sends spread out
+            member.pending += cost
+            try:
+                result = await fn(member)
+            except FAILOVER_ERRORS as error:
+                member.pending -= cost
+                self._penalize(member, error)
+                last_error = error
+                continue
+            except BaseException as error:
+                member.pending -= cost
+                # Unless proven unsent, the send may have been accepted,
+                # counted until the next balance refresh
+                if not is_unsent(error):
+                    member.spent += cost
+                raise
+
+            member.pending -= cost
+            member.spent += cost
+            member.sent += 1
+            return result
+
+    def _penalize(self, member: PoolMember, error: BaseException) -> None:
+        member.failures += 1
+        if isinstance(error, exceptions.TooManyRequests):
+            member.limited_at = time.monotonic()
+        elif isinstance(error, exceptions.CircuitOpen):
+            member.disabled_until = time.monotonic() + error.retry_after
+        else:
+            member.disabled_until = time.monotonic() + self.cooldown
+            if isinstance(error, exceptions.InsufficientBalance):
+                member.balance = 0.0
+
+    async def send_sms(
+        self,
+        mobile_phone: Union[str, int],
+        message: str,
+        **kwargs: Any,
+    ) -> Union[types.MessageResponse, Dict]:
+        """`SMSClient.send_sms` from the selected account and its nick"""
+
+        async def send(member: PoolMember):
+            options = dict(kwargs)
+            if member.nick is not None:
+                options["from_"] = member.nick
+            return await member.client.send_sms(
+                mobile_phone, message, **options
+            )
+
+        return await self.call(send, cost=self.cost([message]))
+
+    async def send_batch_sms(
+        self, to: types.Messages, **kwargs: Any
+    ) -> Union[types.MessageResponse, Dict]:
+        """`SMSClient.send_batch_sms` from the selected account and its nick"""
+
+        async def send(member: PoolMember):
+            messages = to
+            if member.nick is not None:
+                messages = to.model_copy(update={"from_": member.nick})
+            return await member.client.send_batch_sms(messages, **kwargs)
+
+        cost = self.cost(message.text for message in to.messages)
+        return await self.call(send, cost=cost)
+
+    async def send_international_sms(
+        self,
+        mobile_phone: Union[str, int],
+        message: str,
+        country_code: str,
+        **kwargs: Any,
+    ) -> Dict:
+        """`SMSClient.send_international_sms` from the selected account"""
+        return await self.call(
+            lambda member: member.client.send_international_sms(
+                mobile_phone, message, country_code, **kwargs
+            ),
+            cost=self.cost([message]),
+        )
+
+    async def close(self) -> None:
+        """Closes every account and the shared connector"""
+        if self._balance_refresh is not None:
+            self._balance_refresh.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._balance_refresh
+            self._balance_refresh = None
+
+        await asyncio.gather(
+            *(member.client.close() for member in self),
+            return_exceptions=True,
+        )
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    @property
+    def members(self) -> List[PoolMember]:
+        return list(self._members.values())
+
+
+def _balance_key(member: PoolMember) -> float:
+    balance = member.estimated_balance
+    return math.inf if balance is None else balance
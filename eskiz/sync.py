@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from . import api
+
+__all__ = ["SMSClient"]
+
+T = TypeVar("T")
+
+
+class SMSClient:
+    """
+    Synchronous, thread-safe facade over `eskiz.SMSClient`.
+
+    One background thread runs an event loop that owns the client and its
+    pooled session. Every method of the async client is available here
+    and blocks until its result is ready; calls from many threads share
+    the same connections. Attributes and properties are read from and
+    set on the async client. Context managers such as `with_token` apply to
+    calls made from the same thread.
+
+    ```
+    from eskiz.sync import SMSClient
+
+    client = SMSClient(token="TOKEN")
+    client.send_sms(998991234567, "hi")
+
+    for row in client.iter_message_details(start, end):
+        print(row.id)
+
+    client.close()
+    ```
+
+    Accepts the same arguments as `eskiz.SMSClient`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="eskiz-sms", daemon=True
+        )
+        self._thread.start()
+
+        self._client = api.SMSClient(*args, **kwargs)
+
+    @property
+    def client(self) -> api.SMSClient:
+        """The underlying async client"""
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self._run(result)
+            if inspect.isasyncgen(result):
+                return self._iterate(result)
+            return result
+
+        return method
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._owns(name):
+            super().__setattr__(name, value)
+        else:
+            setattr(self._client, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if self._owns(name):
+            super().__delattr__(name)
+        else:
+            delattr(self._client, name)
+
+    @classmethod
+    def _owns(cls, name: str) -> bool:
+        # Private names and the facade's own attributes stay on the facade
+        return name.startswith("_") or hasattr(cls, name)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(dir(self._client)))
+
+    def __enter__(self) -> "SMSClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return not self._thread.is_alive()
+
+    def _run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Blocking call from the client's event loop")
+        if self.closed:
+            raise RuntimeError("Client is closed")
+
+        # The caller's context (e.g. `with_token`) is copied into the task
+        future = asyncio.run_coroutine_threadsafe(_wrap(coro), self._loop)
+        return future.result(timeout)
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        try:
+            while True:
+                try:
+                    yield self._run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self.closed:
+                self._run(iterator.aclose())  # type: ignore[attr-defined]
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Closes the session and stops the loop thread"""
+        if self.closed:
+            return
+
+        try:
+            self._run(self._client.close(), timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._loop.close()
+
+
+async def _wrap(awaitable: Awaitable[T]) -> T:
+    return await awaitable
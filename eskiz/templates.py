@@ -0,0 +1,338 @@
+import asyncio
+import contextlib
+import logging
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+from .utils.cache import TTLCache
+from .utils.methods import Methods
+
+if TYPE_CHECKING:
+    from .api import SMSClient
+
+__all__ = ["TemplateCache", "TemplateIndex", "TemplateMatch"]
+
+logger = logging.getLogger(__name__)
+
+_LIST_KEY = "list"
+
+# Placeholders of moderated templates and what they accept
+PLACEHOLDERS = {
+    "%d": r"\d+",
+    "%w": r"\S+",
+    "%s": r"[\s\S]+?",
+}
+
+
+class TemplateCache:
+    """
+    In-process cache for `get_template` and `get_template_list`.
+
+    Templates are cached by ID for `ttl` seconds (LRU beyond `maxsize`)
+    and indexed by their text while cached. The list holds every page of
+    `get_template_list`. With `background_refresh`, once the list has
+    been requested it is fetched again every `ttl / 2` seconds, so
+    lookups never wait on the network once the cache is warm.
+
+    ```
+    client = SMSClient(token="TOKEN", template_cache=TemplateCache(ttl=600))
+    template = await client.get_template(123)  # cached from now on
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300.0,
+        maxsize: int = 1024,
+        background_refresh: bool = True,
+    ):
+        self.ttl = ttl
+        self.background_refresh = background_refresh
+
+        self._templates: TTLCache[Any, Dict] = TTLCache(
+            maxsize, ttl, on_evict=self._unindex
+        )
+        self._by_text: Dict[str, Union[int, str]] = {}
+
+        self._client: Optional["SMSClient"] = None
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def client(self) -> "SMSClient":
+        if self._client is None:
+            raise RuntimeError("TemplateCache is not attached to a client")
+        return self._client
+
+    def attach(self, client: "SMSClient") -> None:
+        if self._client is not None and self._client is not client:
+            raise RuntimeError("TemplateCache is attached to another client")
+        self._client = client
+
+    def get(self, id: Union[int, str]) -> Optional[Dict]:
+        """Raw `get_template` response, `None` if missing or expired"""
+        return self._templates.get(_key(id))
+
+    def get_list(self) -> Optional[Dict]:
+        """Raw `get_template_list` response, `None` if missing or expired"""
+        return self._templates.get(_LIST_KEY)
+
+    def find(self, text: str) -> Optional[Dict]:
+        """Template item (`data` of `get_template`) with exactly this text"""
+        id = self._by_text.get(text)
+        if id is None:
+            return None
+
+        raw = self._templates.get(id, stale=True)
+        if raw is None:
+            del self._by_text[text]
+            return None
+
+        return raw["data"]
+
+    def templates(self) -> List[Dict]:
+        """All cached template items, including expired ones"""
+        items = []
+        for key in list(self._by_text.values()):
+            raw = self._templates.get(key, stale=True)
+            if raw is not None:
+                items.append(raw["data"])
+        return items
+
+    def put(self, raw: Dict) -> None:
+        """Store a raw `get_template` response"""
+        item = raw.get("data") or {}
+        if "id" not in item:
+            return
+
+        key = _key(item["id"])
+        previous = self._templates.get(key, stale=True)
+        if previous is not None:
+            self._unindex(key, previous)
+
+        self._templates.set(key, raw)
+        if isinstance(item.get("template"), str):
+            self._by_text[item["template"]] = key
+
+    def _unindex(self, key: Any, raw: Dict) -> None:
+        # Drops the text of a template leaving the cache
+        text = (raw.get("data") or {}).get("template")
+        if isinstance(text, str) and self._by_text.get(text) == key:
+            del self._by_text[text]
+
+    def put_list(self, raw: Dict) -> None:
+        """Store a raw `get_template_list` response and each of its items"""
+        self._templates.set(_LIST_KEY, raw)
+
+        data = raw.get("data") or {}
+        for item in data.get("result") or []:
+            self.put({"status": raw.get("status"), "data": item, "id": None})
+
+    def clear(self) -> None:
+        self._templates.clear()
+        self._by_text.clear()
+
+    async def fetch_list(self, *, timeout: Optional[float] = None) -> Dict:
+        """
+        Fetches every page of the template list, bypassing the cache, and
+        stores them as one `get_template_list` response.
+        """
+        client = self.client
+        headers = client._set_header_token(None)
+
+        async def fetch(page: int) -> Dict:
+            method = Methods.GET_TEMPLATE_LIST
+            if page > 1:
+                method = method.with_query({"page": page})
+            return await client.request(
+                method, headers=headers, timeout=timeout
+            )
+
+        first = await fetch(1)
+        last = int((first.get("data") or {}).get("last_page") or 1)
+        rest = await asyncio.gather(*map(fetch, range(2, last + 1)))
+
+        raw = _merge_pages([first, *rest])
+        self.put_list(raw)
+        return raw
+
+    async def refresh(self) -> None:
+        """Fetch the template list again, bypassing the cache"""
+        await self.fetch_list()
+
+    def start(self) -> None:
+        """
+        Starts background refresh of the list in the running loop, the
+        list is expected to be fetched already.
+        """
+        if not self.background_refresh:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 2)
+
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Background template refresh failed")
+
+
+def _merge_pages(pages: List[Dict]) -> Dict:
+    # One page holding the items of all of them
+    first = pages[0]
+    data = first.get("data") or {}
+    items = [
+        item
+        for raw in pages
+        for item in (raw.get("data") or {}).get("result") or []
+    ]
+    return {
+        **first,
+        "data": {
+            **data,
+            "current_page": 1,
+            "last_page": 1,
+            "next_page_url": None,
+            "last_page_url": data.get("first_page_url"),
+            "per_page": max(len(items), int(data.get("per_page") or 0)),
+            "from": 1 if items else 0,
+            "to": len(items),
+            "result": items,
+        },
+    }
+
+
+def _key(id: Union[int, str]) -> Union[int, str]:
+    # "12" and 12 are the same template
+    try:
+        return int(id)
+    except (TypeError, ValueError):
+        return id
+
+
+class TemplateMatch(NamedTuple):
+    id: Any
+    template: str
+    values: Tuple[str, ...]
+
+
+class _Compiled(NamedTuple):
+    id: Any
+    template: str
+    pattern: Pattern
+
+
+class TemplateIndex:
+    """
+    Checks message texts against approved templates locally.
+
+    Each template is compiled once into a pattern with one group per
+    placeholder (`%d` digits, `%w` a word, `%s` any text). Templates are
+    bucketed by their whole literal prefix, so a lookup costs one dict
+    probe per distinct prefix length and only tries the few templates
+    sharing the message's prefix.
+
+    ```
+    index = TemplateIndex.from_items(cache.templates())
+    match = index.match("Your code is 1234")
+    if match is None:
+        ...  # would be rejected by the gateway
+    ```
+    """
+
+    def __init__(
+        self,
+        templates: Iterable[str] = (),
+        *,
+        placeholders: Optional[Dict[str, str]] = None,
+    ):
+        self.placeholders = placeholders or PLACEHOLDERS
+
+        self._splitter = re.compile(
+            "|".join(re.escape(key) for key in self.placeholders)
+        )
+        # template without placeholders -> id
+        self._exact: Dict[str, Any] = {}
+        # literal prefix length -> prefix -> templates
+        self._buckets: Dict[int, Dict[str, List[_Compiled]]] = {}
+        self._size = 0
+
+        for template in templates:
+            self.add(template)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any], **kwargs) -> "TemplateIndex":
+        """Build from template items, `dict`s or `ResultItem` models"""
+        index = cls(**kwargs)
+        for item in items:
+            if isinstance(item, dict):
+                index.add(item["template"], id=item.get("id"))
+            else:
+                index.add(item.template, id=item.id)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, text: str) -> bool:
+        return self.match(text) is not None
+
+    def add(self, template: str, id: Any = None) -> None:
+        literals = self._splitter.split(template)
+        if len(literals) == 1:
+            self._exact[template] = id
+            self._size += 1
+            return
+
+        slots = self._splitter.findall(template)
+        source = re.escape(literals[0])
+        for slot, literal in zip(slots, literals[1:]):
+            source += f"({self.placeholders[slot]})" + re.escape(literal)
+
+        prefix = literals[0]
+        if len(prefix) not in self._buckets:
+            # Longest prefixes are the most specific, try them first
+            self._buckets[len(prefix)] = {}
+            self._buckets = dict(sorted(self._buckets.items(), reverse=True))
+
+        bucket = self._buckets[len(prefix)]
+        bucket.setdefault(prefix, []).append(
+            _Compiled(id, template, re.compile(source))
+        )
+        self._size += 1
+
+    def match(self, text: str) -> Optional[TemplateMatch]:
+        """First template `text` conforms to, `None` if there is none"""
+        if text in self._exact:
+            return TemplateMatch(self._exact[text], text, ())
+
+        for length, bucket in self._buckets.items():
+            for compiled in bucket.get(text[:length], ()):
+                found = compiled.pattern.fullmatch(text)
+                if found is not None:
+                    return TemplateMatch(
+                        compiled.id, compiled.template, found.groups()
+                    )
+
+        return None
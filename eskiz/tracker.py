@@ -0,0 +1,330 @@
+import asyncio
+import contextlib
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from . import types
+from .types.enums import MessageStatus
+from .utils.methods import Methods
+
+if TYPE_CHECKING:
+    from .api import SMSClient
+
+__all__ = ["DispatchTracker", "DispatchUpdate"]
+
+logger = logging.getLogger(__name__)
+
+DispatchId = Union[str, int]
+
+# Messages in these states may still change
+PENDING_STATUSES = frozenset(
+    status.value
+    for status in (
+        MessageStatus.WAITING,
+        MessageStatus.NEW,
+        MessageStatus.ACCEPTED,
+    )
+)
+
+
+@dataclass
+class DispatchUpdate:
+    """A changed status of a tracked broadcast."""
+
+    dispatch_id: DispatchId
+    status: Union[types.BroadcastStatus, Dict]
+    # No message is pending any more
+    finished: bool = False
+    # Stopped tracking after `expire_after` without finishing
+    expired: bool = False
+
+
+class _Entry:
+    __slots__ = ("data", "interval", "changed_at", "future", "version")
+
+    def __init__(self, interval: float):
+        self.data: Optional[List[Dict]] = None
+        self.interval = interval
+        self.changed_at = time.monotonic()
+        self.future: Optional[asyncio.Future] = None
+        # Bumped on re-scheduling, stale heap items are skipped
+        self.version = 0
+
+
+class DispatchTracker:
+    """
+    Polls `get_dispatch_status` of many broadcasts from one task.
+
+    Each dispatch is polled every `min_interval` seconds while its
+    counters change, backing off by `backoff` up to `max_interval` once
+    they stop. Dispatches are dropped when no message is pending or after
+    `expire_after` seconds without a change.
+
+    ```
+    async with DispatchTracker(client) as tracker:
+        await client.send_batch_sms(messages)
+        status = await tracker.wait(messages.dispatch_id)
+
+    async for update in tracker.updates():
+        print(update.dispatch_id, update.status.data)
+    ```
+    """
+
+    def __init__(
+        self,
+        client: "SMSClient",
+        *,
+        user_id: Optional[int] = None,
+        min_interval: float = 2.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        expire_after: Optional[float] = 24 * 60 * 60,
+        concurrency: int = 8,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+
+        self.client = client
+        self.user_id = user_id
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.expire_after = expire_after
+        self.concurrency = concurrency
+
+        self._entries: Dict[DispatchId, _Entry] = {}
+        # (due, sequence, dispatch_id, version)
+        self._schedule: List[Tuple[float, int, DispatchId, int]] = []
+        self._sequence = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Future] = None
+
+    async def __aenter__(self) -> "DispatchTracker":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, dispatch_id: DispatchId) -> bool:
+        return dispatch_id in self._entries
+
+    def track(self, dispatch_id: DispatchId) -> None:
+        """Starts polling a broadcast, does nothing if already tracked"""
+        if dispatch_id in self._entries:
+            return
+
+        self._entries[dispatch_id] = _Entry(self.min_interval)
+        self._schedule_poll(dispatch_id, time.monotonic())
+        self.start()
+
+    def untrack(self, dispatch_id: DispatchId) -> None:
+        entry = self._entries.pop(dispatch_id, None)
+        if entry is not None and entry.future is not None:
+            entry.future.cancel()
+
+    def status(
+        self, dispatch_id: DispatchId
+    ) -> Union[types.BroadcastStatus, Dict, None]:
+        """Last polled status of a tracked broadcast"""
+        entry = self._entries.get(dispatch_id)
+        if entry is None or entry.data is None:
+            return None
+        return self._build(entry.data)
+
+    async def wait(
+        self, dispatch_id: DispatchId, *, timeout: Optional[float] = None
+    ) -> Union[types.BroadcastStatus, Dict]:
+        """
+        Tracks the broadcast and waits until no message is pending.
+        Concurrent waiters of one dispatch share its polling.
+
+        Returns:
+            Union[types.BroadcastStatus, Dict]: The final status, or the
+            last one if tracking expired.
+        """
+        self.track(dispatch_id)
+
+        entry = self._entries[dispatch_id]
+        if entry.future is None:
+            entry.future = asyncio.get_running_loop().create_future()
+
+        return await asyncio.wait_for(asyncio.shield(entry.future), timeout)
+
+    async def updates(self) -> AsyncIterator[DispatchUpdate]:
+        """Stream of status changes of all tracked broadcasts"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def _build(self, data: List[Dict]) -> Any:
+        raw = {"status": "success", "data": data, "id": None}
+        return self.client._build(types.BroadcastStatus, raw)
+
+    def _schedule_poll(self, dispatch_id: DispatchId, due: float) -> None:
+        entry = self._entries[dispatch_id]
+        entry.version += 1
+        self._sequence += 1
+        heapq.heappush(
+            self._schedule, (due, self._sequence, dispatch_id, entry.version)
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Starts polling in the running loop."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stops polling, pending waiters are cancelled"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        for dispatch_id in list(self._entries):
+            self.untrack(dispatch_id)
+        self._schedule.clear()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+
+        while self._entries:
+            due = self._due()
+            if not due:
+                delay = None
+                if self._schedule:
+                    delay = self._schedule[0][0] - time.monotonic()
+
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+
+            if self.user_id is None:
+                try:
+                    await self._fetch_user_id()
+                except Exception:
+                    logger.exception("Fetching user ID failed")
+                    for dispatch_id in due:
+                        self._schedule_poll(
+                            dispatch_id, time.monotonic() + self.min_interval
+                        )
+                    continue
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(
+                *(self._poll(dispatch_id, semaphore) for dispatch_id in due)
+            )
+
+    async def _fetch_user_id(self) -> None:
+        client = self.client
+        raw = await client.request(
+            Methods.GET_USER_DATA, headers=client._set_header_token(None)
+        )
+        self.user_id = raw["data"]["id"]
+
+    def _due(self) -> List[DispatchId]:
+        now = time.monotonic()
+        due = []
+        while self._schedule and self._schedule[0][0] <= now:
+            _, _, dispatch_id, version = heapq.heappop(self._schedule)
+            entry = self._entries.get(dispatch_id)
+            if entry is not None and entry.version == version:
+                due.append(dispatch_id)
+        return due
+
+    async def _poll(
+        self, dispatch_id: DispatchId, semaphore: asyncio.Semaphore
+    ) -> None:
+        client = self.client
+        try:
+            async with semaphore:
+                raw = await client.request(
+                    Methods.GET_DISPATCH_STATUS,
+                    payload={
+                        "user_id": self.user_id,
+                        "dispatch_id": dispatch_id,
+                    },
+                    headers=client._set_header_token(None),
+                )
+        except Exception:
+            logger.exception("Polling dispatch %s failed", dispatch_id)
+            raw = None
+
+        entry = self._entries.get(dispatch_id)
+        if entry is None:
+            return
+
+        now = time.monotonic()
+        data = raw.get("data") if raw is not None else None
+        if data is not None and data != entry.data:
+            entry.data = data
+            entry.changed_at = now
+            entry.interval = self.min_interval
+
+            if _is_finished(data):
+                self._finish(dispatch_id, expired=False)
+                return
+            self._publish(DispatchUpdate(dispatch_id, self._build(data)))
+        else:
+            entry.interval = min(
+                entry.interval * self.backoff, self.max_interval
+            )
+
+        if (
+            self.expire_after is not None
+            and now - entry.changed_at >= self.expire_after
+        ):
+            self._finish(dispatch_id, expired=True)
+            return
+
+        self._schedule_poll(dispatch_id, now + entry.interval)
+
+    def _finish(self, dispatch_id: DispatchId, *, expired: bool) -> None:
+        entry = self._entries.pop(dispatch_id)
+        status = self._build(entry.data or [])
+
+        self._publish(
+            DispatchUpdate(
+                dispatch_id, status, finished=not expired, expired=expired
+            )
+        )
+        if entry.future is not None and not entry.future.done():
+            entry.future.set_result(status)
+
+    def _publish(self, update: DispatchUpdate) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(update)
+
+
+def _is_finished(data: List[Dict]) -> bool:
+    if not data:
+        return False
+    return not any(
+        item.get("status") in PENDING_STATUSES and item.get("total")
+        for item in data
+    )
@@ -1,6 +1,8 @@
 from . import base
+from .lazy import LazyModel
 from .sms import (
     BroadcastStatus,
+    DeliveryReport,
     Message,
     MessageDetails,
     MessageResponse,
@@ -13,6 +15,7 @@ from .user import User, UserLimit
 
 __all__ = [
     "base",
+    "LazyModel",
     "TokenResponse",
     "User",
     "UserLimit",
@@ -24,4 +27,5 @@ __all__ = [
     "MessageResponse",
     "TotalMessages",
     "MessageDetails",
+    "DeliveryReport",
 ]
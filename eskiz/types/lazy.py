@@ -0,0 +1,145 @@
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from pydantic import BaseModel, TypeAdapter
+
+__all__ = ["LazyModel"]
+
+M = TypeVar("M", bound=BaseModel)
+
+# (model, attribute) -> (raw key, kind, target)
+_Field = Tuple[str, str, Any]
+_FIELDS: Dict[Tuple[type, str], Optional[_Field]] = {}
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _resolve(model: type, name: str) -> Optional[_Field]:
+    key = (model, name)
+    if key in _FIELDS:
+        return _FIELDS[key]
+
+    field = model.model_fields.get(name)  # type: ignore[attr-defined]
+    if field is None:
+        _FIELDS[key] = None
+        return None
+
+    annotation = _unwrap_optional(field.annotation)
+    args = get_args(annotation)
+
+    resolved: _Field
+    if _is_model(annotation):
+        resolved = (field.alias or name, "model", annotation)
+    elif (
+        get_origin(annotation) in (list, List) and args and _is_model(args[0])
+    ):
+        resolved = (field.alias or name, "list", args[0])
+    elif annotation in (int, str, bool, float):
+        resolved = (
+            field.alias or name,
+            "scalar",
+            (annotation, TypeAdapter(annotation)),
+        )
+    else:
+        resolved = (
+            field.alias or name,
+            "value",
+            TypeAdapter(field.annotation),
+        )
+
+    _FIELDS[key] = resolved
+    return resolved
+
+
+class LazyModel(Generic[M]):
+    """
+    Read-only typed view over a raw response.
+
+    Fields are validated against `model` on first access and cached;
+    nested models are returned as views too, so reading two fields of a
+    large report never builds the rest of the tree.
+
+    ```
+    details = LazyModel(types.MessageDetails, raw)
+    for row in details.data.result:
+        print(row.id, row.status)
+    ```
+    """
+
+    __slots__ = ("_model", "_raw", "_cache")
+
+    def __init__(self, model: Type[M], raw: Optional[Dict[str, Any]]):
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_raw", raw or {})
+        object.__setattr__(self, "_cache", {})
+
+    def __getattr__(self, name: str) -> Any:
+        cache = self._cache
+        if name in cache:
+            return cache[name]
+
+        resolved = _resolve(self._model, name)
+        if resolved is None:
+            # Extra fields are allowed by `EskizBaseModel`
+            if name in self._raw:
+                return self._raw[name]
+            raise AttributeError(
+                f"{self._model.__name__!r} has no attribute {name!r}"
+            )
+
+        key, kind, target = resolved
+        if key not in self._raw:
+            raise AttributeError(f"{self._model.__name__}.{name} is missing")
+
+        value = self._raw[key]
+        if value is None:
+            pass
+        elif kind == "model":
+            value = LazyModel(target, value)
+        elif kind == "list":
+            value = [LazyModel(target, item) for item in value]
+        elif kind == "scalar":
+            # Already the right type, skip the validator
+            scalar, adapter = target
+            if type(value) is not scalar:
+                value = adapter.validate_python(value)
+        else:
+            value = target.validate_python(value)
+
+        cache[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("LazyModel is read-only")
+
+    def __repr__(self) -> str:
+        return f"LazyModel[{self._model.__name__}]({self._raw!r})"
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        return self._raw
+
+    def validate(self) -> M:
+        """Fully validates the response into `model`"""
+        return self._model(**self._raw)
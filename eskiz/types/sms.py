@@ -1,9 +1,9 @@
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import Field
+from pydantic import Field, field_validator
 
 from .base import EskizBaseModel
-from .enums import MessageStatus
+from .enums import MessagePartStatus, MessageStatus
 
 # MESSAGE
 
@@ -124,3 +124,42 @@ class Data(EskizBaseModel):
 class MessageDetails(EskizBaseModel):
     data: Data
     status: str
+
+
+# DELIVERY REPORT
+
+
+class DeliveryReport(EskizBaseModel):
+    message_id: str
+    user_sms_id: Optional[str] = None
+    country: Optional[str] = None
+    phone_number: str
+    sms_count: int = 1
+    status: MessagePartStatus
+    status_date: Optional[str] = None
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _unknown_status(cls, value: Any) -> Any:
+        # New statuses of the gateway should not drop the report
+        if (
+            not isinstance(value, str)
+            or value not in MessagePartStatus._value2member_map_
+        ):
+            return MessagePartStatus.UNKNOWN
+        return value
+
+    @property
+    def is_final(self) -> bool:
+        # An unrecognised status may be followed by a final one
+        return self.status not in (
+            MessagePartStatus.WAITING,
+            MessagePartStatus.NEW,
+            MessagePartStatus.ACCEPTED,
+            MessagePartStatus.ENROUTE,
+            MessagePartStatus.UNKNOWN,
+        )
+
+    @property
+    def is_delivered(self) -> bool:
+        return self.status == MessagePartStatus.DELIVRD
@@ -0,0 +1,184 @@
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Iterator, Optional, Tuple, Type
+
+from . import exceptions
+from .retry import OVERLOAD_ERRORS
+
+__all__ = ["CircuitBreaker", "CLOSED", "OPEN", "HALF_OPEN"]
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast with `CircuitOpen` while the gateway is down.
+
+    - Closed: requests are sent and the outcomes of the last `window`
+      are kept. Once `min_calls` are recorded and the share of `failures`
+      (overload and network errors by default) reaches `failure_rate`,
+      the breaker opens.
+    - Open: requests are rejected without sending for `open_for` seconds.
+    - Half-open: `trial_calls` requests are let through, the breaker
+      closes once they all succeed and opens again on the first failure.
+
+    ```
+    breaker = CircuitBreaker(on_change=lambda old, new: print(old, new))
+    client = SMSClient(breaker=breaker)
+
+    try:
+        await client.send_sms(998991234567, "hi")
+    except exceptions.CircuitOpen as error:
+        ...  # route elsewhere, or retry after `error.retry_after`
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        min_calls: int = 20,
+        window: int = 100,
+        open_for: float = 30.0,
+        trial_calls: int = 5,
+        failures: Tuple[Type[BaseException], ...] = OVERLOAD_ERRORS,
+        on_change: Optional[Callable[[str, str], None]] = None,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+        if min_calls < 1 or window < min_calls:
+            raise ValueError("window must be at least min_calls")
+        if trial_calls < 1:
+            raise ValueError("trial_calls must be positive")
+
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_for = open_for
+        self.trial_calls = trial_calls
+        self.failures = failures
+        self.on_change = on_change
+
+        self.state = CLOSED
+        # Times the breaker opened, requests rejected while open
+        self.opened = 0
+        self.rejected = 0
+
+        # True for failures
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._failed = 0
+        self._opened_at = 0.0
+        # Trial requests in flight and succeeded while half-open
+        self._trials = 0
+        self._passed = 0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failures among the recorded outcomes"""
+        if not self._outcomes:
+            return 0.0
+        return self._failed / len(self._outcomes)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets trial requests through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_for - time.monotonic())
+
+    def check(self) -> None:
+        """Raises `CircuitOpen` if a request may not be sent now"""
+        if self.state == OPEN:
+            if self.retry_after > 0:
+                self._reject()
+            self._transition(HALF_OPEN)
+
+        if (
+            self.state == HALF_OPEN
+            and self._trials + self._passed >= self.trial_calls
+        ):
+            self._reject()
+
+    @contextlib.contextmanager
+    def call(self) -> Iterator[None]:
+        """Guards one request and records its outcome"""
+        self.check()
+
+        trial = self.state == HALF_OPEN
+        if trial:
+            self._trials += 1
+
+        try:
+            yield
+        except Exception as error:
+            self._record(trial, isinstance(error, self.failures))
+            raise
+        except BaseException:
+            # Cancelled, the outcome is unknown
+            self._record(trial, None)
+            raise
+        else:
+            self._record(trial, False)
+
+    def _record(self, trial: bool, failed: Optional[bool]) -> None:
+        if trial:
+            self._trials -= 1
+        if failed is None:
+            return
+
+        if self.state == HALF_OPEN:
+            # Requests sent before the breaker opened are not trials
+            if not trial:
+                return
+            if failed:
+                self._open()
+                return
+            self._passed += 1
+            if self._passed >= self.trial_calls:
+                self._close()
+            return
+
+        if self.state != CLOSED:
+            return
+
+        outcomes = self._outcomes
+        if len(outcomes) == outcomes.maxlen:
+            self._failed -= outcomes[0]
+        outcomes.append(failed)
+        self._failed += failed
+
+        calls = len(outcomes)
+        if (
+            calls >= self.min_calls
+            and self._failed >= self.failure_rate * calls
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._passed = 0
+        self.opened += 1
+        self._transition(OPEN)
+
+    def _close(self) -> None:
+        self._outcomes.clear()
+        self._failed = 0
+        self._passed = 0
+        self._transition(CLOSED)
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        logger.warning("Circuit breaker %s -> %s", previous, state)
+        if self.on_change is not None:
+            self.on_change(previous, state)
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        error = exceptions.CircuitOpen(exceptions.CircuitOpen.get_text())
+        error.retry_after = self.retry_after
+        raise error
@@ -0,0 +1,218 @@
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from .methods import Endpoint
+
+__all__ = ["TTLCache", "CacheBackend", "MemoryBackend", "ResponseCache"]
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    In-memory LRU cache whose entries expire after `ttl` seconds.
+
+    The least recently used entry is evicted once `maxsize` is reached,
+    and passed to `on_evict`. Expired entries stay until evicted and can
+    still be read with `stale=True`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[K, Tuple[Optional[float], V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K, *, stale: bool = False) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if not stale and expires_at is not None:
+            if expires_at <= time.monotonic():
+                return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            evicted, (_, old) = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted, old)
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class CacheBackend(ABC):
+    """
+    Storage of `ResponseCache`.
+
+    Values are raw JSON responses. Implement the three methods to share
+    the cache between processes, e.g. on Redis or memcached.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Value of `key`, `None` if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Stores `value` for `ttl` seconds"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Removes `key` if present"""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU backend, hits are copies the caller may modify"""
+
+    def __init__(self, maxsize: int = 1024):
+        self._cache: TTLCache[str, Any] = TTLCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._cache.get(key)
+        return None if value is None else copy.deepcopy(value)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, copy.deepcopy(value), ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class ResponseCache:
+    """
+    Read-through cache of read-only API methods.
+
+    Only methods with a `cache` TTL in `Methods` are cached (never the
+    sending ones), per token and payload. Identical requests in flight at
+    the same time share a single HTTP request.
+
+    ```
+    client = SMSClient(
+        token="TOKEN",
+        response_cache=ResponseCache(ttls={"GET_LIMIT": 5}),
+    )
+    client.response_cache.hits, client.response_cache.misses
+    ```
+
+    Args:
+        - backend (Optional[CacheBackend]): Defaults to `MemoryBackend()`.
+        - ttls (Optional[Dict[str, float]]): TTL by method name, replacing
+        the defaults of `Methods`. 0 disables caching of a method.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        *,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.backend = backend or MemoryBackend()
+        self.ttls = ttls or {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def get_ttl(self, method: "Endpoint") -> float:
+        return self.ttls.get(method.name, method.cache)
+
+    def key(
+        self, method: "Endpoint", payload: Any, headers: Optional[Dict]
+    ) -> str:
+        # Tokens are hashed, keys may end up in a shared store
+        auth = (headers or {}).get("Authorization", "")
+        account = hashlib.sha256(auth.encode()).hexdigest()[:16]
+        body = json.dumps([method.query, payload], sort_keys=True, default=str)
+        return f"eskiz:{method.method}:{method.path}:{account}:{body}"
+
+    async def fetch(
+        self, key: str, ttl: float, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached value of `key`, or the result of `request()` stored"""
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        self.misses += 1
+        future = asyncio.ensure_future(self._fetch(key, ttl, request))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(future)
+
+    async def _fetch(
+        self, key: str, ttl: float, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = await request()
+        await self.backend.set(key, value, ttl)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        await self.backend.delete(key)
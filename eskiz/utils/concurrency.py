@@ -0,0 +1,200 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from .retry import OVERLOAD_ERRORS
+
+if TYPE_CHECKING:
+    from ..api import SMSClient
+    from .scheduler import PriorityScheduler
+
+__all__ = ["AdaptiveConcurrency"]
+
+logger = logging.getLogger(__name__)
+
+# Smoothing of the recent and the long-term latency averages
+_RECENT = 0.1
+_LONG_TERM = 0.01
+
+
+class AdaptiveConcurrency:
+    """
+    Limits concurrent requests by AIMD (additive increase, multiplicative
+    decrease), as TCP does with its congestion window.
+
+    Requests succeeding while the limit is in use raise it by one per
+    round trip. An overload error (`failures`) or a recent average
+    latency above `latency` multiplies it by `backoff`, at most once per
+    round trip. Without `latency`, the threshold is `tolerance` times the
+    long-term average latency.
+
+    ```
+    client = SMSClient(concurrency=AdaptiveConcurrency())
+    client.concurrency.limit
+    ```
+
+    `max_limit` defaults to the client's `connections_limit`. With a
+    `PriorityScheduler`, the limit is applied to its slots so lanes keep
+    their priorities.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        backoff: float = 0.5,
+        latency: Optional[float] = None,
+        tolerance: float = 2.0,
+        failures: Tuple[Type[BaseException], ...] = OVERLOAD_ERRORS,
+        on_change: Optional[Callable[[int], None]] = None,
+    ):
+        if min_limit < 1 or initial < min_limit:
+            raise ValueError("initial must be at least min_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency = latency
+        self.tolerance = tolerance
+        self.failures = failures
+        self.on_change = on_change
+
+        self.in_flight = 0
+        # Average latency (seconds) of recent requests and the long-term
+        # one, `None` until a request succeeds
+        self.recent_latency: Optional[float] = None
+        self.long_term_latency: Optional[float] = None
+
+        self._limit = float(initial)
+        self._decreased_at = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._schedulers: List["PriorityScheduler"] = []
+
+    def attach(self, client: "SMSClient") -> None:
+        if self.max_limit is None:
+            self.max_limit = client._connections_limit
+            self._limit = min(self._limit, self.max_limit)
+
+        scheduler = client.scheduler
+        if scheduler is not None and scheduler not in self._schedulers:
+            self._schedulers.append(scheduler)
+            scheduler.resize(self.limit)
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self.queue_depth:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Cancelled just after the slot was granted
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        waiters = self._waiters
+        while waiters and self.in_flight < self.limit:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds a slot for one request and adapts the limit to it"""
+        await self.acquire()
+
+        started = time.monotonic()
+        busy = self._busy()
+        try:
+            yield
+        except Exception as error:
+            self._observe(started, isinstance(error, self.failures), busy)
+            raise
+        else:
+            self._observe(started, False, busy)
+        finally:
+            self.release()
+
+    def _busy(self) -> bool:
+        # The limit only grows while it holds requests back
+        if self.in_flight >= self.limit or self._waiters:
+            return True
+        return any(scheduler.queue_depth for scheduler in self._schedulers)
+
+    def _observe(self, started: float, failed: bool, busy: bool) -> None:
+        now = time.monotonic()
+
+        slow = False
+        if not failed:
+            latency = now - started
+            if self.recent_latency is None or self.long_term_latency is None:
+                self.recent_latency = self.long_term_latency = latency
+            else:
+                self.recent_latency += _RECENT * (
+                    latency - self.recent_latency
+                )
+                self.long_term_latency += _LONG_TERM * (
+                    latency - self.long_term_latency
+                )
+
+            threshold = self.latency
+            if threshold is None:
+                threshold = self.tolerance * self.long_term_latency
+            slow = self.recent_latency > threshold
+
+        if failed or slow:
+            # Requests started before the last decrease saw the old limit
+            if started >= self._decreased_at:
+                self._decreased_at = now
+                self._resize(max(self.min_limit, self._limit * self.backoff))
+        elif busy:
+            self._resize(self._limit + 1 / self._limit)
+
+    def _resize(self, limit: float) -> None:
+        if self.max_limit is not None:
+            limit = min(limit, self.max_limit)
+
+        previous, self._limit = self.limit, limit
+        if self.limit == previous:
+            return
+
+        logger.debug("Concurrency limit %d -> %d", previous, self.limit)
+        for scheduler in self._schedulers:
+            scheduler.resize(self.limit)
+        self._wake()
+        if self.on_change is not None:
+            self.on_change(self.limit)
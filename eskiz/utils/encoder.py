@@ -0,0 +1,62 @@
+from typing import AsyncIterator, Iterator
+
+from eskiz.types.sms import Messages
+from eskiz.utils.message import _message_list
+
+__all__ = ["encode_messages", "iter_encode_messages", "StreamedMessages"]
+
+
+def encode_messages(messages: Messages) -> bytes:
+    """
+    Encode a `send-batch` payload straight to JSON bytes in one pass.
+
+    :param messages: Messages
+    :return: bytes
+    """
+    return messages.__pydantic_serializer__.to_json(messages, by_alias=True)
+
+
+def iter_encode_messages(
+    messages: Messages, chunk_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    Encode a `send-batch` payload as JSON bytes, `chunk_size` messages at a
+    time, so the whole body is never held in memory at once.
+
+    :param messages: Messages
+    :param chunk_size: Messages per yielded chunk
+    :return: Iterator[bytes]
+    """
+    envelope = messages.__pydantic_serializer__.to_json(
+        messages, by_alias=True, exclude={"messages"}
+    )
+
+    yield b'{"messages":['
+    items = messages.messages
+    for start in range(0, len(items), chunk_size):
+        chunk = _message_list.dump_json(
+            items[start : start + chunk_size], by_alias=True
+        )[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+
+    # Rest of the envelope: `],"from":...,"dispatch_id":...}`
+    if envelope == b"{}":
+        yield b"]}"
+    else:
+        yield b"]," + envelope[1:]
+
+
+class StreamedMessages:
+    """
+    Re-iterable async body for `aiohttp`, sent with chunked transfer
+    encoding. Each iteration encodes the payload again, so a retried
+    request sends the same bytes.
+    """
+
+    def __init__(self, messages: Messages, chunk_size: int = 1000):
+        self.messages = messages
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in iter_encode_messages(self.messages, self.chunk_size):
+            yield chunk
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional
 
 
@@ -50,3 +51,32 @@ class FieldsFormatInvalid(EskizError, match="FIELDS_FORMAT_INVALID"):
 
 class UnknownMethod(EskizError, match="UNKNOWN_METHOD"):
     pass
+
+
+class TooManyRequests(EskizError, match="TOO_MANY_REQUESTS"):
+    pass
+
+
+class ServerError(EskizError, match="SERVER_ERROR"):
+    pass
+
+
+class RequestTimeout(
+    EskizError, asyncio.TimeoutError, match="REQUEST_TIMEOUT"
+):
+    pass
+
+
+class TemplateNotMatched(EskizError, match="TEMPLATE_NOT_MATCHED"):
+    pass
+
+
+class InsufficientBalance(EskizError, match="INSUFFICIENT_BALANCE"):
+    pass
+
+
+class CircuitOpen(EskizError, match="CIRCUIT_OPEN"):
+    """Raised without sending while a `CircuitBreaker` is open."""
+
+    # Seconds until the breaker lets trial requests through
+    retry_after: float = 0.0
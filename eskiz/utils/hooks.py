@@ -0,0 +1,105 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence
+
+import aiohttp
+
+__all__ = ["RequestEvent", "RequestHook", "trace_config"]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestEvent:
+    """One attempt of an `SMSClient` request, filled in as it goes."""
+
+    # `Methods` name and group
+    method: str
+    group: Optional[str] = None
+    attempt: int = 1
+    started: float = field(default_factory=time.monotonic)
+    # Seconds from `started`, set once the attempt ends
+    duration: Optional[float] = None
+    # HTTP status, `None` if no response arrived
+    status: Optional[int] = None
+    error: Optional[BaseException] = None
+    # Request and response body sizes
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # Seconds spent waiting for a free connection of the pool
+    pool_wait: float = 0.0
+    # Free for hooks to keep their own state, e.g. a tracing span
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+class RequestHook:
+    """
+    Observes every attempt of `SMSClient` requests, override what you
+    need. Errors raised by hooks are logged and never fail requests.
+
+    ```
+    class Tracing(RequestHook):
+        def on_start(self, event):
+            event.context["span"] = tracer.start_span(event.method)
+
+        def on_end(self, event):
+            span = event.context["span"]
+            span.set_attribute("http.status_code", event.status or 0)
+            span.end()
+
+    client = SMSClient(hooks=[Tracing()])
+    ```
+    """
+
+    def on_start(self, event: RequestEvent) -> None:
+        """Called before waiting for the rate limit and a connection"""
+
+    def on_end(self, event: RequestEvent) -> None:
+        """Called once the attempt succeeded or failed"""
+
+    def on_retry(self, event: RequestEvent, delay: float) -> None:
+        """Called after a failed attempt when another follows in `delay`"""
+
+
+def _emit(hooks: Sequence[RequestHook], name: str, *args: Any) -> None:
+    for hook in hooks:
+        try:
+            getattr(hook, name)(*args)
+        except Exception:
+            logger.exception("Request hook %r failed", hook)
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """
+    `aiohttp` tracing of the connection pool wait and body sizes into
+    the `RequestEvent` passed as `trace_request_ctx`.
+    """
+    config = aiohttp.TraceConfig()
+    config.on_connection_queued_start.append(_queued_start)
+    config.on_connection_queued_end.append(_queued_end)
+    config.on_request_chunk_sent.append(_chunk_sent)
+    config.on_response_chunk_received.append(_chunk_received)
+    return config
+
+
+async def _queued_start(session, context, params) -> None:
+    context.queued_at = time.monotonic()
+
+
+async def _queued_end(session, context, params) -> None:
+    event = context.trace_request_ctx
+    if isinstance(event, RequestEvent):
+        event.pool_wait += time.monotonic() - context.queued_at
+
+
+async def _chunk_sent(session, context, params) -> None:
+    event = context.trace_request_ctx
+    if isinstance(event, RequestEvent):
+        event.bytes_sent += len(params.chunk)
+
+
+async def _chunk_received(session, context, params) -> None:
+    event = context.trace_request_ctx
+    if isinstance(event, RequestEvent):
+        event.bytes_received += len(params.chunk)
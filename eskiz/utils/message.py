@@ -1,9 +1,18 @@
 import uuid
-from typing import List, Optional, Union
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import TypeAdapter
 
 from eskiz.types.sms import Message, Messages
+from eskiz.utils import exceptions
 from eskiz.utils.fields import _generate_data
 
+if TYPE_CHECKING:
+    from eskiz.templates import TemplateIndex
+
+_message_list = TypeAdapter(List[Message])
+
 
 class MessageBuilder:
     def __init__(
@@ -12,12 +21,16 @@ class MessageBuilder:
         *,
         from_: str = "4546",
         messages: Optional[List[Message]] = None,
+        templates: Optional["TemplateIndex"] = None,
     ):
         self.messages = messages or []
         self.from_ = from_
         self.dispatch_id = dispatch_id
+        self.templates = templates
 
     def add(self, to: int, text: str, user_sms_id: Optional[str] = None):
+        _check_template(self.templates, text)
+
         if user_sms_id is None:
             user_sms_id = str(uuid.uuid4())
 
@@ -31,3 +44,99 @@ class MessageBuilder:
             from_=self.from_,  # type: ignore[call-arg]
             dispatch_id=self.dispatch_id,
         )
+
+
+class CompactMessageBuilder:
+    """
+    Memory-efficient builder for very large campaigns.
+
+    Phone numbers are kept in an int64 `array`, identical texts are stored
+    once, and `user_sms_id`s are generated as `<id_prefix>-<index>` unless
+    given. `Message` models are only validated when `chunks()` yields them.
+    With `templates`, each distinct text is checked once.
+
+    ```
+    builder = CompactMessageBuilder(dispatch_id=123)
+    for user in users:
+        builder.add(to=user.phone, text="hi")
+
+    for messages in builder.chunks(500):
+        await client.send_batch_sms(messages)
+    ```
+    """
+
+    def __init__(
+        self,
+        dispatch_id: Union[str, int],
+        *,
+        from_: str = "4546",
+        id_prefix: Optional[str] = None,
+        templates: Optional["TemplateIndex"] = None,
+    ):
+        self.from_ = from_
+        self.dispatch_id = dispatch_id
+        self.id_prefix = id_prefix or uuid.uuid4().hex[:16]
+        self.templates = templates
+
+        self._phones = array("q")
+        self._text_ids = array("L")
+        self._texts: List[str] = []
+        self._text_index: Dict[str, int] = {}
+        self._user_sms_ids: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._phones)
+
+    def add(self, to: int, text: str, user_sms_id: Optional[str] = None):
+        text_id = self._text_index.get(text)
+        if text_id is None:
+            _check_template(self.templates, text)
+            text_id = self._text_index[text] = len(self._texts)
+            self._texts.append(text)
+
+        if user_sms_id is not None:
+            self._user_sms_ids[len(self._phones)] = user_sms_id
+
+        self._phones.append(int(to))
+        self._text_ids.append(text_id)
+
+    def user_sms_id(self, index: int) -> str:
+        return self._user_sms_ids.get(index) or f"{self.id_prefix}-{index}"
+
+    def records(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, str]]:
+        """Yields (phone, text, user_sms_id) tuples"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield (
+                self._phones[index],
+                self._texts[self._text_ids[index]],
+                self.user_sms_id(index),
+            )
+
+    def chunks(self, size: int, start: int = 0) -> Iterator[Messages]:
+        """Yields validated `Messages` of at most `size` messages each"""
+        for offset in range(start, len(self), size):
+            yield self._materialize(offset, offset + size)
+
+    def as_messages(self) -> Messages:
+        return self._materialize(0, len(self))
+
+    def _materialize(self, start: int, stop: int) -> Messages:
+        messages = _message_list.validate_python(
+            [
+                {"to": to, "text": text, "user_sms_id": user_sms_id}
+                for to, text, user_sms_id in self.records(start, stop)
+            ]
+        )
+        return Messages(
+            messages=messages,
+            from_=self.from_,  # type: ignore[call-arg]
+            dispatch_id=self.dispatch_id,
+        )
+
+
+def _check_template(templates: Optional["TemplateIndex"], text: str) -> None:
+    if templates is not None and text not in templates:
+        raise exceptions.TemplateNotMatched(f"No template matches: {text!r}")
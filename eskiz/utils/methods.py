@@ -1,40 +1,129 @@
+from dataclasses import dataclass, fields, replace
+from typing import Any, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+__all__ = ["Endpoint", "Methods"]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    An API method, immutable and safe to share between requests.
+
+    Path parameters and query strings are applied to a copy with `bind`
+    and `with_query`. Read access by key (`endpoint["path"]`) is kept for
+    code written against the former `dict` methods.
+    """
+
+    name: str
+    method: str
+    path: str
+    group: Optional[str] = None
+    # Replayed on retry after failures that may have reached the gateway
+    idempotent: bool = True
+    # Seconds a response may be served from a `ResponseCache`
+    cache: float = 0
+    query: Optional[Tuple[Tuple[str, str], ...]] = None
+
+    def bind(self, **params: Any) -> "Endpoint":
+        """Copy with path parameters filled in, URL-quoted"""
+        path = self.path.format(
+            **{
+                key: quote(str(value), safe="")
+                for key, value in params.items()
+            }
+        )
+        return replace(self, path=path)
+
+    def with_query(self, query: Mapping[str, Any]) -> "Endpoint":
+        """Copy with a query string"""
+        items = tuple((key, str(value)) for key, value in query.items())
+        return replace(self, query=items or None)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _FIELDS else default
+
+
+_FIELDS = frozenset(field.name for field in fields(Endpoint))
+
+
 class Methods:
     """
     List of API methods
 
+    Each method belongs to a `group` (its category below), which is used to
+    apply per-group client settings such as rate limits. Methods marked
+    `idempotent=False` are only retried when the request never reached
+    the gateway. Read-only methods with `cache` may be served from a
+    `ResponseCache` for that many seconds.
+
     https://documenter.getpostman.com/view/663428/RzfmES4z
     """
 
     # AUTHORIZATION
-    GET_TOKEN = {"method": "POST", "path": "auth/login"}
-    REFRESH_TOKEN = {"method": "PATCH", "path": "auth/refresh"}
-    GET_USER_DATA = {"method": "GET", "path": "auth/user"}
+    GET_TOKEN = Endpoint("GET_TOKEN", "POST", "auth/login", "auth")
+    REFRESH_TOKEN = Endpoint("REFRESH_TOKEN", "PATCH", "auth/refresh", "auth")
+    GET_USER_DATA = Endpoint(
+        "GET_USER_DATA", "GET", "auth/user", "auth", cache=60
+    )
 
     # TEMPLATES
-    GET_TEMPLATE = {"method": "GET", "path": "template/{id}"}
-    GET_TEMPLATE_LIST = {"method": "GET", "path": "templates/"}
+    GET_TEMPLATE = Endpoint(
+        "GET_TEMPLATE", "GET", "template/{id}", "templates"
+    )
+    GET_TEMPLATE_LIST = Endpoint(
+        "GET_TEMPLATE_LIST", "GET", "templates/", "templates"
+    )
 
     # SENDING
-    SEND_SMS = {"method": "POST", "path": "message/sms/send"}
-    SEND_BATCH_SMS = {"method": "POST", "path": "message/sms/send-batch"}
-    SEND_INTERNATIONAL_SMS = {
-        "method": "POST",
-        "path": "message/sms/send-global",
-    }
-    GET_MESSAGE_DETAILS = {
-        "method": "POST",
-        "path": "message/sms/get-user-messages",
-    }
-    GET_MESSAGE_BY_DISPATCH = {
-        "method": "POST",
-        "path": "message/sms/get-user-messages-by-dispatch",
-    }
-    GET_DISPATCH_STATUS = {
-        "method": "POST",
-        "path": "message/sms/get-dispatch-status",
-    }
-    GET_NICK_LIST = {"method": "GET", "path": "nick/me"}
+    SEND_SMS = Endpoint(
+        "SEND_SMS", "POST", "message/sms/send", "sending", idempotent=False
+    )
+    SEND_BATCH_SMS = Endpoint(
+        "SEND_BATCH_SMS",
+        "POST",
+        "message/sms/send-batch",
+        "sending",
+        idempotent=False,
+    )
+    SEND_INTERNATIONAL_SMS = Endpoint(
+        "SEND_INTERNATIONAL_SMS",
+        "POST",
+        "message/sms/send-global",
+        "sending",
+        idempotent=False,
+    )
+    GET_MESSAGE_DETAILS = Endpoint(
+        "GET_MESSAGE_DETAILS",
+        "POST",
+        "message/sms/get-user-messages",
+        "sending",
+    )
+    GET_MESSAGE_BY_DISPATCH = Endpoint(
+        "GET_MESSAGE_BY_DISPATCH",
+        "POST",
+        "message/sms/get-user-messages-by-dispatch",
+        "sending",
+    )
+    GET_DISPATCH_STATUS = Endpoint(
+        "GET_DISPATCH_STATUS",
+        "POST",
+        "message/sms/get-dispatch-status",
+        "sending",
+    )
+    GET_NICK_LIST = Endpoint(
+        "GET_NICK_LIST", "GET", "nick/me", "sending", cache=300
+    )
 
     # REPORTS
-    GET_SMS_TOTALS = {"method": "POST", "path": "user/totals"}
-    GET_LIMIT = {"method": "GET", "path": "user/get-limit"}
+    GET_SMS_TOTALS = Endpoint(
+        "GET_SMS_TOTALS", "POST", "user/totals", "reports", cache=60
+    )
+    GET_LIMIT = Endpoint(
+        "GET_LIMIT", "GET", "user/get-limit", "reports", cache=10
+    )
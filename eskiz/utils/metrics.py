@@ -0,0 +1,296 @@
+import asyncio
+import bisect
+import contextlib
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from aiohttp import web
+
+from .hooks import RequestEvent, RequestHook
+
+__all__ = ["Metrics", "MetricsExporter", "MetricFamily", "Sample"]
+
+logger = logging.getLogger(__name__)
+
+# Seconds, as the Prometheus client defaults
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_Key = Tuple[str, ...]
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    # "counter", "gauge" or "histogram"
+    type: str
+    help: str
+    samples: List[Sample]
+
+
+class MetricsExporter:
+    """
+    Receives the collected metrics every `interval` of `Metrics.start`,
+    e.g. to record them with an OpenTelemetry meter or push them to a
+    gateway.
+    """
+
+    async def export(self, families: List[MetricFamily]) -> None:
+        raise NotImplementedError
+
+
+class _Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[_Key, float] = {}
+
+    def inc(self, key: _Key = (), amount: float = 1) -> None:
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        return [
+            Sample(self.name, dict(zip(self.labels, key)), value)
+            for key, value in self.values.items()
+        ]
+
+
+class _Gauge(_Counter):
+    type = "gauge"
+
+
+class _Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Count per bucket (not cumulative), then +Inf and the sum
+        self.values: Dict[_Key, List[float]] = {}
+
+    def observe(self, value: float, key: _Key = ()) -> None:
+        counts = self.values.get(key)
+        if counts is None:
+            counts = self.values[key] = [0.0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        for key, counts in self.values.items():
+            labels = dict(zip(self.labels, key))
+
+            total = 0.0
+            bounds = [*map(_format, self.buckets), "+Inf"]
+            for bound, count in zip(bounds, counts):
+                total += count
+                samples.append(
+                    Sample(
+                        f"{self.name}_bucket", {**labels, "le": bound}, total
+                    )
+                )
+            samples.append(Sample(f"{self.name}_sum", labels, counts[-1]))
+            samples.append(Sample(f"{self.name}_count", labels, total))
+        return samples
+
+
+class Metrics(RequestHook):
+    """
+    Aggregates `SMSClient` requests into Prometheus-style metrics:
+    latency per method, HTTP statuses, errors by `EskizError` subclass,
+    body sizes, connection pool wait and retries.
+
+    ```
+    metrics = Metrics()
+    client = SMSClient(hooks=[metrics])
+
+    # Scraped by Prometheus
+    app.router.add_get("/metrics", metrics.handle)
+
+    # Pushed elsewhere, e.g. to OpenTelemetry
+    metrics.start(exporter, interval=15)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        namespace: str = "eskiz",
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        buckets = tuple(buckets)
+
+        self.duration = _Histogram(
+            f"{namespace}_request_duration_seconds",
+            "Request attempt latency, including waits for a connection",
+            ("method",),
+            buckets,
+        )
+        self.requests = _Counter(
+            f"{namespace}_requests_total",
+            "Request attempts by HTTP status, none without a response",
+            ("method", "status"),
+        )
+        self.errors = _Counter(
+            f"{namespace}_errors_total",
+            "Failed request attempts by error class",
+            ("method", "error"),
+        )
+        self.bytes_sent = _Counter(
+            f"{namespace}_request_bytes_total",
+            "Request body bytes sent",
+            ("method",),
+        )
+        self.bytes_received = _Counter(
+            f"{namespace}_response_bytes_total",
+            "Response body bytes received",
+            ("method",),
+        )
+        self.pool_wait = _Histogram(
+            f"{namespace}_pool_wait_seconds",
+            "Wait for a free connection of the pool",
+            buckets=buckets,
+        )
+        self.retries = _Counter(
+            f"{namespace}_retries_total",
+            "Request attempts followed by a retry",
+            ("method",),
+        )
+        self.in_flight = _Gauge(
+            f"{namespace}_requests_in_flight",
+            "Request attempts started and not finished",
+        )
+
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def _metrics(self):
+        return (
+            self.duration,
+            self.requests,
+            self.errors,
+            self.bytes_sent,
+            self.bytes_received,
+            self.pool_wait,
+            self.retries,
+            self.in_flight,
+        )
+
+    def on_start(self, event: RequestEvent) -> None:
+        self.in_flight.inc()
+
+    def on_end(self, event: RequestEvent) -> None:
+        method = (event.method,)
+
+        self.in_flight.inc(amount=-1)
+        self.duration.observe(event.duration or 0.0, method)
+        status = "none" if event.status is None else str(event.status)
+        self.requests.inc((event.method, status))
+        if event.error is not None:
+            self.errors.inc((event.method, type(event.error).__name__))
+
+        if event.bytes_sent:
+            self.bytes_sent.inc(method, event.bytes_sent)
+        if event.bytes_received:
+            self.bytes_received.inc(method, event.bytes_received)
+        if event.status is not None:
+            self.pool_wait.observe(event.pool_wait)
+
+    def on_retry(self, event: RequestEvent, delay: float) -> None:
+        self.retries.inc((event.method,))
+
+    def collect(self) -> List[MetricFamily]:
+        return [
+            MetricFamily(metric.name, metric.type, metric.help, samples)
+            for metric in self._metrics
+            if (samples := metric.samples())
+        ]
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                lines.append(
+                    f"{sample.name}{_labels(sample.labels)} "
+                    f"{_format(sample.value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """`aiohttp` handler of a Prometheus scrape"""
+        return web.Response(
+            body=self.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    def start(self, exporter: MetricsExporter, interval: float = 60) -> None:
+        """Exports the metrics every `interval` seconds in the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run(exporter, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, exporter: MetricsExporter, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await exporter.export(self.collect())
+            except Exception:
+                logger.exception("Exporting metrics failed")
+
+
+def _format(value: float) -> str:
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
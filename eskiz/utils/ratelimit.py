@@ -0,0 +1,157 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Optional
+
+__all__ = ["RateLimiter", "TokenBucket", "SlidingWindow"]
+
+
+class RateLimiter(ABC):
+    """
+    Base class for client-side rate limiters.
+
+    Waiters are served in FIFO order: `acquire()` returns once the request
+    may be sent and the number of seconds it had to wait.
+    """
+
+    def __init__(self) -> None:
+        self._lock: Optional[asyncio.Lock] = None
+        self._waiters = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return self._waiters
+
+    @property
+    @abstractmethod
+    def wait_time(self) -> float:
+        """Estimated delay (seconds) for a request acquiring right now."""
+
+    @abstractmethod
+    def _delay(self, now: float) -> float:
+        """Reserve a slot and return 0, or return seconds until one frees."""
+
+    def try_acquire(self) -> float:
+        """
+        Reserves a slot without waiting: returns 0, or the seconds until
+        one frees. Callers queued in `acquire` are not given precedence.
+        """
+        return self._delay(time.monotonic())
+
+    async def acquire(self) -> float:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        started = time.monotonic()
+        self._waiters += 1
+        try:
+            async with self._lock:
+                while True:
+                    delay = self._delay(time.monotonic())
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+        finally:
+            self._waiters -= 1
+
+        return time.monotonic() - started
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class TokenBucket(RateLimiter):
+    """
+    Token bucket: `rate` requests per second with bursts up to `capacity`,
+    which defaults to `rate` but holds at least one request.
+
+    ```
+    limiter = TokenBucket(rate=20, capacity=20)
+    ```
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        if capacity is None:
+            capacity = max(1.0, rate)
+        elif capacity < 1:
+            raise ValueError("capacity must hold at least one request")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _delay(self, now: float) -> float:
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    @property
+    def wait_time(self) -> float:
+        self._refill(time.monotonic())
+        deficit = self._waiters + 1 - self._tokens
+        return max(0.0, deficit / self.rate)
+
+
+class SlidingWindow(RateLimiter):
+    """
+    Sliding window log: at most `limit` requests in any `period` seconds.
+
+    ```
+    limiter = SlidingWindow(limit=100, period=60)
+    ```
+    """
+
+    def __init__(self, limit: int, period: float = 1.0):
+        super().__init__()
+        if limit < 1 or period <= 0:
+            raise ValueError("limit and period must be positive")
+
+        self.limit = limit
+        self.period = period
+        self._window: Deque[float] = deque()
+
+    def _evict(self, now: float) -> None:
+        while self._window and self._window[0] <= now - self.period:
+            self._window.popleft()
+
+    def _delay(self, now: float) -> float:
+        self._evict(now)
+        if len(self._window) < self.limit:
+            self._window.append(now)
+            return 0.0
+        return self._window[0] + self.period - now
+
+    @property
+    def wait_time(self) -> float:
+        now = time.monotonic()
+        self._evict(now)
+
+        # Slot that frees up for the next caller behind current waiters
+        index = len(self._window) - self.limit + self._waiters
+        if index < 0:
+            return 0.0
+
+        cycles, position = divmod(index, self.limit)
+        if position >= len(self._window):
+            return self.period * (cycles + 1)
+        return max(
+            0.0, self._window[position] + self.period * (cycles + 1) - now
+        )
@@ -0,0 +1,106 @@
+import asyncio
+import random
+from typing import Optional, Tuple, Type
+
+import aiohttp
+
+from . import exceptions
+
+__all__ = ["RetryPolicy", "is_unsent"]
+
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    exceptions.ServerError,
+    exceptions.TooManyRequests,
+)
+
+# Errors raised before the gateway could have accepted the request
+UNDELIVERED_ERRORS: Tuple[Type[BaseException], ...] = (
+    aiohttp.ClientConnectorError,
+    exceptions.TooManyRequests,
+    exceptions.CircuitOpen,
+)
+
+# Errors meaning the gateway is overloaded or unreachable, the ones worth
+# retrying
+OVERLOAD_ERRORS = RETRYABLE_ERRORS
+
+
+def is_unsent(error: BaseException) -> bool:
+    """
+    Whether a send that raised `error` was certainly not accepted, so it
+    was not billed: it never reached the gateway, the gateway refused it
+    or it was invalid before sending. A 5xx, a timeout, a dropped
+    connection or a cancellation may follow an accepted send.
+    """
+    if isinstance(error, UNDELIVERED_ERRORS):
+        return True
+    if isinstance(error, (exceptions.ServerError, asyncio.TimeoutError)):
+        return False
+    return isinstance(error, (exceptions.EskizError, ValueError, TypeError))
+
+
+class RetryPolicy:
+    """
+    Retry policy for `SMSClient.request`.
+
+    Delays grow as `backoff * multiplier ** (attempt - 1)` up to
+    `max_backoff`, and each one is shortened by a random share of up to
+    `jitter`. `deadline` caps the total time (seconds) spent on a request.
+
+    Sending methods are only retried after errors raised before the
+    request reached the gateway (`UNDELIVERED_ERRORS`). The gateway does
+    not deduplicate sends, so a 5xx or a timeout may follow an accepted
+    message; `resend` retries sends after those too, at the risk of
+    sending twice.
+
+    ```
+    client = SMSClient(retry=RetryPolicy(max_attempts=5, deadline=30))
+    ```
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        *,
+        backoff: float = 0.5,
+        multiplier: float = 2.0,
+        max_backoff: float = 30.0,
+        jitter: float = 0.5,
+        deadline: Optional[float] = None,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+        resend: bool = False,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be positive")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.resend = resend
+
+    def get_delay(self, attempt: int) -> float:
+        """Delay (seconds) before the attempt following `attempt`."""
+        delay = min(
+            self.max_backoff, self.backoff * self.multiplier ** (attempt - 1)
+        )
+        return delay * (1 - self.jitter * random.random())
+
+    def is_retryable(self, error: BaseException, *, idempotent: bool) -> bool:
+        """
+        Classifies an error raised by a request attempt.
+
+        Gateway failures arrive as `EskizError` subclasses picked by
+        `EskizError.detect`, so they are matched by type like network
+        errors.
+        """
+        if not isinstance(error, self.retry_on):
+            return False
+        return idempotent or isinstance(error, UNDELIVERED_ERRORS)
@@ -0,0 +1,347 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .methods import Endpoint
+from .ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+    from ..api import SMSClient
+
+__all__ = [
+    "CRITICAL",
+    "BULK",
+    "REPORTING",
+    "Lane",
+    "LaneStats",
+    "PriorityScheduler",
+]
+
+CRITICAL = "critical"
+BULK = "bulk"
+REPORTING = "reporting"
+
+
+@dataclass(frozen=True)
+class Lane:
+    """
+    A class of traffic sharing the scheduler's slots.
+
+    - `weight`: Share of slots and rate-limit tokens while other lanes
+      are backlogged.
+    - `slo`: Target queueing delay (seconds). Requests waiting longer are
+      served ahead of every other lane, so low weights never starve.
+    - `share`: Largest fraction of slots the lane may hold at once, the
+      rest stays free for other lanes.
+    """
+
+    name: str
+    weight: float = 1.0
+    slo: Optional[float] = None
+    share: Optional[float] = None
+
+
+DEFAULT_LANES = (
+    Lane(CRITICAL, weight=8, slo=0.05),
+    Lane(BULK, weight=2, slo=30, share=0.8),
+    Lane(REPORTING, weight=1, slo=10, share=0.5),
+)
+
+# `Methods` names sent through another lane than `default_lane`
+DEFAULT_ROUTES = {
+    "GET_TOKEN": CRITICAL,
+    "REFRESH_TOKEN": CRITICAL,
+    "SEND_SMS": CRITICAL,
+    "SEND_INTERNATIONAL_SMS": CRITICAL,
+    "SEND_BATCH_SMS": BULK,
+}
+
+
+class LaneStats(NamedTuple):
+    waiting: int
+    active: int
+    granted: int
+    # Requests that waited longer than the lane's `slo`
+    slo_misses: int
+    # Queueing delay (seconds) of recent requests
+    p50: float
+    p99: float
+
+
+class _Waiter:
+    __slots__ = ("future", "limiter", "enqueued")
+
+    def __init__(self, future: asyncio.Future, limiter: Optional[RateLimiter]):
+        self.future = future
+        self.limiter = limiter
+        self.enqueued = time.monotonic()
+
+
+class _LaneState:
+    __slots__ = (
+        "lane",
+        "index",
+        "waiters",
+        "active",
+        "granted",
+        "slo_misses",
+        "finish",
+        "samples",
+    )
+
+    def __init__(self, lane: Lane, index: int, samples: int):
+        self.lane = lane
+        self.index = index
+        self.waiters: Deque[_Waiter] = deque()
+        self.active = 0
+        self.granted = 0
+        self.slo_misses = 0
+        # Virtual time at which the lane's next request is due
+        self.finish = 0.0
+        self.samples: Deque[float] = deque(maxlen=samples)
+
+    def head(self) -> Optional[_Waiter]:
+        # Cancelled waiters are dropped once they reach the head
+        waiters = self.waiters
+        while waiters and waiters[0].future.done():
+            waiters.popleft()
+        return waiters[0] if waiters else None
+
+
+class PriorityScheduler:
+    """
+    Orders the requests of one or more clients by lane before they take
+    a connection slot and a rate-limit token.
+
+    Lanes share `slots` concurrent requests by weighted fair queuing, and
+    each granted request takes its `Methods` group token right away, so
+    the rate limiter is shared by the same weights instead of its FIFO
+    order. With the default lanes, OTPs sent with `send_sms` wait for
+    the next free slot rather than behind a campaign's batches.
+
+    ```
+    client = SMSClient(scheduler=PriorityScheduler())
+
+    # Any call can be moved to another lane
+    with client.with_lane("bulk"):
+        await client.send_sms(998991234567, "Sale!")
+
+    client.scheduler.stats()["critical"].p99
+    ```
+
+    `slots` defaults to the `connections_limit` of the first client, keep
+    it no higher than the connector's limit so no request queues behind
+    the scheduler's back.
+    """
+
+    def __init__(
+        self,
+        lanes: Iterable[Lane] = DEFAULT_LANES,
+        *,
+        slots: Optional[int] = None,
+        routes: Optional[Mapping[str, str]] = None,
+        default_lane: str = REPORTING,
+        samples: int = 1000,
+    ):
+        if slots is not None and slots < 1:
+            raise ValueError("slots must be positive")
+
+        self._states: Dict[str, _LaneState] = {}
+        for index, lane in enumerate(lanes):
+            if lane.weight <= 0:
+                raise ValueError("Lane weight must be positive")
+            if lane.share is not None and not 0 < lane.share <= 1:
+                raise ValueError("Lane share must be between 0 and 1")
+            if lane.name in self._states:
+                raise ValueError(f"Duplicate lane: {lane.name}")
+            self._states[lane.name] = _LaneState(lane, index, samples)
+
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.default_lane = default_lane
+        for name in (default_lane, *self.routes.values()):
+            self._state(name)
+
+        self.slots = slots
+        self._active = 0
+        # Start of the last granted request in virtual time
+        self._virtual = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+
+    def attach(self, client: "SMSClient") -> None:
+        if self.slots is None:
+            self.slots = client._connections_limit
+
+    def resize(self, slots: int) -> None:
+        """
+        Changes the number of slots, requests above a smaller number keep
+        theirs until they finish.
+        """
+        if slots < 1:
+            raise ValueError("slots must be positive")
+        self.slots = slots
+        self._dispatch()
+
+    @property
+    def lanes(self) -> List[Lane]:
+        return [state.lane for state in self._states.values()]
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting in all lanes, including cancelled ones"""
+        return sum(len(state.waiters) for state in self._states.values())
+
+    def lane_for(self, method: Endpoint) -> str:
+        return self.routes.get(method.name, self.default_lane)
+
+    def _state(self, lane: str) -> _LaneState:
+        try:
+            return self._states[lane]
+        except KeyError:
+            raise ValueError(f"Unknown lane: {lane}") from None
+
+    def _limit(self, state: _LaneState) -> int:
+        slots = self.slots or 1
+        if state.lane.share is None:
+            return slots
+        return max(1, int(slots * state.lane.share))
+
+    async def acquire(
+        self, lane: str, limiter: Optional[RateLimiter] = None
+    ) -> float:
+        """
+        Waits for a slot (and a `limiter` token) in `lane`, returns the
+        seconds it waited. Every acquire must be followed by `release`.
+        """
+        state = self._state(lane)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), limiter)
+
+        # An idle lane does not save up credit while others are served
+        if state.head() is None:
+            state.finish = max(state.finish, self._virtual)
+        state.waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            # Cancelled just after the slot was granted
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(lane)
+            raise
+
+    def release(self, lane: str) -> None:
+        state = self._state(lane)
+        state.active -= 1
+        self._active -= 1
+        self._dispatch()
+
+    def _pick(
+        self, now: float, skip: Set[_LaneState]
+    ) -> Optional[Tuple[_LaneState, _Waiter]]:
+        best = None
+        best_key: Optional[Tuple[int, float, int]] = None
+
+        for state in self._states.values():
+            if state in skip or state.active >= self._limit(state):
+                continue
+            waiter = state.head()
+            if waiter is None:
+                continue
+
+            slo = state.lane.slo
+            if slo is not None and now - waiter.enqueued >= slo:
+                # Overdue, the longest overdue goes first
+                key = (0, waiter.enqueued + slo, state.index)
+            else:
+                key = (1, state.finish, state.index)
+
+            if best_key is None or key < best_key:
+                best, best_key = (state, waiter), key
+        return best
+
+    def _dispatch(self) -> None:
+        slots = self.slots or 1
+        now = time.monotonic()
+        # Lanes waiting for a rate-limit token this round
+        blocked: Set[_LaneState] = set()
+        retry_at: Optional[float] = None
+
+        while self._active < slots:
+            picked = self._pick(now, blocked)
+            if picked is None:
+                break
+            state, waiter = picked
+
+            if waiter.limiter is not None:
+                delay = waiter.limiter.try_acquire()
+                if delay > 0:
+                    blocked.add(state)
+                    if retry_at is None or now + delay < retry_at:
+                        retry_at = now + delay
+                    continue
+
+            state.waiters.popleft()
+            self._grant(state, waiter, now)
+
+        if retry_at is not None:
+            self._wake_at(retry_at)
+
+    def _grant(self, state: _LaneState, waiter: _Waiter, now: float) -> None:
+        wait = now - waiter.enqueued
+        slo = state.lane.slo
+        if slo is not None and wait > slo:
+            state.slo_misses += 1
+
+        self._virtual = state.finish
+        state.finish += 1 / state.lane.weight
+        state.active += 1
+        state.granted += 1
+        state.samples.append(wait)
+        self._active += 1
+
+        waiter.future.set_result(wait)
+
+    def _wake_at(self, at: float) -> None:
+        if self._timer is not None:
+            if self._timer_at <= at:
+                return
+            self._timer.cancel()
+
+        self._timer_at = at
+        self._timer = asyncio.get_running_loop().call_later(
+            at - time.monotonic(), self._on_timer
+        )
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def stats(self) -> Dict[str, LaneStats]:
+        """Queue, concurrency and queueing delay of each lane"""
+        return {name: _stats(state) for name, state in self._states.items()}
+
+
+def _stats(state: _LaneState) -> LaneStats:
+    waiting = sum(not waiter.future.done() for waiter in state.waiters)
+    samples = sorted(state.samples)
+    p50 = p99 = 0.0
+    if samples:
+        p50 = samples[len(samples) // 2]
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return LaneStats(
+        waiting, state.active, state.granted, state.slo_misses, p50, p99
+    )
@@ -0,0 +1,167 @@
+import functools
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+__all__ = [
+    "GSM7",
+    "UCS2",
+    "Segments",
+    "segments",
+    "segments_batch",
+    "count_parts",
+    "price",
+    "transliterate",
+]
+
+GSM7 = "GSM-7"
+UCS2 = "UCS-2"
+
+# GSM 03.38 default alphabet
+GSM7_BASIC = frozenset(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+# Extension table, each character takes two septets (escape + char)
+GSM7_EXTENDED = frozenset("^{}\\[~]|€\f")
+
+# (single part, per part when concatenated)
+LIMITS = {GSM7: (160, 153), UCS2: (70, 67)}
+
+_NON_BASIC = re.compile("[^" + re.escape("".join(sorted(GSM7_BASIC))) + "]")
+_NON_GSM7 = re.compile(
+    "[^" + re.escape("".join(sorted(GSM7_BASIC | GSM7_EXTENDED))) + "]"
+)
+_EXTENDED = re.compile("[" + re.escape("".join(sorted(GSM7_EXTENDED))) + "]")
+
+# Uzbek and Russian Cyrillic, typographic quotes and dashes
+# fmt: off
+_TRANSLITERATION = {
+    "А": "A", "Б": "B", "В": "V", "Г": "G", "Д": "D", "Е": "E", "Ё": "Yo",
+    "Ж": "J", "З": "Z", "И": "I", "Й": "Y", "К": "K", "Л": "L", "М": "M",
+    "Н": "N", "О": "O", "П": "P", "Р": "R", "С": "S", "Т": "T", "У": "U",
+    "Ф": "F", "Х": "X", "Ц": "Ts", "Ч": "Ch", "Ш": "Sh", "Щ": "Sh",
+    "Ъ": "'", "Ы": "I", "Ь": "", "Э": "E", "Ю": "Yu", "Я": "Ya",
+    "Ў": "O'", "Қ": "Q", "Ғ": "G'", "Ҳ": "H",
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh",
+    "ъ": "'", "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "ў": "o'", "қ": "q", "ғ": "g'", "ҳ": "h",
+    "ʻ": "'", "ʼ": "'", "‘": "'", "’": "'", "`": "'", "´": "'",
+    "“": '"', "”": '"', "«": '"', "»": '"', "„": '"',
+    "–": "-", "—": "-", "…": "...", "№": "#", "\t": " ", " ": " ",
+}
+# fmt: on
+_TRANSLATE_TABLE = str.maketrans(_TRANSLITERATION)
+
+
+class Segments(NamedTuple):
+    """
+    How a text is sent.
+
+    - `encoding`: `GSM7` or `UCS2`.
+    - `parts`: Billed SMS parts.
+    - `length`: Septets for GSM-7, UTF-16 code units for UCS-2.
+    - `text`: The measured text, transliterated if requested.
+    """
+
+    encoding: str
+    parts: int
+    length: int
+    text: str
+
+    @property
+    def offending(self) -> Tuple[str, ...]:
+        """Characters that force UCS-2, in order of appearance"""
+        if self.encoding == GSM7:
+            return ()
+        return tuple(dict.fromkeys(_NON_GSM7.findall(self.text)))
+
+    @property
+    def data_coding(self) -> int:
+        """SMPP `data_coding`, as in `Result.encoding`"""
+        return 0 if self.encoding == GSM7 else 8
+
+    @property
+    def remaining(self) -> int:
+        """Characters left before another part is needed"""
+        single, multi = LIMITS[self.encoding]
+        if self.length <= single:
+            return single - self.length
+        return self.parts * multi - self.length
+
+
+def transliterate(text: str) -> str:
+    """Replaces Cyrillic letters and typographic symbols with GSM-7 ones"""
+    return text.translate(_TRANSLATE_TABLE)
+
+
+def _count(encoding: str, length: int) -> int:
+    single, multi = LIMITS[encoding]
+    if length <= single:
+        return 1
+    return -(-length // multi)
+
+
+def segments(text: str, *, transliterate: bool = False) -> Segments:
+    """
+    Encoding and part count of `text`.
+
+    ```
+    segments("Salom, dunyo!")        # GSM-7, 1 part
+    segments("Салом, дунё!").offending  # ('С', 'а', 'л', ...)
+    segments("Салом, дунё!", transliterate=True).text  # 'Salom, dunyo!'
+    ```
+
+    Escape sequences and surrogate pairs are assumed to never straddle
+    two parts, the count may be one part short for such texts.
+    """
+    if transliterate and _NON_GSM7.search(text) is not None:
+        text = text.translate(_TRANSLATE_TABLE)
+
+    # Plain texts need a single scan
+    special = _NON_BASIC.search(text)
+    if special is None:
+        length = len(text)
+        return Segments(GSM7, _count(GSM7, length), length, text)
+
+    start = special.start()
+    if _NON_GSM7.search(text, start) is None:
+        length = len(text) + len(_EXTENDED.findall(text, start))
+        return Segments(GSM7, _count(GSM7, length), length, text)
+
+    length = len(text.encode("utf-16-le")) // 2
+    return Segments(UCS2, _count(UCS2, length), length, text)
+
+
+def segments_batch(
+    texts: Iterable[str], *, transliterate: bool = False
+) -> List[Segments]:
+    """
+    `segments` of each text, repeated texts are measured once.
+    """
+    seen: Dict[str, Segments] = {}
+    results = []
+    for text in texts:
+        result = seen.get(text)
+        if result is None:
+            result = seen[text] = segments(text, transliterate=transliterate)
+        results.append(result)
+    return results
+
+
+@functools.lru_cache(maxsize=4096)
+def count_parts(text: str) -> int:
+    """
+    Number of billed SMS parts of `text`.
+
+    GSM-7 texts fit 160 septets in one part and 153 per part when
+    concatenated, anything else is sent as UCS-2 with 70 and 67.
+    """
+    return segments(text).parts
+
+
+def price(texts: Iterable[str], price_per_part: float = 1.0) -> float:
+    """Price of sending each of `texts` once, by billed parts"""
+    return price_per_part * sum(count_parts(text) for text in texts)
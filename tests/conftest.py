@@ -0,0 +1,15 @@
+import asyncio
+import inspect
+
+
+def pytest_pyfunc_call(pyfuncitem):
+    """Runs `async def` tests in a fresh event loop"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    arguments = {
+        name: pyfuncitem.funcargs[name]
+        for name in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
@@ -0,0 +1,99 @@
+from eskiz import SMSClient, TokenManager
+from eskiz.mock import MockGateway
+from eskiz.utils import exceptions
+
+
+class RecordingGateway(MockGateway):
+    """Remembers the bearer token of every request"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = []
+
+    def _authorized(self, request):
+        self.seen.append(request.headers.get("Authorization"))
+        return super()._authorized(request)
+
+
+def managed_client(gateway, token=None, **kwargs):
+    return SMSClient(
+        token=token,
+        service_url=gateway.url,
+        token_manager=TokenManager(
+            email=gateway.email, password=gateway.password, **kwargs
+        ),
+    )
+
+
+async def test_logs_in_without_a_token():
+    async with MockGateway() as gateway:
+        client = managed_client(gateway)
+        try:
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_TOKEN"] == 1
+    assert client._token is not None
+
+
+async def test_refreshes_a_token_about_to_expire():
+    async with MockGateway(token_ttl=30) as gateway:
+        client = managed_client(gateway, gateway.issue_token(), margin=60)
+        stale = client._token
+        try:
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    assert gateway.requests["REFRESH_TOKEN"] >= 1
+    assert client._token != stale
+
+
+async def test_retries_once_after_the_token_is_rejected():
+    async with MockGateway() as gateway:
+        client = managed_client(gateway, gateway.token)
+        gateway.fail_next("BEARER_TOKEN_INVALID", method="GET_LIMIT")
+        try:
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_LIMIT"] == 2
+    assert client._token != gateway.token
+
+
+async def test_keeps_per_call_tokens():
+    async with RecordingGateway() as gateway:
+        other = gateway.issue_token()
+        client = managed_client(gateway)
+        try:
+            await client.get_limit(token=other)
+            assert gateway.seen[-1] == f"Bearer {other}"
+
+            with client.with_token(other):
+                await client.get_limit()
+            assert gateway.seen[-1] == f"Bearer {other}"
+
+            await client.get_limit()
+            assert gateway.seen[-1] == f"Bearer {client._token}"
+        finally:
+            await client.close()
+
+    assert client._token != other
+
+
+async def test_does_not_renew_rejected_per_call_tokens():
+    async with MockGateway() as gateway:
+        client = managed_client(gateway, gateway.token)
+        try:
+            await client.get_limit(token="invalid")
+        except exceptions.BearerTokenInvalid:
+            pass
+        else:
+            raise AssertionError("BearerTokenInvalid expected")
+        finally:
+            await client.close()
+
+    assert "GET_TOKEN" not in gateway.requests
+    assert "REFRESH_TOKEN" not in gateway.requests
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from eskiz import SMSClient
+from eskiz.mock import SERVER_ERROR, MockGateway
+from eskiz.utils import exceptions
+from eskiz.utils.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def fail(breaker, error=exceptions.ServerError):
+    with pytest.raises(error):
+        with breaker.call():
+            raise error("failed")
+
+
+def test_opens_at_the_failure_rate():
+    breaker = CircuitBreaker(min_calls=4, window=4, failure_rate=0.5)
+    with breaker.call():
+        pass
+    fail(breaker)
+    with breaker.call():
+        pass
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.error_rate == 0.5
+
+
+def test_other_errors_are_not_failures():
+    breaker = CircuitBreaker(min_calls=1, window=1)
+    fail(breaker, exceptions.TemplateNotMatched)
+    assert breaker.state == CLOSED
+
+
+async def test_rejects_while_open_then_closes_after_trials():
+    breaker = CircuitBreaker(
+        min_calls=2, window=2, open_for=0.1, trial_calls=2
+    )
+    async with MockGateway() as gateway:
+        gateway.fail_next(SERVER_ERROR, times=2, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token, service_url=gateway.url, breaker=breaker
+        )
+        try:
+            for _ in range(2):
+                with pytest.raises(exceptions.ServerError):
+                    await client.get_limit()
+
+            with pytest.raises(exceptions.CircuitOpen) as error:
+                await client.get_limit()
+            assert 0 < error.value.retry_after <= 0.1
+            assert gateway.requests["GET_LIMIT"] == 2
+
+            await asyncio.sleep(0.1)
+            await client.get_limit()
+            assert breaker.state == HALF_OPEN
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    assert breaker.state == CLOSED
+    assert (breaker.opened, breaker.rejected) == (1, 1)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from eskiz import Budget, SMSClient
+from eskiz.mock import TOO_MANY_REQUESTS, MockGateway
+from eskiz.utils import exceptions
+
+# Two GSM-7 parts
+LONG = "x" * 200
+
+
+class AcceptThenFail(MockGateway):
+    """Accepts messages, then answers 502 as a failing proxy would"""
+
+    async def _send_sms(self, request):
+        await super()._send_sms(request)
+        return web.json_response({"message": "Bad Gateway"}, status=502)
+
+
+def client_for(gateway, budget):
+    return SMSClient(
+        token=gateway.token, service_url=gateway.url, budget=budget
+    )
+
+
+async def test_sends_are_charged_by_parts():
+    async with MockGateway(balance=10) as gateway:
+        budget = Budget()
+        client = client_for(gateway, budget)
+        try:
+            await client.send_sms(998991234567, LONG)
+            assert budget.balance == 8
+
+            await budget.reconcile()
+            assert budget.balance == gateway.balance == 8
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_LIMIT"] == 2
+
+
+async def test_refuses_sends_past_the_floor_without_a_request():
+    async with MockGateway(balance=3) as gateway:
+        client = client_for(gateway, Budget(floor=2))
+        try:
+            with pytest.raises(exceptions.InsufficientBalance):
+                await client.send_sms(998991234567, LONG)
+        finally:
+            await client.close()
+
+    assert "SEND_SMS" not in gateway.requests
+
+
+async def test_waiting_fails_fast_past_the_whole_balance():
+    async with MockGateway(balance=1) as gateway:
+        client = client_for(gateway, Budget(wait=True))
+        try:
+            with pytest.raises(exceptions.InsufficientBalance):
+                await asyncio.wait_for(
+                    client.send_sms(998991234567, LONG), timeout=1
+                )
+        finally:
+            await client.close()
+
+
+async def test_unsent_failures_are_returned():
+    async with MockGateway(balance=10) as gateway:
+        gateway.fail_next(TOO_MANY_REQUESTS, method="SEND_SMS")
+        budget = Budget()
+        client = client_for(gateway, budget)
+        try:
+            with pytest.raises(exceptions.TooManyRequests):
+                await client.send_sms(998991234567, LONG)
+        finally:
+            await client.close()
+
+    assert budget.balance == 10
+
+
+async def test_ambiguous_failures_are_spent():
+    async with AcceptThenFail(balance=10) as gateway:
+        budget = Budget()
+        client = client_for(gateway, budget)
+        try:
+            with pytest.raises(exceptions.ServerError):
+                await client.send_sms(998991234567, LONG)
+        finally:
+            await client.close()
+
+    # The gateway billed the message
+    assert budget.balance == gateway.balance == 8
@@ -0,0 +1,80 @@
+from pydantic import ValidationError
+
+from eskiz import BulkSender, Outbox, SMSClient
+from eskiz.mock import MockGateway
+
+GOOD = [(998900000000 + offset, "hi") for offset in range(10)]
+# An invalid phone and a record missing its text
+RECORDS = GOOD[:3] + [("not a phone", "hi")] + GOOD[3:7] + [(1,)] + GOOD[7:]
+
+
+async def test_sends_every_chunk_in_bounded_batches():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            sender = BulkSender(client, chunk_size=4, concurrency=2)
+            report = await sender.send(GOOD, dispatch_id=1)
+        finally:
+            await client.close()
+
+    assert [chunk.size for chunk in report.chunks] == [4, 4, 2]
+    assert report.sent == gateway.messages == 10
+    assert gateway.requests["SEND_BATCH_SMS"] == 3
+
+
+async def test_invalid_records_are_rejected_not_fatal():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            sender = BulkSender(client, chunk_size=3)
+            report = await sender.send(RECORDS, dispatch_id=1)
+        finally:
+            await client.close()
+
+    assert report.sent == gateway.messages == 10
+    assert [record.position for record in report.rejected] == [3, 8]
+    assert isinstance(report.rejected[0].error, ValidationError)
+    assert report.total == 12
+    assert report.failed == 2
+
+
+async def test_stops_once_out_of_balance():
+    async with MockGateway(balance=3) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            sender = BulkSender(client, chunk_size=1, concurrency=2)
+            report = await sender.send(GOOD * 5, dispatch_id=1)
+        finally:
+            await client.close()
+
+    assert report.exhausted
+    assert gateway.messages == 3
+    # At most the chunks in flight when the balance ran out follow it
+    assert gateway.requests["SEND_BATCH_SMS"] <= 3 + 1 + sender.concurrency
+
+
+async def test_rejected_records_keep_the_resume_cursor(tmp_path):
+    path = str(tmp_path / "outbox.db")
+
+    async def send(gateway):
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            async with Outbox(path) as outbox:
+                sender = BulkSender(
+                    client, chunk_size=3, concurrency=1, outbox=outbox
+                )
+                return await sender.send(RECORDS, dispatch_id=1)
+        finally:
+            await client.close()
+
+    async with MockGateway(balance=3) as gateway:
+        report = await send(gateway)
+        assert report.exhausted
+
+        gateway.balance = 100
+
+        report = await send(gateway)
+        assert not report.exhausted
+
+    sent = sorted(int(message.to) for message in gateway._messages)
+    assert sent == [phone for phone, _ in GOOD]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from eskiz import SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.cache import (
+    CacheBackend,
+    MemoryBackend,
+    ResponseCache,
+    TTLCache,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_ttl_cache_keeps_expired_entries_stale():
+    cache: TTLCache[str, int] = TTLCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get("a", stale=True) == 1
+
+
+def test_backends_implement_the_interface():
+    with pytest.raises(TypeError):
+        CacheBackend()  # type: ignore[abstract]
+
+
+async def test_memory_backend_returns_copies():
+    backend = MemoryBackend()
+    await backend.set("key", {"data": [1]}, ttl=60)
+    value = await backend.get("key")
+    value["data"].append(2)
+
+    assert await backend.get("key") == {"data": [1]}
+
+
+async def test_concurrent_reads_share_one_request():
+    cache = ResponseCache()
+    async with MockGateway(latency=0.05) as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            response_cache=cache,
+        )
+        try:
+            await asyncio.gather(*(client.get_limit() for _ in range(10)))
+            await client.get_limit()
+            await client.get_limit(token=gateway.issue_token())
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_LIMIT"] == 2
+    assert cache.stats == {"hits": 1, "misses": 2, "coalesced": 9}
+
+
+async def test_sends_are_never_cached():
+    cache = ResponseCache()
+    async with MockGateway() as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            response_cache=cache,
+        )
+        try:
+            for _ in range(2):
+                await client.send_sms(998991234567, "hi")
+        finally:
+            await client.close()
+
+    assert gateway.messages == 2
+    assert cache.stats["misses"] == 0
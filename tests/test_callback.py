@@ -0,0 +1,82 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from eskiz import DeliveryReceiver, SMSClient
+from eskiz.mock import MockGateway
+from eskiz.types.enums import MessagePartStatus
+
+
+def report(status, **fields):
+    return {
+        "message_id": "1",
+        "user_sms_id": "order-42",
+        "phone_number": "998991234567",
+        "status": status,
+        **fields,
+    }
+
+
+async def test_waits_for_the_report_posted_by_the_gateway():
+    async with DeliveryReceiver() as receiver:
+        async with MockGateway(delivery_delay=0.05) as gateway:
+            await receiver.start(host="127.0.0.1", port=0)
+            client = SMSClient(token=gateway.token, service_url=gateway.url)
+            try:
+                await client.send_sms(
+                    998991234567,
+                    "hi",
+                    user_sms_id="order-42",
+                    callback_url=receiver.url,
+                )
+                received = await receiver.wait(
+                    user_sms_id="order-42", timeout=2
+                )
+            finally:
+                await client.close()
+
+    assert received.is_delivered
+    assert receiver.get(message_id=received.message_id) is received
+
+
+async def test_unrecognised_statuses_are_kept_but_not_final():
+    async with DeliveryReceiver() as receiver:
+        await receiver.start(host="127.0.0.1", port=0)
+        async with aiohttp.ClientSession() as session:
+            for status in (["DELIVRD"], {"code": 1}, "SOMETHING_NEW"):
+                async with session.post(
+                    receiver.url, json=report(status)
+                ) as response:
+                    assert response.status == 200
+
+            received = receiver.get(user_sms_id="order-42")
+            assert received is not None
+            assert received.status == MessagePartStatus.UNKNOWN
+            assert not received.is_final
+
+            waiter = asyncio.ensure_future(
+                receiver.wait(user_sms_id="order-42", timeout=2)
+            )
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+
+            async with session.post(
+                receiver.url, json=report("DELIVRD")
+            ) as response:
+                assert response.status == 200
+            assert (await waiter).is_delivered
+
+
+async def test_invalid_reports_are_refused():
+    async with DeliveryReceiver() as receiver:
+        await receiver.start(host="127.0.0.1", port=0)
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                receiver.url, json={"status": "DELIVRD"}
+            ) as response:
+                assert response.status == 400
+
+    assert len(receiver) == 0
+    with pytest.raises(ValueError):
+        receiver.get()
@@ -0,0 +1,66 @@
+import asyncio
+
+from eskiz import SMSClient
+from eskiz.mock import TOO_MANY_REQUESTS, MockGateway
+from eskiz.utils import exceptions
+from eskiz.utils.concurrency import AdaptiveConcurrency
+
+
+async def run(concurrency, requests, width, error=None):
+    async def request():
+        async with concurrency.slot():
+            await asyncio.sleep(0.001)
+            if error is not None:
+                raise error
+
+    for _ in range(requests):
+        await asyncio.gather(
+            *(request() for _ in range(width)), return_exceptions=True
+        )
+
+
+async def test_grows_only_while_every_slot_is_used():
+    concurrency = AdaptiveConcurrency(initial=4, max_limit=100)
+    await run(concurrency, 20, width=2)
+    assert concurrency.limit == 4
+
+    await run(concurrency, 20, width=8)
+    assert concurrency.limit > 4
+
+
+async def test_overload_errors_shrink_the_limit_once_per_round_trip():
+    concurrency = AdaptiveConcurrency(initial=8, max_limit=100)
+    error = exceptions.ServerError("failed")
+    await run(concurrency, 1, width=8, error=error)
+    assert concurrency.limit == 4
+
+
+async def test_client_requests_stay_within_the_limit():
+    limits = []
+    concurrency = AdaptiveConcurrency(initial=2, on_change=limits.append)
+    async with MockGateway(latency=0.01) as gateway:
+        gateway.fail_next(TOO_MANY_REQUESTS, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            concurrency=concurrency,
+        )
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            peak = max(peak, concurrency.in_flight)
+            await client.get_limit()
+
+        try:
+            results = await asyncio.gather(
+                *(request() for _ in range(10)), return_exceptions=True
+            )
+        finally:
+            await client.close()
+
+    assert peak <= 2
+    assert sum(isinstance(r, exceptions.TooManyRequests) for r in results) == 1
+    # Halved by the 429, then grown back by the queued requests
+    assert limits[0] == 1
+    assert concurrency.in_flight == 0
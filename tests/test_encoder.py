@@ -0,0 +1,49 @@
+import json
+
+from eskiz import SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.encoder import encode_messages, iter_encode_messages
+from eskiz.utils.message import MessageBuilder
+
+
+def batch(size):
+    builder = MessageBuilder(dispatch_id=7, from_="BRAND")
+    for offset in range(size):
+        builder.add(998900000000 + offset, f'Сообщение {offset} "quoted"')
+    return builder.as_messages()
+
+
+def test_encodes_the_payload_by_alias():
+    messages = batch(3)
+    payload = json.loads(encode_messages(messages))
+
+    assert payload == messages.model_dump(mode="json", by_alias=True)
+    assert payload["from"] == "BRAND"
+    assert payload["messages"][0]["to"] == 998900000000
+
+
+def test_chunked_encoding_matches_the_single_pass():
+    messages = batch(25)
+    for chunk_size in (1, 7, 25, 100):
+        body = b"".join(iter_encode_messages(messages, chunk_size))
+        assert json.loads(body) == json.loads(encode_messages(messages))
+
+
+def test_empty_batches_encode():
+    messages = batch(0)
+    body = b"".join(iter_encode_messages(messages))
+    assert json.loads(body) == json.loads(encode_messages(messages))
+
+
+async def test_batches_reach_the_gateway_intact():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await client.send_batch_sms(batch(10))
+            await client.send_batch_sms(batch(10), stream=True)
+        finally:
+            await client.close()
+
+    assert gateway.messages == 20
+    texts = {message.text for message in gateway._messages}
+    assert 'Сообщение 9 "quoted"' in texts
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from eskiz import SMSClient, types
+from eskiz.mock import MockGateway
+from eskiz.types.lazy import LazyModel
+
+
+def test_fields_are_validated_on_access():
+    view = LazyModel(
+        types.MessageResponse,
+        {"id": "abc", "message": "Waiting for SMS provider", "status": 1},
+    )
+    assert view.id == "abc"
+    with pytest.raises(ValidationError):
+        view.status
+
+
+def test_views_are_read_only_and_keep_extra_fields():
+    view = LazyModel(types.MessageResponse, {"id": "abc", "extra": 1})
+    assert view.extra == 1
+    with pytest.raises(AttributeError):
+        view.message
+    with pytest.raises(AttributeError):
+        view.id = "other"
+
+
+async def test_decoding_modes_of_the_client():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            for offset in range(3):
+                await client.send_sms(998900000000 + offset, "hi")
+
+            end = datetime.now() + timedelta(days=1)
+            start = end - timedelta(days=2)
+            model = await client.get_message_details(start, end)
+            with client.with_decoding("lazy"):
+                lazy = await client.get_message_details(start, end)
+            with client.with_decoding("dict"):
+                raw = await client.get_message_details(start, end)
+        finally:
+            await client.close()
+
+    assert isinstance(model, types.MessageDetails)
+    assert isinstance(raw, dict)
+    assert isinstance(lazy, LazyModel)
+    assert [row.id for row in lazy.data.result] == [
+        row.id for row in model.data.result
+    ]
+    assert lazy.validate() == model
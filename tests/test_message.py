@@ -0,0 +1,62 @@
+import pytest
+
+from eskiz import BulkSender, SMSClient
+from eskiz.mock import MockGateway
+from eskiz.templates import TemplateIndex
+from eskiz.utils import exceptions
+from eskiz.utils.message import CompactMessageBuilder, MessageBuilder
+
+
+def test_texts_are_stored_once():
+    builder = CompactMessageBuilder(dispatch_id=1, id_prefix="c")
+    for offset in range(1000):
+        builder.add(998900000000 + offset, "Big sale today only")
+    builder.add(998991234567, "Other", user_sms_id="own")
+
+    assert len(builder) == 1001
+    assert builder._texts == ["Big sale today only", "Other"]
+    assert list(builder.records(999)) == [
+        (998900000999, "Big sale today only", "c-999"),
+        (998991234567, "Other", "own"),
+    ]
+
+
+def test_chunks_validate_lazily_and_match_the_plain_builder():
+    compact = CompactMessageBuilder(dispatch_id=1, from_="BRAND")
+    plain = MessageBuilder(dispatch_id=1, from_="BRAND")
+    for offset in range(10):
+        compact.add(998900000000 + offset, "hi", user_sms_id=str(offset))
+        plain.add(998900000000 + offset, "hi", user_sms_id=str(offset))
+
+    chunks = list(compact.chunks(4))
+    assert [len(chunk.messages) for chunk in chunks] == [4, 4, 2]
+    assert compact.as_messages() == plain.as_messages()
+
+
+def test_texts_are_checked_against_templates_once():
+    builder = CompactMessageBuilder(
+        dispatch_id=1, templates=TemplateIndex(["Your code is %d"])
+    )
+    builder.add(998991234567, "Your code is 1234")
+    with pytest.raises(exceptions.TemplateNotMatched):
+        builder.add(998991234567, "Free money")
+
+    assert len(builder) == 1
+
+
+async def test_chunks_are_sent_by_the_bulk_sender():
+    builder = CompactMessageBuilder(dispatch_id=1)
+    for offset in range(250):
+        builder.add(998900000000 + offset, "hi")
+
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            report = await BulkSender(client).send_messages(
+                builder.chunks(100)
+            )
+        finally:
+            await client.close()
+
+    assert report.sent == gateway.messages == 250
+    assert gateway.requests["SEND_BATCH_SMS"] == 3
@@ -0,0 +1,39 @@
+import dataclasses
+
+import pytest
+
+from eskiz import SMSClient
+from eskiz.utils.methods import Methods
+
+
+def test_endpoints_are_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        Methods.GET_LIMIT.path = "other"  # type: ignore[misc]
+
+
+def test_bound_copies_quote_parameters():
+    endpoint = Methods.GET_TEMPLATE.bind(id="1/2")
+    assert endpoint.path == "template/1%2F2"
+    assert Methods.GET_TEMPLATE.path == "template/{id}"
+    assert endpoint["method"] == "GET"
+    assert endpoint.get("missing") is None
+
+
+def test_urls_follow_the_service():
+    client = SMSClient(token="TOKEN")
+    url = client.url_for(Methods.GET_LIMIT)
+    assert str(url) == "https://notify.eskiz.uz/api/user/get-limit"
+    assert client.url_for(Methods.GET_LIMIT) is url
+
+    client.service = "http://127.0.0.1:8080"
+    query = Methods.GET_TEMPLATE_LIST.with_query({"page": 2})
+    assert str(client.url_for(query)) == (
+        "http://127.0.0.1:8080/api/templates/?page=2"
+    )
+
+
+def test_format_api_url_is_deprecated():
+    client = SMSClient(token="TOKEN")
+    with pytest.deprecated_call():
+        method, url = client.format_api_url("GET", "user/get-limit")
+    assert (method, url) == ("GET", str(client.url_for(Methods.GET_LIMIT)))
@@ -0,0 +1,131 @@
+import asyncio
+
+from eskiz import Metrics, RequestHook, SMSClient
+from eskiz.mock import SERVER_ERROR, MockGateway
+from eskiz.utils.metrics import MetricsExporter
+from eskiz.utils.retry import RetryPolicy
+
+
+class Recorder(RequestHook):
+    def __init__(self):
+        self.calls = []
+
+    def on_start(self, event):
+        self.calls.append(("start", event.method, event.attempt))
+
+    def on_end(self, event):
+        self.calls.append(("end", event.method, event.status))
+
+    def on_retry(self, event, delay):
+        self.calls.append(("retry", event.method, event.attempt))
+
+
+class Broken(RequestHook):
+    def on_start(self, event):
+        raise RuntimeError("broken hook")
+
+
+class Collector(MetricsExporter):
+    def __init__(self):
+        self.exported = []
+
+    async def export(self, families):
+        self.exported.append(families)
+
+
+def sample(metrics, name, **labels):
+    for family in metrics.collect():
+        for item in family.samples:
+            if item.name == name and item.labels == labels:
+                return item.value
+    return None
+
+
+async def test_hooks_observe_every_attempt():
+    recorder = Recorder()
+    async with MockGateway() as gateway:
+        gateway.fail_next(SERVER_ERROR, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(2, backoff=0.01),
+            hooks=[Broken(), recorder],
+        )
+        try:
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    assert recorder.calls == [
+        ("start", "GET_LIMIT", 1),
+        ("end", "GET_LIMIT", 500),
+        ("retry", "GET_LIMIT", 1),
+        ("start", "GET_LIMIT", 2),
+        ("end", "GET_LIMIT", 200),
+    ]
+
+
+async def test_metrics_aggregate_requests():
+    metrics = Metrics()
+    async with MockGateway() as gateway:
+        gateway.fail_next(SERVER_ERROR, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(2, backoff=0.01),
+            hooks=[metrics],
+        )
+        try:
+            await client.get_limit()
+        finally:
+            await client.close()
+
+    limit = {"method": "GET_LIMIT"}
+    assert sample(metrics, "eskiz_requests_total", status="200", **limit) == 1
+    assert sample(metrics, "eskiz_requests_total", status="500", **limit) == 1
+    errors = sample(
+        metrics, "eskiz_errors_total", error="ServerError", **limit
+    )
+    assert errors == 1
+    assert sample(metrics, "eskiz_retries_total", **limit) == 1
+    assert sample(metrics, "eskiz_requests_in_flight") == 0
+    assert (
+        sample(metrics, "eskiz_request_duration_seconds_count", **limit) == 2
+    )
+    assert sample(metrics, "eskiz_response_bytes_total", **limit)
+
+
+def test_render_uses_the_prometheus_text_format():
+    metrics = Metrics(namespace="sms", buckets=(0.1, 1))
+    metrics.duration.observe(0.05, ("SEND_SMS",))
+    metrics.duration.observe(2, ("SEND_SMS",))
+    metrics.errors.inc(("SEND_SMS", 'Odd"Name'))
+
+    text = metrics.render()
+
+    assert "# TYPE sms_request_duration_seconds histogram\n" in text
+    bucket = (
+        'sms_request_duration_seconds_bucket{method="SEND_SMS",le=%s} %d\n'
+    )
+    assert bucket % ('"0.1"', 1) in text
+    assert bucket % ('"+Inf"', 2) in text
+    assert 'sms_request_duration_seconds_sum{method="SEND_SMS"} 2.05\n' in text
+    assert 'sms_errors_total{method="SEND_SMS",error="Odd\\"Name"} 1\n' in text
+    # Families without samples are left out
+    assert "sms_retries_total" not in text
+
+
+async def test_exports_periodically_until_stopped():
+    metrics = Metrics()
+    metrics.retries.inc(("GET_LIMIT",))
+    collector = Collector()
+
+    metrics.start(collector, interval=0.01)
+    await asyncio.sleep(0.05)
+    await metrics.stop()
+    exported = len(collector.exported)
+    await asyncio.sleep(0.03)
+
+    assert exported >= 2
+    assert len(collector.exported) == exported
+    assert collector.exported[0][0].name == "eskiz_retries_total"
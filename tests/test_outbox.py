@@ -0,0 +1,67 @@
+from aiohttp import web
+
+from eskiz import BulkSender, Outbox, SMSClient
+from eskiz.mock import MockGateway
+
+RECORDS = [(998900000000 + offset, "hi") for offset in range(400)]
+
+
+class FailSecondBatch(MockGateway):
+    """Accepts the second batch, then answers 502"""
+
+    async def _send_batch_sms(self, request):
+        response = await super()._send_batch_sms(request)
+        if self.requests["SEND_BATCH_SMS"] == 2:
+            return web.json_response({"message": "Bad Gateway"}, status=502)
+        return response
+
+
+async def send(gateway, path):
+    client = SMSClient(token=gateway.token, service_url=gateway.url)
+    try:
+        async with Outbox(str(path)) as outbox:
+            sender = BulkSender(
+                client, chunk_size=100, concurrency=1, outbox=outbox
+            )
+            report = await sender.send(
+                RECORDS, dispatch_id=1, campaign="campaign"
+            )
+            return report, await outbox.counts("campaign")
+    finally:
+        await client.close()
+
+
+async def test_resumes_chunks_never_sent(tmp_path):
+    path = tmp_path / "outbox.db"
+
+    async with MockGateway(balance=250) as gateway:
+        report, counts = await send(gateway, path)
+        assert report.exhausted
+        assert gateway.messages == 200
+
+        gateway.balance += 1000
+        report, counts = await send(gateway, path)
+
+    assert report.sent == 200
+    assert counts == {"acked": 4}
+    assert gateway.messages == len(RECORDS)
+
+
+async def test_does_not_resend_chunks_of_unknown_outcome(tmp_path):
+    path = tmp_path / "outbox.db"
+
+    async with FailSecondBatch() as gateway:
+        report, counts = await send(gateway, path)
+        assert [chunk.ok for chunk in report.chunks] == [
+            True,
+            False,
+            True,
+            True,
+        ]
+
+        report, counts = await send(gateway, path)
+
+    assert report.chunks == []
+    assert counts == {"acked": 3, "unknown": 1}
+    assert gateway.requests["SEND_BATCH_SMS"] == 4
+    assert gateway.messages == len(RECORDS)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from eskiz import SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.message import MessageBuilder
+
+END = datetime.now() + timedelta(days=1)
+START = END - timedelta(days=2)
+
+
+async def send(client, count, dispatch_id=1):
+    builder = MessageBuilder(dispatch_id=dispatch_id)
+    for offset in range(count):
+        builder.add(998900000000 + offset, f"message {offset}")
+    await client.send_batch_sms(builder.as_messages())
+
+
+async def test_iterates_every_page_once():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 45)
+            rows = [
+                row
+                async for row in client.iter_message_details(
+                    START, END, page_size=10, prefetch=3
+                )
+            ]
+        finally:
+            await client.close()
+
+    assert len({row.id for row in rows}) == 45
+    assert gateway.requests["GET_MESSAGE_DETAILS"] == 5
+
+
+async def test_stopping_early_cancels_prefetched_pages():
+    async with MockGateway(latency=0.05) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 100)
+            rows = client.iter_message_details(
+                START, END, page_size=10, prefetch=2
+            )
+            async for row in rows:
+                break
+            await rows.aclose()  # type: ignore[attr-defined]
+        finally:
+            await client.close()
+
+    # The first page and at most the prefetched ones
+    assert gateway.requests["GET_MESSAGE_DETAILS"] <= 3
+
+
+async def test_iterates_the_messages_of_a_dispatch():
+    async with MockGateway() as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 30, dispatch_id=1)
+            await send(client, 5, dispatch_id=2)
+            rows = [
+                row
+                async for row in client.iter_dispatch_messages(
+                    gateway.user_id, 2
+                )
+            ]
+        finally:
+            await client.close()
+
+    assert len(rows) == 5
@@ -0,0 +1,80 @@
+import asyncio
+
+from aiohttp import web
+
+from eskiz import SMSClientPool
+from eskiz.mock import MockGateway
+
+
+class AcceptThenFail(MockGateway):
+    """Accepts messages, then answers 502 as a failing proxy would"""
+
+    async def _send_sms(self, request):
+        await super()._send_sms(request)
+        return web.json_response({"message": "Bad Gateway"}, status=502)
+
+
+def add(pool, gateway, name):
+    return pool.add(gateway.token, name=name, service_url=gateway.url)
+
+
+async def test_fails_over_to_the_next_account():
+    async with MockGateway() as first, MockGateway() as second:
+        first.fail_next("INSUFFICIENT_BALANCE", method="SEND_SMS")
+        async with SMSClientPool() as pool:
+            add(pool, first, "first")
+            add(pool, second, "second")
+
+            for _ in range(3):
+                await pool.send_sms(998991234567, "hi")
+
+            assert not pool["first"].available
+            assert pool["second"].sent == 3
+
+    assert (first.messages, second.messages) == (0, 3)
+
+
+async def test_balance_strategy_spreads_by_estimated_balance():
+    rich, poor = MockGateway(balance=100), MockGateway(balance=60)
+    async with rich, poor:
+        async with SMSClientPool(strategy="balance") as pool:
+            add(pool, rich, "rich")
+            add(pool, poor, "poor")
+
+            for _ in range(60):
+                await pool.send_sms(998991234567, "hi")
+
+            assert pool["rich"].estimated_balance == rich.balance
+            assert pool["poor"].estimated_balance == poor.balance
+
+    # Sends follow the larger estimate until both are even
+    assert abs(rich.balance - poor.balance) <= 1
+    assert rich.messages == 50
+
+
+async def test_ambiguous_failures_are_counted_as_spent():
+    async with AcceptThenFail(balance=10) as gateway:
+        async with SMSClientPool(strategy="balance") as pool:
+            add(pool, gateway, "only")
+            try:
+                await pool.send_sms(998991234567, "hi")
+            except Exception:
+                pass
+
+            assert pool["only"].estimated_balance == 9
+
+
+async def test_close_waits_for_the_balance_refresh():
+    async with MockGateway(latency=0.2) as gateway:
+        pool = SMSClientPool(strategy="balance")
+        add(pool, gateway, "only")
+        send = asyncio.ensure_future(pool.send_sms(998991234567, "hi"))
+        await asyncio.sleep(0.05)
+
+        refresh = pool._balance_refresh
+        await pool.close()
+        send.cancel()
+        await asyncio.gather(send, return_exceptions=True)
+
+    assert refresh is not None and refresh.done()
+    assert pool._balance_refresh is None
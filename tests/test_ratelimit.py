@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from eskiz import SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.ratelimit import RateLimiter, SlidingWindow, TokenBucket
+
+
+def test_limiters_implement_the_interface():
+    with pytest.raises(TypeError):
+        RateLimiter()  # type: ignore[abstract]
+
+
+def test_token_bucket_bursts_up_to_capacity():
+    bucket = TokenBucket(rate=1, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(1, abs=0.01)
+
+
+async def test_token_bucket_below_one_per_second_still_grants():
+    bucket = TokenBucket(rate=0.5)
+    assert bucket.capacity == 1
+
+    waited = await asyncio.wait_for(bucket.acquire(), timeout=1)
+    assert waited < 0.1
+    assert bucket.wait_time == pytest.approx(2, abs=0.05)
+
+
+def test_token_bucket_rejects_capacity_below_one_request():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0.5, capacity=0.5)
+
+
+def test_sliding_window_frees_slots_after_the_period():
+    window = SlidingWindow(limit=2, period=1)
+    assert window.try_acquire() == 0
+    assert window.try_acquire() == 0
+    assert 0.9 < window.try_acquire() <= 1
+
+
+async def test_client_waits_for_its_group_limiter():
+    async with MockGateway() as gateway:
+        limiter = SlidingWindow(limit=2, period=0.2)
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            rate_limits={"*": limiter},
+        )
+        try:
+            started = time.monotonic()
+            await asyncio.gather(*(client.get_limit() for _ in range(5)))
+            elapsed = time.monotonic() - started
+        finally:
+            await client.close()
+
+    # Two requests per window: the fifth goes out in the third window
+    assert elapsed >= 0.4
+    assert gateway.requests["GET_LIMIT"] == 5
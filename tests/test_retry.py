@@ -0,0 +1,94 @@
+from aiohttp import web
+
+from eskiz import SMSClient
+from eskiz.mock import SERVER_ERROR, TOO_MANY_REQUESTS, MockGateway
+from eskiz.utils import exceptions
+from eskiz.utils.message import MessageBuilder
+from eskiz.utils.retry import RetryPolicy
+
+
+class AcceptThenFail(MockGateway):
+    """Accepts batches, then answers 502 as a failing proxy would"""
+
+    async def _send_batch_sms(self, request):
+        await super()._send_batch_sms(request)
+        return web.json_response({"message": "Bad Gateway"}, status=502)
+
+
+def batch(size=3):
+    builder = MessageBuilder(dispatch_id=1)
+    for offset in range(size):
+        builder.add(998900000000 + offset, "hi")
+    return builder.as_messages()
+
+
+async def test_reads_are_retried_after_server_errors():
+    async with MockGateway() as gateway:
+        gateway.fail_next(SERVER_ERROR, times=2, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(3, backoff=0.01),
+        )
+        try:
+            limit = await client.get_limit()
+        finally:
+            await client.close()
+
+    assert limit.data.balance == gateway.balance
+    assert gateway.requests["GET_LIMIT"] == 3
+
+
+async def test_sends_are_retried_when_never_delivered():
+    async with MockGateway() as gateway:
+        gateway.fail_next(TOO_MANY_REQUESTS, method="SEND_SMS")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(3, backoff=0.01),
+        )
+        try:
+            await client.send_sms(998991234567, "hi")
+        finally:
+            await client.close()
+
+    assert gateway.requests["SEND_SMS"] == 2
+    assert gateway.messages == 1
+
+
+async def test_sends_are_not_resent_after_ambiguous_failures():
+    async with AcceptThenFail() as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(3, backoff=0.01),
+        )
+        try:
+            await client.send_batch_sms(batch())
+        except exceptions.ServerError:
+            pass
+        else:
+            raise AssertionError("ServerError expected")
+        finally:
+            await client.close()
+
+    assert gateway.requests["SEND_BATCH_SMS"] == 1
+    assert gateway.messages == 3
+
+
+async def test_resend_opts_in_to_retrying_sends():
+    async with AcceptThenFail() as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(2, backoff=0.01, resend=True),
+        )
+        try:
+            await client.send_batch_sms(batch())
+        except exceptions.ServerError:
+            pass
+        finally:
+            await client.close()
+
+    assert gateway.requests["SEND_BATCH_SMS"] == 2
+    assert gateway.messages == 6
@@ -0,0 +1,53 @@
+import asyncio
+
+from eskiz import PriorityScheduler, SMSClient
+from eskiz.mock import MockGateway
+from eskiz.utils.message import MessageBuilder
+from eskiz.utils.methods import Methods
+from eskiz.utils.scheduler import BULK, CRITICAL, REPORTING
+
+
+def batch():
+    builder = MessageBuilder(dispatch_id=1)
+    builder.add(998900000000, "Big sale today only")
+    return builder.as_messages()
+
+
+async def test_critical_requests_overtake_queued_bulk():
+    async with MockGateway(latency=0.05) as gateway:
+        scheduler = PriorityScheduler(slots=1)
+        client = SMSClient(
+            token=gateway.token, service_url=gateway.url, scheduler=scheduler
+        )
+        finished = []
+
+        async def send(name, coro):
+            await coro
+            finished.append(name)
+
+        try:
+            campaign = [
+                asyncio.ensure_future(
+                    send("batch", client.send_batch_sms(batch()))
+                )
+                for _ in range(4)
+            ]
+            # Every batch is queued or in flight before the OTP
+            await asyncio.sleep(0.01)
+            await send("otp", client.send_sms(998991234567, "code 1234"))
+            await asyncio.gather(*campaign)
+        finally:
+            await client.close()
+
+    # Only the batch already in flight finishes first
+    assert finished.index("otp") == 1
+    stats = scheduler.stats()
+    assert stats[CRITICAL].granted == 1
+    assert stats[BULK].granted == 4
+
+
+def test_lanes_follow_the_method_routes():
+    scheduler = PriorityScheduler()
+    assert scheduler.lane_for(Methods.SEND_SMS) == CRITICAL
+    assert scheduler.lane_for(Methods.SEND_BATCH_SMS) == BULK
+    assert scheduler.lane_for(Methods.GET_LIMIT) == REPORTING
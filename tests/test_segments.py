@@ -0,0 +1,60 @@
+import pytest
+
+from eskiz.utils.segments import (
+    GSM7,
+    UCS2,
+    count_parts,
+    price,
+    segments,
+    segments_batch,
+)
+
+
+@pytest.mark.parametrize(
+    "text, encoding, parts, length",
+    [
+        ("", GSM7, 1, 0),
+        ("a" * 160, GSM7, 1, 160),
+        ("a" * 161, GSM7, 2, 161),
+        ("a" * 306, GSM7, 2, 306),
+        ("a" * 307, GSM7, 3, 307),
+        # Extension characters take two septets
+        ("€" * 80, GSM7, 1, 160),
+        ("€" * 81, GSM7, 2, 162),
+        ("д" * 70, UCS2, 1, 70),
+        ("д" * 71, UCS2, 2, 71),
+        ("д" * 134, UCS2, 2, 134),
+        ("д" * 135, UCS2, 3, 135),
+        # Surrogate pairs take two code units
+        ("😀" * 35, UCS2, 1, 70),
+    ],
+)
+def test_parts_by_encoding(text, encoding, parts, length):
+    result = segments(text)
+    assert (result.encoding, result.parts, result.length) == (
+        encoding,
+        parts,
+        length,
+    )
+    assert count_parts(text) == parts
+
+
+def test_offending_characters_and_remaining():
+    result = segments("Salom, дунё!")
+    assert result.offending == ("д", "у", "н", "ё")
+    assert result.data_coding == 8
+    assert result.remaining == 70 - 12
+
+    assert segments("a" * 200).remaining == 306 - 200
+
+
+def test_transliteration_keeps_texts_in_gsm7():
+    result = segments("Салом, дунё! Ўзбекистон «Ғалаба»", transliterate=True)
+    assert result.encoding == GSM7
+    assert result.text == "Salom, dunyo! O'zbekiston \"G'alaba\""
+
+
+def test_batches_and_prices():
+    texts = ["hi", "a" * 200, "hi", "д" * 71]
+    assert [result.parts for result in segments_batch(texts)] == [1, 2, 1, 2]
+    assert price(texts, 50) == 300
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from eskiz.mock import MockGateway
+from eskiz.sync import SMSClient
+
+
+@pytest.fixture
+def gateway():
+    """MockGateway served from its own loop thread"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def run(coro):
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    gateway = MockGateway(seed=1)
+    run(gateway.start(port=0))
+    try:
+        yield gateway
+    finally:
+        run(gateway.stop())
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_methods_block_until_their_result(gateway):
+    with SMSClient(token=gateway.token, service_url=gateway.url) as client:
+        client.send_sms(998991234567, "hi")
+        limit = client.get_limit()
+
+    assert limit.data.balance == gateway.balance
+    assert gateway.messages == 1
+    assert client.closed
+
+
+def test_setters_reach_the_async_client(gateway):
+    with SMSClient(token=gateway.token, service_url=gateway.url) as client:
+        client.as_dict = True
+        assert client.client.as_dict is True
+        assert isinstance(client.get_limit(), dict)
+
+        client.token = "other"
+        assert client.client.token.value == "other"
+        del client.token
+        assert client.client.token.value is None
+
+        with pytest.raises(TypeError):
+            client.token = 1
+
+
+def test_async_iterators_become_iterators(gateway):
+    with SMSClient(token=gateway.token, service_url=gateway.url) as client:
+        for offset in range(5):
+            client.send_sms(998900000000 + offset, "hi")
+
+        end = datetime.now() + timedelta(days=1)
+        rows = client.iter_message_details(
+            end - timedelta(days=2), end, page_size=2
+        )
+        assert len(list(rows)) == 5
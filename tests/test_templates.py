@@ -0,0 +1,114 @@
+import pytest
+
+from eskiz import SMSClient, TemplateCache
+from eskiz.mock import MockGateway
+from eskiz.templates import TemplateIndex
+from eskiz.utils import exceptions
+
+TEMPLATES = [f"Your code for order {index} is %d" for index in range(45)]
+
+
+def template(id, text):
+    return {"status": "success", "data": {"id": id, "template": text}}
+
+
+def test_text_index_follows_evictions():
+    cache = TemplateCache(maxsize=3)
+    for id in range(10):
+        cache.put(template(id, f"text {id}"))
+
+    assert len(cache._by_text) == 3
+    assert cache.find("text 0") is None
+    assert cache.find("text 9") == {"id": 9, "template": "text 9"}
+
+
+def test_text_index_follows_edits():
+    cache = TemplateCache()
+    cache.put(template(1, "old"))
+    cache.put(template(1, "new"))
+
+    assert cache.find("old") is None
+    assert cache.find("new")["id"] == 1
+    assert len(cache.templates()) == 1
+
+
+async def test_list_holds_every_page_and_is_served_cached():
+    cache = TemplateCache(background_refresh=False)
+    async with MockGateway(templates=TEMPLATES) as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            template_cache=cache,
+        )
+        try:
+            first = await client.get_template_list()
+            second = await client.get_template_list()
+            template = await client.get_template(45)
+        finally:
+            await client.close()
+
+    assert len(first.data.result) == len(second.data.result) == 45
+    assert template.data.template == TEMPLATES[44]
+    # Three pages, then from the cache
+    assert gateway.requests["GET_TEMPLATE_LIST"] == 3
+    assert "GET_TEMPLATE" not in gateway.requests
+
+
+async def test_single_templates_do_not_start_the_refresh():
+    cache = TemplateCache()
+    async with MockGateway(templates=TEMPLATES) as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            template_cache=cache,
+        )
+        try:
+            await client.get_template(1)
+            await client.get_template(1)
+            assert cache._task is None
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_TEMPLATE"] == 1
+
+
+def test_index_matches_placeholders():
+    index = TemplateIndex(
+        ["Your code is %d", "Hello %w, order %d is %s", "Exact text"]
+    )
+
+    assert index.match("Your code is 1234").values == ("1234",)
+    assert index.match("Hello Ali, order 7 is on its way").values == (
+        "Ali",
+        "7",
+        "on its way",
+    )
+    assert index.match("Exact text").values == ()
+    assert "Your code is abc" not in index
+    assert "Your code is 1234 extra" not in index
+    assert len(index) == 3
+
+
+def test_index_from_cached_items():
+    cache = TemplateCache()
+    cache.put(template(5, "Code %d"))
+    index = TemplateIndex.from_items(cache.templates())
+
+    assert index.match("Code 42").id == 5
+
+
+async def test_unmatched_texts_are_refused_before_sending():
+    async with MockGateway() as gateway:
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            template_index=TemplateIndex(["Your code is %d"]),
+        )
+        try:
+            await client.send_sms(998991234567, "Your code is 1234")
+            with pytest.raises(exceptions.TemplateNotMatched):
+                await client.send_sms(998991234567, "Free money")
+        finally:
+            await client.close()
+
+    assert gateway.requests["SEND_SMS"] == 1
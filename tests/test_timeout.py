@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from eskiz import SMSClient
+from eskiz.mock import SERVER_ERROR, MockGateway
+from eskiz.utils import exceptions
+from eskiz.utils.retry import RetryPolicy
+
+
+async def test_per_call_timeout():
+    async with MockGateway(latency=0.5) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        started = time.monotonic()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_limit(timeout=0.1)
+        finally:
+            await client.close()
+
+    assert time.monotonic() - started < 0.4
+
+
+async def test_client_timeout():
+    async with MockGateway(latency=0.5) as gateway:
+        client = SMSClient(
+            token=gateway.token, service_url=gateway.url, timeout=0.1
+        )
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_limit()
+        finally:
+            await client.close()
+
+
+async def test_deadline_is_shared_between_requests():
+    async with MockGateway(latency=0.1) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            with client.with_deadline(0.15):
+                await client.get_limit()
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.get_user_data()
+        finally:
+            await client.close()
+
+
+async def test_retries_stop_at_the_deadline():
+    async with MockGateway() as gateway:
+        gateway.fail_next(SERVER_ERROR, times=100, method="GET_LIMIT")
+        client = SMSClient(
+            token=gateway.token,
+            service_url=gateway.url,
+            retry=RetryPolicy(100, backoff=0.05, multiplier=1, jitter=0),
+        )
+        started = time.monotonic()
+        try:
+            # The last error, once no delay fits the deadline
+            with pytest.raises(exceptions.ServerError):
+                await client.get_limit(timeout=0.2)
+        finally:
+            await client.close()
+
+    assert time.monotonic() - started < 0.4
+    assert gateway.requests["GET_LIMIT"] < 10
@@ -0,0 +1,95 @@
+import asyncio
+
+from eskiz import DispatchTracker, SMSClient
+from eskiz.mock import MockGateway
+from eskiz.types.enums import MessageStatus
+from eskiz.utils.message import MessageBuilder
+
+
+async def send(client, count, dispatch_id):
+    builder = MessageBuilder(dispatch_id=dispatch_id)
+    for offset in range(count):
+        builder.add(998900000000 + offset, f"message {offset}")
+    await client.send_batch_sms(builder.as_messages())
+
+
+def totals(status):
+    return {item.status: item.total for item in status.data}
+
+
+async def test_waits_until_no_message_is_pending():
+    async with MockGateway(delivery_delay=0.1) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 5, dispatch_id=1)
+            async with DispatchTracker(
+                client, user_id=gateway.user_id, min_interval=0.02
+            ) as tracker:
+                status = await tracker.wait(1, timeout=2)
+                assert 1 not in tracker
+        finally:
+            await client.close()
+
+    assert totals(status) == {MessageStatus.DELIVERED: 5}
+
+
+async def test_waiters_of_one_dispatch_share_its_polling():
+    async with MockGateway(delivery_delay=0.1) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 2, dispatch_id=1)
+            async with DispatchTracker(
+                client, user_id=gateway.user_id, min_interval=0.02
+            ) as tracker:
+                first, second = await asyncio.gather(
+                    tracker.wait(1, timeout=2), tracker.wait(1, timeout=2)
+                )
+        finally:
+            await client.close()
+
+    assert totals(first) == totals(second)
+    # One poll per interval, not one per waiter
+    assert gateway.requests["GET_DISPATCH_STATUS"] <= 10
+
+
+async def test_fetches_the_user_id_once():
+    async with MockGateway(delivery_delay=0.05) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 1, dispatch_id=1)
+            await send(client, 1, dispatch_id=2)
+            async with DispatchTracker(client, min_interval=0.02) as tracker:
+                await asyncio.gather(
+                    tracker.wait(1, timeout=2), tracker.wait(2, timeout=2)
+                )
+                assert tracker.user_id == gateway.user_id
+        finally:
+            await client.close()
+
+    assert gateway.requests["GET_USER_DATA"] == 1
+
+
+async def test_updates_report_changes_and_expiry():
+    async with MockGateway(delivery_delay=60) as gateway:
+        client = SMSClient(token=gateway.token, service_url=gateway.url)
+        try:
+            await send(client, 3, dispatch_id=1)
+            async with DispatchTracker(
+                client,
+                user_id=gateway.user_id,
+                min_interval=0.02,
+                expire_after=0.1,
+            ) as tracker:
+                updates = tracker.updates()
+                tracker.track(1)
+
+                first = await asyncio.wait_for(updates.__anext__(), 2)
+                last = await asyncio.wait_for(updates.__anext__(), 2)
+                await updates.aclose()
+        finally:
+            await client.close()
+
+    assert not first.finished and not first.expired
+    assert totals(first.status) == {MessageStatus.WAITING: 3}
+    assert last.expired and not last.finished
+    assert 1 not in tracker